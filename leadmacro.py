@@ -59,13 +59,28 @@ in ubuntu, this can be installed via
 
 """
 
+import array  # used for compact snapshot columns
 import collections
+import concurrent.futures  # used to overlap sheet reads and writes
+import itertools
+import locale  # used to decode memory-mapped log files
+import math
+import mmap  # used to read single columns of log files
+import multiprocessing
 import os
 import datetime  # used for saving logs by time
+import hashlib  # used for hashes of bloom filters and merged rows
 import pickle
 import csv  # used for saving logs
 import platform
+import re  # used to find unneeded whitespace
+import struct  # used for binary log files
+import shutil  # used to copy spooled log file sections
 import sys
+import tempfile  # used to spool log file sections while written
+import threading
+import time  # used to find stale compaction locks
+import weakref  # used for registries of sheets and lines
 
 from PyQt5.QtWidgets import QMessageBox, QVBoxLayout, QHBoxLayout, \
     QInputDialog, QCheckBox, QComboBox, QPushButton, QGridLayout, \
@@ -77,6 +92,16 @@ try:
 except ImportError:
     xw = None
 
+try:
+    import numpy as np  # optional; speeds up scans of large columns
+except ImportError:
+    np = None
+
+try:
+    import sqlite3  # optional; used for indexes of logged values
+except ImportError:
+    sqlite3 = None
+
 APP_FOLDER_NAME = 'leadsmacro'
 SAVED_TRANSLATIONS_FOLDER_NAME = 'saved_translations'
 LOG_DIR_NAME = 'logs'
@@ -142,6 +167,14 @@ DUPLICATE_REMOVE_ROW_STR = 'Remove row'
 DUPLICATE_HIGHLIGHT_STR = 'Highlight'
 DUPLICATE_IGNORE_STR = 'Do nothing'
 
+# pools on which columns are checked for duplicates and whitespace
+CHECK_SERIAL_STR = 'serial'  # one after another, in the calling thread
+CHECK_THREADS_STR = 'threads'
+CHECK_PROCESSES_STR = 'processes'
+CHECK_AUTO_STR = 'auto'  # processes for long columns, threads for others
+CHECK_POOLS = (CHECK_SERIAL_STR, CHECK_THREADS_STR, CHECK_PROCESSES_STR,
+               CHECK_AUTO_STR)
+
 ###############################################################################
 # BOOK INTERFACE
 
@@ -151,9 +184,32 @@ class Model:
     Abstract model to be extended by office interface specific
     subclasses in Office.
     """
+    _session_sheets = None  # {sheet key: Sheet} of sheets got from model
+    interface = None  # Interface of model; set by Interface.bind()
+    # interface document holding the model's sheets, where sheets do
+    # not refer to their document themselves.
+    document = None
+
     def __init__(self) -> None:
         raise NotImplementedError
 
+    def _get_sheet(self, i7e_sheet) -> 'Sheet':
+        """
+        Gets Sheet for passed interface sheet object, as
+        Sheet.factory does, and keeps it for as long as this model is
+        used, so that its settings and snapshot are kept between
+        lookups. Once the model is no longer referenced, its sheets
+        and their lines may be released.
+        :param i7e_sheet: interface sheet obj
+        :return: Sheet
+        """
+        sheet = Sheet.factory(
+            i7e_sheet, interface=self.interface, document=self.document)
+        if self._session_sheets is None:
+            self._session_sheets = {}
+        self._session_sheets[repr(sheet)] = sheet
+        return sheet
+
     def __getitem__(self, item: str or int):
         """
         Gets sheet from model, either by the str name of the sheet,
@@ -221,6 +277,7 @@ class WorkBookComponent:
     Abstract class with common methods for classes that exist within
     a workbook.
     """
+    __slots__ = ()  # allows Cell to be without a __dict__
     sheet = None
 
     @property
@@ -341,46 +398,78 @@ class Sheet(WorkBookComponent):
     _reference_column_index = 0
     _content_row_start = None  # default start index of table_row iter
     _table_col_start = None  # default start index of table_col iter
+    interface = None  # Interface of sheet; set by Interface.bind()
     _snapshot = None
+    _header_indexes = None  # {'columns' or 'rows': {line name: index}}
     exclusive_editor = False  # true if no concurrent editing will occur
-
-    _all_sheets = {}  # all sheets so far instantiated, by repr string
+    document = None  # interface document holding sheet, if passed
+    READ_WINDOW = 10000  # max rows read at once when sheet is scanned
+    # true if blocks of the sheet may be read and written from a worker
+    # thread while the calling thread continues.
+    threaded_io = False
+    # true if worker processes may be forked from the process using the
+    # sheet. Office programs hosting the macro run threads of their own
+    # which may hold locks at the fork, so their sheets do not allow it.
+    forks_workers = False
+
+    # sheets in use, by repr string. Sheets are kept alive by the
+    # Model or Translation using them, not by this registry.
+    _all_sheets = weakref.WeakValueDictionary()
 
     def __init__(
             self,
             i7e_sheet,  # used by subclasses
             reference_row_index=0,  # used by subclasses
-            reference_column_index=0  # used by subclasses
+            reference_column_index=0,  # used by subclasses
+            document=None
     ) -> None:
         self.i7e_sheet = i7e_sheet
+        self.document = document
         self.reference_column_index = reference_column_index
         self.reference_row_index = reference_row_index
         self.sheet = self  # returns self, as required by WorkBookComponent
         assert repr(self) not in Sheet._all_sheets
         Sheet._all_sheets[repr(self)] = self
 
-    @staticmethod
-    def factory(i7e_sheet, ref_row_index=0, ref_col_index=0) -> 'Sheet':
+    @classmethod
+    def factory(
+            cls,
+            i7e_sheet,
+            ref_row_index=0,
+            ref_col_index=0,
+            interface: 'Interface'=None,
+            document=None
+    ) -> 'Sheet':
         """
         Factory method return Sheet.
         This method does not create duplicate sheets,
         instead, it returns a reference to a pre-existing sheet
         if one exists.
+        The Sheet is of the passed interface, or else of the
+        interface of the class this method is called from, ie;
+        Office.Uno.Sheet.factory(). Only if neither is known is the
+        interface in use detected.
+        The interface document holding the sheet may be passed, for
+        interfaces whose sheets do not refer to their document, so
+        that same-named sheets of different documents are told apart.
         :return: Sheet
         """
-        sheet_class = Office.get_sheet_class()
-        key = sheet_class.key(i7e_sheet)
+        if interface is None:
+            interface = cls.interface or Office.get_interface_class()
+        sheet_class = interface.Sheet
+        key = sheet_class.key(i7e_sheet, document)
         try:
             return Sheet._all_sheets[key]
         except KeyError:
             return sheet_class(
                 i7e_sheet=i7e_sheet,
                 reference_column_index=ref_col_index,
-                reference_row_index=ref_row_index
+                reference_row_index=ref_row_index,
+                document=document
             )
 
     @staticmethod
-    def key(i7e_sheet):
+    def key(i7e_sheet, document=None):
         return i7e_sheet
 
     def get_column(
@@ -431,10 +520,7 @@ class Sheet(WorkBookComponent):
         :param column_name: int, float, or str
         :return: int or None
         """
-        # todo: cache this
-        for x, cell in enumerate(self.reference_row):
-            if cell.value == column_name:
-                return x
+        return self.get_header_index(LineSeries.COLUMNS_STR).get(column_name)
 
     def get_row(self, row_identifier: int or float or str) -> 'Row':
         """
@@ -480,9 +566,93 @@ class Sheet(WorkBookComponent):
         :param row_name: int, float, or str
         :return: int or None
         """
-        for y, cell in enumerate(self.reference_column):
-            if cell.value == row_name:
-                return y
+        return self.get_header_index(LineSeries.ROWS_STR).get(row_name)
+
+    def get_header_index(self, contents_type: str) -> dict:
+        """
+        Gets dict of line names to the index of the first line with
+        that name; for columns, names are the values of the reference
+        row, and for rows, those of the reference column.
+        The dict is kept until the reference row or column is
+        changed, or one of its cells is written, but only while this
+        sheet is the exclusive editor of its values, or its values are
+        held by a complete snapshot; otherwise headers may be changed
+        by others between lookups, and are read again each time.
+        :param contents_type: str 'columns' or 'rows'
+        :return: dict
+        """
+        snapshot = self._snapshot
+        if not self.exclusive_editor and \
+                (snapshot is None or not snapshot.complete):
+            self.clear_header_index()  # may have been kept before
+            return self._read_header_index(contents_type)
+        if self._header_indexes is None:
+            self._header_indexes = {}
+        try:
+            return self._header_indexes[contents_type]
+        except KeyError:
+            header_index = self._read_header_index(contents_type)
+            self._header_indexes[contents_type] = header_index
+            return header_index
+
+    def _read_header_index(self, contents_type: str) -> dict:
+        """
+        Reads dict of line names to the index of the first line with
+        that name from the reference row or column.
+        :param contents_type: str 'columns' or 'rows'
+        :return: dict
+        """
+        if contents_type == LineSeries.COLUMNS_STR:
+            reference_line = self.reference_row
+        elif contents_type == LineSeries.ROWS_STR:
+            reference_line = self.reference_column
+        else:
+            raise ValueError('Expected \'columns\' or \'rows\'. Got: %s'
+                             % repr(contents_type))
+        header_index = {}
+        for i, cell in enumerate(reference_line):
+            header_index.setdefault(cell.value, i)
+        return header_index
+
+    def clear_header_index(self, contents_type: str=None) -> None:
+        """
+        Discards header index of passed contents type, or of both
+        columns and rows if None is passed, so that it is found again
+        when next needed.
+        :param contents_type: str 'columns', 'rows' or None
+        :return: None
+        """
+        if self._header_indexes is None:
+            return
+        if contents_type is None:
+            self._header_indexes.clear()
+        else:
+            self._header_indexes.pop(contents_type, None)
+
+    def cell_changed(self, x: int, y: int) -> None:
+        """
+        Called after the value of the cell at x, y has been set, so
+        that indexes of sheet values can be updated.
+        :param x: int
+        :param y: int
+        :return: None
+        """
+        self.range_changed(x, y, x + 1, y + 1)
+
+    def range_changed(self, x0: int, y0: int, x1: int, y1: int) -> None:
+        """
+        Called after values of cells from x0, y0 up to (but not
+        including) x1, y1 have been set.
+        :param x0: int
+        :param y0: int
+        :param x1: int
+        :param y1: int
+        :return: None
+        """
+        if y0 <= self._reference_row_index < y1:
+            self.clear_header_index(LineSeries.COLUMNS_STR)
+        if x0 <= self._reference_column_index < x1:
+            self.clear_header_index(LineSeries.ROWS_STR)
 
     def get_cell(self, cell_identifier, **kwargs) -> 'Cell':
         """
@@ -554,6 +724,7 @@ class Sheet(WorkBookComponent):
         if new_index < 0:
             raise IndexError('Reference row index must be > 0')
         self._reference_row_index = new_index
+        self.clear_header_index(LineSeries.COLUMNS_STR)
 
     @property
     def reference_row(self) -> 'Row':
@@ -583,6 +754,7 @@ class Sheet(WorkBookComponent):
         if new_index < 0:
             raise IndexError('Reference row index must be > 0')
         self._reference_column_index = new_index
+        self.clear_header_index(LineSeries.ROWS_STR)
 
     @property
     def reference_column(self) -> 'Column':
@@ -708,6 +880,12 @@ class Sheet(WorkBookComponent):
         :param frozen_size: bool
         :return: None
         """
+        complete = False  # whether snapshot holds all used cells
+        if width is None and height is None:
+            used_size = self.used_size
+            if used_size is not None:
+                width, height = used_size
+                complete = True
         if height is None:
             height = len(self.reference_column)
         if width is None:
@@ -716,15 +894,21 @@ class Sheet(WorkBookComponent):
             height = 1  # if width > 0, then a reference row was found
         if width == 0 and height > 0:
             width = 1  # if height > 0, then a reference col was found
-        self._snapshot = self.Snapshot(self, width, height, frozen_size)
+        self._snapshot = self.Snapshot(
+            self, width, height, frozen_size, complete=complete)
+        self.clear_header_index()  # headers are read again from snapshot
 
+    @WorkBookComponent.clear_cache
     def write_snapshot(self):
         """
         Writes values in snapshot to memory in one single write
         (much, much faster than writing each cell individually)
+        Colors set while the snapshot was taken are then written, one
+        rectangle of equal color at a time.
         :return: None
         """
         self._snapshot.write()
+        self._snapshot.write_colors()
 
     def discard_snapshot(self):
         """
@@ -732,11 +916,248 @@ class Sheet(WorkBookComponent):
         :return: None
         """
         self._snapshot = None
+        self.clear_header_index()
 
     @property
     def snapshot(self) -> None or 'Snapshot':
         return self._snapshot
 
+    def read_block(self, x0: int, y0: int, x1: int, y1: int) -> list:
+        """
+        Gets list of rows of values of cells from x0, y0 up to (but not
+        including) x1, y1, in a single read from the office program.
+        Empty cells may be returned as None or ''.
+        Implemented by each interface's Sheet.
+        :param x0: int
+        :param y0: int
+        :param x1: int
+        :param y1: int
+        :return: list[list]
+        """
+        raise NotImplementedError
+
+    def write_block(self, x: int, y: int, rows: list) -> None:
+        """
+        Writes passed list of equal length rows of values to sheet, in
+        a single write, with the first value of the first row placed
+        at x, y.
+        Implemented by each interface's Sheet.
+        :param x: int
+        :param y: int
+        :param rows: list[list]
+        :return: None
+        """
+        raise NotImplementedError
+
+    @WorkBookComponent.clear_cache
+    def clear_region(
+            self,
+            x0: int,
+            y0: int,
+            x1: int,
+            y1: int,
+            contents: bool=True,
+            formats: bool=True
+    ) -> None:
+        """
+        Clears cells from x0, y0 up to (but not including) x1, y1, in
+        a single operation on the office program's sheet.
+        If a snapshot has been taken, the region is cleared from it
+        as well, so that nothing cleared is written back.
+        :param x0: int
+        :param y0: int
+        :param x1: int
+        :param y1: int
+        :param contents: bool; if True, values are cleared.
+        :param formats: bool; if True, cell colors are reset.
+        :return: None
+        """
+        if x1 <= x0 or y1 <= y0:
+            return
+        if self._snapshot is not None:
+            self._snapshot.clear_region(x0, y0, x1, y1, contents, formats)
+        self._clear_region(x0, y0, x1, y1, contents, formats)
+        if contents:
+            self.range_changed(x0, y0, x1, y1)
+
+    def _clear_region(
+            self,
+            x0: int,
+            y0: int,
+            x1: int,
+            y1: int,
+            contents: bool,
+            formats: bool
+    ) -> None:
+        """
+        Clears passed region of the office program's sheet.
+        Implemented by each interface's Sheet.
+        :param x0: int
+        :param y0: int
+        :param x1: int
+        :param y1: int
+        :param contents: bool
+        :param formats: bool
+        :return: None
+        """
+        raise NotImplementedError
+
+    def set_region_color(
+            self,
+            x0: int,
+            y0: int,
+            x1: int,
+            y1: int,
+            color: int
+    ) -> None:
+        """
+        Sets background color of cells from x0, y0 up to (but not
+        including) x1, y1 in a single operation on the office
+        program's sheet.
+        Implemented by each interface's Sheet.
+        :param x0: int
+        :param y0: int
+        :param x1: int
+        :param y1: int
+        :param color: int
+        :return: None
+        """
+        raise NotImplementedError
+
+    def read_rows(self, x0: int, y0: int, x1: int, y1: int):
+        """
+        Generates rows of values of cells from x0, y0 up to (but not
+        including) x1, y1. Values are read from the sheet's snapshot if
+        one has been taken, otherwise from bulk reads of the sheet of
+        up to READ_WINDOW rows each.
+        Each row has a value for every column; empty cells are None.
+        :param x0: int
+        :param y0: int
+        :param x1: int
+        :param y1: int
+        :return: Generator[list]
+        """
+        snapshot = self._snapshot
+        width = x1 - x0
+        for y in range(y0, y1, self.READ_WINDOW):
+            y_end = min(y + self.READ_WINDOW, y1)
+            if snapshot is not None:
+                columns = [snapshot.get_column_values(x, y, y_end)
+                           if x < snapshot.width else []
+                           for x in range(x0, x1)]
+                rows = [[column[i] if i < len(column) else None
+                         for column in columns] for i in range(y_end - y)]
+            else:
+                rows = self.read_block(x0, y, x1, y_end)
+            for row in rows:
+                yield [None if value == '' else value for value in row] + \
+                    [None] * (width - len(row))
+
+    def read_columns(self, x0: int, y0: int, x1: int, y1: int):
+        """
+        Generates values of cells from x0, y0 up to (but not
+        including) x1, y1 as columns, one window of up to READ_WINDOW
+        rows at a time. Values are read as by read_rows, but columns of
+        the snapshot are passed on without being transposed to rows.
+        Each column of a window has a value for every row of it.
+        :param x0: int
+        :param y0: int
+        :param x1: int
+        :param y1: int
+        :return: Generator[list[list]] of the columns of each window
+        """
+        snapshot = self._snapshot
+        width = x1 - x0
+        for y in range(y0, y1, self.READ_WINDOW):
+            y_end = min(y + self.READ_WINDOW, y1)
+            n = y_end - y
+            if snapshot is not None:
+                columns = [snapshot.get_column_values(x, y, y_end)
+                           for x in range(x0, min(x1, snapshot.width))]
+            else:
+                columns = list(itertools.zip_longest(
+                    *self.read_block(x0, y, x1, y_end)))
+            # empty cells are mostly None already; only columns holding
+            # '' are copied to replace it.
+            yield [([None if value == '' else value for value in column]
+                    if '' in column else list(column)) +
+                   [None] * (n - len(column)) for column in columns] + \
+                [[None] * n for _ in range(width - len(columns))]
+
+    def region_is_empty(self, x0: int, y0: int, x1: int, y1: int) -> bool:
+        """
+        Gets bool of whether no cells from x0, y0 up to (but not
+        including) x1, y1 hold a value. Values are read from the
+        sheet's snapshot if one has been taken, otherwise from bulk
+        reads of the sheet of up to READ_WINDOW rows each.
+        :param x0: int
+        :param y0: int
+        :param x1: int
+        :param y1: int
+        :return: bool
+        """
+        if x1 <= x0 or y1 <= y0:
+            return True
+        snapshot = self._snapshot
+        if snapshot is not None:
+            lines = (snapshot.get_column_values(x, y0, y1)
+                     for x in range(x0, min(x1, snapshot.width)))
+        else:
+            lines = itertools.chain.from_iterable(
+                self.read_block(
+                    x0, y, x1, min(y + self.READ_WINDOW, y1))
+                for y in range(y0, y1, self.READ_WINDOW))
+        for line in lines:
+            for value in line:
+                if value is not None and value != '':
+                    return False
+        return True
+
+    @property
+    def used_size(self) -> tuple or None:
+        """
+        Gets (width, height) of the area of the sheet containing values,
+        as reported by the office program in a single query.
+        Returns None if the interface cannot provide this, in which
+        case sizes are found by iterating over cells.
+        :return: tuple[int, int] or None
+        """
+        return None
+
+    @property
+    def extents(self) -> 'Sheet.ExtentIndex' or None:
+        """
+        Gets index of the extent of the sheet's rows and columns, from
+        which line lengths can be found without reading cells.
+        The index is that of the sheet's snapshot, if the snapshot
+        holds all used cells of the sheet. Otherwise, if this sheet is
+        the exclusive editor of its values, the index is found from a
+        single read of the used area of the sheet.
+        Returns None if no index can be kept for the sheet, in which
+        case line lengths are found by iterating over cells.
+        :return: Sheet.ExtentIndex or None
+        """
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot.extents if snapshot.complete else None
+        if self.exclusive_editor:
+            return self._read_extents()
+        return None
+
+    @WorkBookComponent.value_cache
+    def _read_extents(self) -> 'Sheet.ExtentIndex' or None:
+        """
+        Gets extent index from a frozen snapshot of the used area of
+        the sheet. Cached until a cell of the sheet is changed.
+        :return: Sheet.ExtentIndex or None
+        """
+        used_size = self.used_size
+        if used_size is None:
+            return None
+        width, height = used_size
+        return self.Snapshot(
+            self, width, height, frozen_size=True, complete=True).extents
+
     @property
     def screen_updating(self) -> bool or None:
         """
@@ -760,11 +1181,11 @@ class Sheet(WorkBookComponent):
 
     @property
     def parents(self):
-        return  # nothing to yield or return
+        return ()  # nothing to yield
 
     @property
     def instantiated_parents(self):
-        return  # nothing to yield or return
+        return ()  # nothing to yield
 
     def __str__(self) -> str:
         raise NotImplementedError
@@ -776,51 +1197,418 @@ class Sheet(WorkBookComponent):
         """
         Class storing a sheet entirely in memory, so that individual
         reads and writes to a sheet can be grouped together.
-        Snapshot is sub-classed within XW and Uno.
+        Values are read and written through the sheet's read_block and
+        write_block methods.
+
+        Values are stored by column, since they are most often
+        scanned one column at a time. Each column is held in a
+        ColumnBuffer specialized to the type of values it holds.
+
+        Only values that have been changed are written back to the
+        sheet; see dirty_rectangles.
         """
 
+        class ColumnBuffer:
+            """
+            Storage of the values of a single snapshot column.
+            Storage is specialized by the kind of values held;
+                'float': array('d') of values, with a bytearray mask
+                    marking each position as empty (0), packed (1),
+                    or held in a small dict of other values (2), such
+                    as the column's header.
+                'int': as 'float', using array('q').
+                'str': list of str or None.
+                'object': list of any value.
+            A column is moved to 'object' storage if more values are
+            set than its current storage can hold.
+            """
+            __slots__ = 'kind', 'data', 'mask', 'others'
+
+            FLOAT = 'float'
+            INT = 'int'
+            STR = 'str'
+            OBJECT = 'object'
+
+            EMPTY = 0  # mask values
+            PACKED = 1
+            OTHER = 2
+
+            _array_type_codes = {FLOAT: 'd', INT: 'q'}
+            _int_range = -2 ** 63, 2 ** 63 - 1
+
+            def __init__(
+                    self,
+                    kind: str,
+                    data,
+                    mask: bytearray=None,
+                    others: dict=None
+            ) -> None:
+                self.kind = kind
+                self.data = data
+                self.mask = mask
+                self.others = others
+
+            @classmethod
+            def from_values(cls, values) -> 'Sheet.Snapshot.ColumnBuffer':
+                """
+                Creates ColumnBuffer holding passed values, using the
+                most compact storage able to hold them.
+                :param values: iterable of int, float, str or None
+                :return: ColumnBuffer
+                """
+                values = values if isinstance(values, list) else list(values)
+                counts = collections.Counter(map(type, values))
+                n_empty = counts.pop(type(None), 0)
+                n_float = counts.get(float, 0)
+                n_int = counts.get(int, 0)
+                n_values = len(values) - n_empty
+                if n_float and n_values - n_float <= \
+                        cls._max_others(len(values)):
+                    kind = cls.FLOAT
+                elif n_int and n_values - n_int <= \
+                        cls._max_others(len(values)):
+                    kind = cls.INT
+                elif n_values == counts.get(str, 0):
+                    return cls(cls.STR, values)
+                else:
+                    return cls(cls.OBJECT, values)
+                # numbers are packed, with a mask marking other values.
+                packed_type = float if kind == cls.FLOAT else int
+                mask = bytearray(len(values))
+                others = {}
+                packed = [0] * len(values)
+                for i, v in enumerate(values):
+                    if v is None:
+                        continue
+                    if type(v) is packed_type and \
+                            (kind == cls.FLOAT or cls._fits_int(v)):
+                        mask[i] = cls.PACKED
+                        packed[i] = v
+                    else:
+                        mask[i] = cls.OTHER
+                        others[i] = v
+                if len(others) > cls._max_others(len(values)):
+                    return cls(cls.OBJECT, values)  # ints too large to pack
+                data = array.array(cls._array_type_codes[kind], packed)
+                return cls(kind, data, mask, others)
+
+            @staticmethod
+            def _max_others(n: int) -> int:
+                """
+                Gets max number of values of other types that may be
+                held alongside n packed values.
+                :param n: int
+                :return: int
+                """
+                return max(16, n // 64)
+
+            @classmethod
+            def _fits_int(cls, value: int) -> bool:
+                return cls._int_range[0] <= value <= cls._int_range[1]
+
+            def __len__(self) -> int:
+                return len(self.data)
+
+            def get(self, i: int) -> int or float or str or None:
+                """
+                Gets value at index i.
+                :param i: int
+                :return: int, float, str or None
+                """
+                if self.mask is None:
+                    return self.data[i]
+                m = self.mask[i]
+                if m == self.PACKED:
+                    return self.data[i]
+                elif m == self.EMPTY:
+                    return None
+                else:
+                    return self.others[i if i >= 0 else i + len(self.mask)]
+
+            def set(self, i: int, value) -> None:
+                """
+                Sets value at index i, changing storage if needed.
+                :param i: int
+                :param value: int, float, str or None
+                :return: None
+                """
+                if self.mask is None:
+                    if self.kind == self.STR and value is not None and \
+                            type(value) is not str:
+                        self.kind = self.OBJECT
+                    self.data[i] = value
+                    return
+                if i < 0:
+                    i += len(self.mask)
+                if self.mask[i] == self.OTHER:
+                    del self.others[i]
+                if value is None:
+                    self.mask[i] = self.EMPTY
+                    self.data[i] = 0
+                elif self.kind == self.FLOAT and type(value) is float or \
+                        self.kind == self.INT and type(value) is int and \
+                        self._fits_int(value):
+                    self.mask[i] = self.PACKED
+                    self.data[i] = value
+                elif len(self.others) < self._max_others(len(self.mask)):
+                    self.mask[i] = self.OTHER
+                    self.data[i] = 0
+                    self.others[i] = value
+                else:
+                    self.mask[i] = self.EMPTY  # unpack, then set
+                    self.data = self.values()
+                    self.mask = self.others = None
+                    self.kind = self.OBJECT
+                    self.data[i] = value
+
+            def set_values(self, start: int, values: list) -> None:
+                """
+                Sets values from index start onwards. Values that the
+                column's storage can hold are set in place; otherwise
+                storage is changed to suit the column's new values.
+                Column must be long enough to hold passed values.
+                :param start: int
+                :param values: list
+                :return: None
+                """
+                stop = start + len(values)
+                types = set(map(type, values))
+                types.discard(type(None))
+                if self.mask is None:
+                    if self.kind == self.OBJECT or types <= {str}:
+                        self.data[start:stop] = values
+                        return
+                elif self.kind == self.FLOAT and types <= {float} or \
+                        self.kind == self.INT and types <= {int} and \
+                        all(map(self._fits_int, filter(None, values))):
+                    for i in [i for i in self.others if start <= i < stop]:
+                        del self.others[i]
+                    self.data[start:stop] = array.array(
+                        self.data.typecode,
+                        [0 if value is None else value for value in values])
+                    self.mask[start:stop] = bytes(
+                        [value is not None for value in values])
+                    return
+                column_values = self.values()
+                column_values[start:start + len(values)] = values
+                column = self.from_values(column_values)
+                self.kind, self.data, self.mask, self.others = \
+                    column.kind, column.data, column.mask, column.others
+
+            def extend(self, n: int) -> None:
+                """
+                Appends n empty values to column.
+                :param n: int
+                :return: None
+                """
+                if self.mask is None:
+                    self.data.extend([None] * n)
+                else:
+                    self.data.extend(array.array(self.data.typecode, bytes(
+                        self.data.itemsize * n)))
+                    self.mask.extend(bytes(n))
+
+            def values(self, start: int=0, stop: int=None) -> list:
+                """
+                Gets list of values in column from start to stop.
+                :param start: int
+                :param stop: int or None
+                :return: list
+                """
+                if self.mask is None:
+                    return self.data[start:stop]
+                start, stop, _ = slice(start, stop).indices(len(self.mask))
+                values = self.data[start:stop].tolist()
+                mask = self.mask[start:stop]
+                # patch empty positions, then other values, if any.
+                i = mask.find(self.EMPTY)
+                while i != -1:
+                    values[i] = None
+                    i = mask.find(self.EMPTY, i + 1)
+                for i, value in self.others.items():
+                    if start <= i < stop:
+                        values[i - start] = value
+                return values
+
         def __init__(
                 self,
                 sheet: 'Sheet',
                 width: int,
                 height: int,
-                frozen_size: bool
+                frozen_size: bool,
+                complete: bool=False
         ) -> None:
             self._sheet = sheet
             self._height = height
             self._width = width
+            # number of rows held by each column; may exceed height
+            self._capacity = height
             self.frozen_size = frozen_size
-            self._values = self._get_values()
+            # True if no cells outside snapshot hold values
+            self.complete = complete
+            self._columns = self._make_columns(self._get_values())
+            self._colors = {}  # (x, y): color to be written
+            # x: [y0, y1) span of rows changed in column since written
+            self._dirty = {}
+            self.extents = Sheet.ExtentIndex(self)
 
         def _get_values(self) -> list:
             """
             Gets list of lists containing values of cells within snapshot
             :return: list[list[str, float or None]]
             """
-            raise NotImplementedError
+            return self._sheet.read_block(0, 0, self._width, self._height)
+
+        def _make_columns(self, rows: list) -> list:
+            """
+            Creates list of ColumnBuffers from passed list of rows, as
+            returned by _get_values.
+            :param rows: list[list]
+            :return: list[ColumnBuffer]
+            """
+            width, height = self._width, self._height
+            rows = rows[:height]
+            if len(rows) < height:
+                rows = rows + [[]] * (height - len(rows))
+            if any(len(row) != width for row in rows):
+                rows = [
+                    list(row[:width]) + [None] * (width - len(row))
+                    for row in rows
+                ]
+            if height == 0:
+                columns = [[]] * width
+            else:
+                columns = zip(*rows)
+            return [self.ColumnBuffer.from_values(column)
+                    for column in columns]
+
+        def set_block(self, x: int, y: int, rows: list) -> None:
+            """
+            Sets values from passed list of rows, with the first value
+            of the first row placed at x, y. Values are set one column
+            at a time. (to be committed to cells when snapshot is
+            written.)
+            Rows are padded with None to the length of the longest row.
+            Throws IndexError if values do not fit within a snapshot of
+            frozen size.
+            :param x: int
+            :param y: int
+            :param rows: list[list]
+            :return: None
+            """
+            width = max([len(row) for row in rows], default=0)
+            if not width:
+                return
+            if any(len(row) != width for row in rows):
+                rows = [list(row) + [None] * (width - len(row))
+                        for row in rows]
+            for i, values in enumerate(zip(*rows)):
+                self.set_column(x + i, list(values), y)
+
+        def get_block(self, x0: int, y0: int, x1: int, y1: int) -> list:
+            """
+            Gets list of rows of values in snapshot from x0, y0 up to
+            (but not including) x1, y1, as is written to the office
+            program.
+            :param x0: int
+            :param y0: int
+            :param x1: int
+            :param y1: int
+            :return: list[list]
+            """
+            return [list(row) for row in zip(*[
+                self._columns[x].values(y0, y1) for x in range(x0, x1)])]
+
+        def _mark_dirty(self, x: int, y0: int, y1: int) -> None:
+            """
+            Marks rows y0 up to (but not including) y1 of column x as
+            changed, so that they are written with the snapshot.
+            Each column's changed rows are kept as a sorted list of
+            separate runs, so that unchanged rows between them are
+            not written.
+            :param x: int
+            :param y0: int
+            :param y1: int
+            :return: None
+            """
+            runs = self._dirty.setdefault(x, [])
+            if not runs or runs[-1][1] < y0:  # rows are most often
+                runs.append([y0, y1])  # marked in order.
+                return
+            # join the new run with each run it overlaps or touches.
+            i = 0
+            while i < len(runs) and runs[i][1] < y0:
+                i += 1
+            j = i
+            while j < len(runs) and runs[j][0] <= y1:
+                y0 = min(y0, runs[j][0])
+                y1 = max(y1, runs[j][1])
+                j += 1
+            runs[i:j] = [[y0, y1]]
+
+        def dirty_rectangles(self) -> list:
+            """
+            Gets rectangles covering the values changed since the
+            snapshot was taken or last written. Each run of changed
+            rows of a column is joined with equal runs of adjacent
+            columns. Rectangles never cover unchanged cells, since
+            writing back their snapshot values would replace formulas
+            with their results, and anything changed in the sheet since.
+            :return: list of tuples (x0, y0, x1, y1), with x1 and y1
+                exclusive.
+            """
+            rectangles = []  # [x0, y0, x1, y1]
+            open_rectangles = {}  # (y0, y1): rectangle reaching column x
+            for x in sorted(self._dirty):
+                reaching = {}
+                for y0, y1 in self._dirty[x]:
+                    rectangle = open_rectangles.get((y0, y1))
+                    if rectangle is not None and rectangle[2] == x:
+                        rectangle[2] += 1
+                    else:
+                        rectangle = [x, y0, x + 1, y1]
+                        rectangles.append(rectangle)
+                    reaching[(y0, y1)] = rectangle
+                open_rectangles = reaching
+            return [tuple(rectangle) for rectangle in rectangles]
+
+        def write(self):
+            """
+            Commits values changed in snapshot to sheet, writing each
+            dirty rectangle in a single bulk write.
+            :return: None
+            """
+            for x0, y0, x1, y1 in self.dirty_rectangles():
+                self._sheet.write_block(
+                    x0, y0, self.get_block(x0, y0, x1, y1))
+            self._dirty.clear()
 
         def _grow(self, new_width: int=None, new_height: int=None) -> None:
             """
             Grows snapshot to new passed size.
             If passed width or height is smaller than the present size,
             the snapshot will stay the same size, it will not shrink.
+            Columns are lengthened to at least double their capacity,
+            so that rows added one at a time are added in amortized
+            constant time per column.
             :param new_width: int
             :param new_height: int
             :return: None
             """
-            if new_height < self._height:
+            if new_height is None or new_height < self._height:
                 new_height = self._height
-            if new_width < self._width:
+            if new_width is None or new_width < self._width:
                 new_width = self._width
-            height_difference = new_height - self._height
-            width_difference = new_width - self._width
-            # first add rows
-            if height_difference:
-                self._values += [[None] * new_width] * height_difference
-            # then columns
-            if width_difference:
-                for i in range(0, self._height):  # for each pre-existing row
-                    self._values[i] += [None] * width_difference
+            # first lengthen existing columns
+            if new_height > self._capacity:
+                capacity = max(new_height, self._capacity * 2)
+                for column in self._columns:
+                    column.extend(capacity - self._capacity)
+                self._capacity = capacity
+            # then add new columns
+            for _ in range(self._width, new_width):
+                self._columns.append(
+                    self.ColumnBuffer.from_values([None] * self._capacity))
             self._width = new_width
             self._height = new_height
 
@@ -832,20 +1620,16 @@ class Sheet(WorkBookComponent):
             :param y: int
             :return str, float, int or None
             """
-            try:
-                row = self._values[y]
-            except IndexError:
+            if not 0 <= y < self._height:
                 raise IndexError('Snapshot:get_value: %s is outside height of '
                                  'snapshot. (height:%s)' %
-                                 (x, self._height))
-            else:
-                try:
-                    return row[x]  # return value
-                except IndexError:
-                    raise IndexError(
-                        'Snapshot:get_value: %s is outside width of '
-                        'snapshot. (width:%s)' %
-                        (x, self._width))
+                                 (y, self._height))
+            if not 0 <= x < self._width:
+                raise IndexError(
+                    'Snapshot:get_value: %s is outside width of '
+                    'snapshot. (width:%s)' %
+                    (x, self._width))
+            return self._columns[x].get(y)
 
         def set_value(self, x: int, y: int, value) -> None:
             """
@@ -857,102 +1641,431 @@ class Sheet(WorkBookComponent):
             :param value: Any
             :return: None
             """
-            if not isinstance(value, (int, float, str, None)):
+            if not isinstance(value, (int, float, str, type(None))):
                 raise TypeError(
                     'Snapshot:set_value: Passed value should be an int, float'
                     ' , str, or None. Got: %s' % repr(value))
             if x >= self._width or y >= self._height:
                 if self.frozen_size:
+                    # value will instead be set outside the snapshot
+                    self.complete = False
                     raise IndexError(
                         'Snapshot:set_value: (%s, %s) is outside range of '
                         'snapshot (size: (%s, %s)' %
                         (x, y, self._width, self._height)
                     )
                 self._grow(x + 1, y + 1)
-            self._values[y][x] = value
+            self._columns[x].set(y, value)
+            self._mark_dirty(x, y, y + 1)
+            self.extents.update(x, y, value)
 
-        def write(self):
+        def set_column(self, x: int, values: list, start: int=0) -> None:
             """
-            Commits values in snapshot to sheet in a single bulk write
+            Sets values of column x from row index start onwards, in a
+            single operation. (to be committed to cells when snapshot is
+            written.)
+            Throws IndexError if values do not fit within a snapshot of
+            frozen size.
+            :param x: int
+            :param values: list of int, float, str or None
+            :param start: int
             :return: None
             """
-            raise NotImplementedError
+            stop = start + len(values)
+            if x >= self._width or stop > self._height:
+                if self.frozen_size:
+                    self.complete = False
+                    raise IndexError(
+                        'Snapshot:set_column: column %s rows %s-%s are '
+                        'outside range of snapshot (size: (%s, %s)' %
+                        (x, start, stop, self._width, self._height)
+                    )
+                self._grow(x + 1, stop)
+            self._set_column(x, values, start)
+            self._mark_dirty(x, start, stop)
 
+        def _set_column(self, x: int, values: list, start: int) -> None:
+            """
+            Sets values of column x, within the snapshot, from row index
+            start onwards, without marking them to be written.
+            :param x: int
+            :param values: list of int, float, str or None
+            :param start: int
+            :return: None
+            """
+            self._columns[x].set_values(start, values)
+            self.extents.column_changed(x)
+            self._sheet.range_changed(x, start, x + 1, start + len(values))
 
-class LineSeries:
-    """Class storing collection of Line, Column, or Row objects"""
+        def clear_region(
+                self,
+                x0: int,
+                y0: int,
+                x1: int,
+                y1: int,
+                contents: bool=True,
+                formats: bool=True
+        ) -> None:
+            """
+            Clears values from x0, y0 up to (but not including) x1, y1
+            one column at a time, and / or discards colors set within
+            the region. Parts of the region outside the snapshot are
+            ignored.
+            This is called by Sheet.clear_region as the region is
+            cleared in the sheet itself, so cleared values are not
+            marked to be written.
+            :param x0: int
+            :param y0: int
+            :param x1: int
+            :param y1: int
+            :param contents: bool
+            :param formats: bool
+            :return: None
+            """
+            if formats:
+                for position in [
+                        (x, y) for x, y in self._colors
+                        if x0 <= x < x1 and y0 <= y < y1]:
+                    del self._colors[position]
+            y1 = min(y1, self._height)
+            if not contents or y1 <= y0:
+                return
+            for x in range(x0, min(x1, self._width)):
+                self._set_column(x, [None] * (y1 - y0), y0)
 
-    COLUMNS_STR = 'columns'
-    ROWS_STR = 'rows'
+        def set_color(self, x: int, y: int, color: int) -> None:
+            """
+            Sets background color of cell at x, y. (to be committed to
+            cells when colors are written.)
+            Colors are not bound by the size of the snapshot.
+            :param x: int
+            :param y: int
+            :param color: int
+            :return: None
+            """
+            self._colors[(x, y)] = color
 
-    def __init__(
-            self,
-            reference_line: 'Line',
-            start_index: int=0,  # iterator start index
-            end_index: int=None,  # iterator end index (exclusive)
-    ) -> None:
-        if not isinstance(reference_line, Line):
-            raise TypeError('Expected LineSeries to be passed reference line.'
-                            'Got instead: %s' % repr(reference_line))
-        self.reference_line = reference_line
-        self.start_index = start_index
-        self.end_index = end_index
+        def get_color(self, x: int, y: int) -> int or None:
+            """
+            Gets color set for cell at x, y since the snapshot was
+            taken, or None if no color has been set for it.
+            :param x: int
+            :param y: int
+            :return: int or None
+            """
+            return self._colors.get((x, y))
 
-    def __getitem__(self, item: int or float or str):
-        """
-        If item is int, returns line of that index, otherwise looks
-        for a line of that name.
-        :param item: int, float, or str
-        :return: Line or None
-        """
-        if isinstance(item, int):
-            return self.get_by_index(item)
-        else:
-            return self.get_by_name(item)
+        def color_rectangles(self) -> list:
+            """
+            Groups colors that have been set into rectangles of equal
+            color.
+            :return: list of tuples (x0, y0, x1, y1, color), with x1
+                and y1 exclusive.
+            """
+            return self.find_color_rectangles(self._colors)
 
-    def __iter__(self):
-        """
-        Returns Generator that iterates over columns in LineSeries
-        :return: Generator<Line>
-        """
-        # find whether this is a series of rows or columns
-        if self.end_index is not None:
-            ref_cells = self.reference_line[self.start_index:self.end_index]
-        else:
-            ref_cells = self.reference_line[self.start_index:]
-        for cell in ref_cells:
-            if self._contents_type == LineSeries.COLUMNS_STR:
-                yield cell.column
-            if self._contents_type == LineSeries.ROWS_STR:
-                yield cell.rows
+        @staticmethod
+        def find_color_rectangles(colors: dict) -> list:
+            """
+            Groups passed colors into rectangles of equal color. Cells
+            of each color are first joined into runs down each column,
+            and then runs covering the same rows of adjacent columns are
+            joined.
+            :param colors: dict of position: color
+            :return: list of tuples (x0, y0, x1, y1, color), with x1
+                and y1 exclusive.
+            """
+            runs = []  # (x, y0, y1, color), ordered by x, y0
+            run = None
+            for (x, y), color in sorted(colors.items()):
+                if run is not None and run[0] == x and run[2] == y and \
+                        run[3] == color:
+                    run[2] += 1
+                else:
+                    run = [x, y, y + 1, color]
+                    runs.append(run)
+            rectangles = []
+            open_rectangles = {}  # (y0, y1, color): [x0, y0, x1, y1, color]
+            for x, y0, y1, color in runs:
+                rectangle = open_rectangles.get((y0, y1, color))
+                if rectangle is not None and rectangle[2] == x:
+                    rectangle[2] += 1
+                else:
+                    rectangle = open_rectangles[(y0, y1, color)] = \
+                        [x, y0, x + 1, y1, color]
+                    rectangles.append(rectangle)
+            return [tuple(rectangle) for rectangle in rectangles]
 
-    def __len__(self) -> int:
-        """
-        Returns size of LineSeries
-        :return: int
-        """
-        count = self.start_index
-        try:  # it feels like there should be a better way to do this
-            assert self.end_index is None or isinstance(self.end_index, int)
-            # while there is a next cell, and it is inside range
-            while self.__iter__().__next__() and \
-                    (self.end_index is None or count + 1 < self.end_index):
-                count += 1  # increment count
-        except StopIteration:
-            return count
+        def write_colors(self) -> None:
+            """
+            Commits colors set in snapshot to sheet, in one operation
+            per rectangle of equal color.
+            :return: None
+            """
+            for x0, y0, x1, y1, color in self.color_rectangles():
+                self._sheet.set_region_color(x0, y0, x1, y1, color)
+            self._colors.clear()
 
-    def get_by_name(self, name: int or float or str) -> 'Line':
-        """
-        Gets line from passed line name.
+        def get_column(self, x: int) -> 'Sheet.Snapshot.ColumnBuffer':
+            """
+            Gets ColumnBuffer storing values of column at index x.
+            Throws IndexError if x is outside range of snapshot.
+            :param x: int
+            :return: ColumnBuffer
+            """
+            if not 0 <= x < self._width:
+                raise IndexError(
+                    'Snapshot:get_column: %s is outside width of '
+                    'snapshot. (width:%s)' % (x, self._width))
+            return self._columns[x]
+
+        def get_column_values(
+                self,
+                x: int,
+                start: int=0,
+                stop: int=None
+        ) -> list:
+            """
+            Gets list of values in column x, from row index start to
+            stop (exclusive).
+            Throws IndexError if x is outside range of snapshot.
+            :param x: int
+            :param start: int
+            :param stop: int or None
+            :return: list
+            """
+            stop = self._height if stop is None else min(stop, self._height)
+            return self.get_column(x).values(start, stop)
+
+        def get_row_values(
+                self,
+                y: int,
+                start: int=0,
+                stop: int=None
+        ) -> list:
+            """
+            Gets list of values in row y, from column index start to
+            stop (exclusive).
+            Throws IndexError if y is outside range of snapshot.
+            :param y: int
+            :param start: int
+            :param stop: int or None
+            :return: list
+            """
+            if not 0 <= y < self._height:
+                raise IndexError(
+                    'Snapshot:get_row_values: %s is outside height of '
+                    'snapshot. (height:%s)' % (y, self._height))
+            return [column.get(y) for column in self._columns[start:stop]]
+
+        @property
+        def width(self) -> int:
+            return self._width
+
+        @property
+        def height(self) -> int:
+            return self._height
+
+    class ExtentIndex:
+        """
+        Index of the extent of each column and row of a snapshot;
+        the index of the last inhabited cell in each line, and the
+        gaps of at least MAX_CELL_GAP empty cells within it.
+        Line lengths found from the index are the same as those found
+        by iterating over the line with a CellLine, which ends at the
+        first such gap, but no cells need to be read.
+
+        The extent of a line is found from the snapshot in a single
+        pass when first needed, and is updated as values are set.
+        """
+
+        def __init__(self, snapshot: 'Sheet.Snapshot') -> None:
+            self._snapshot = snapshot
+            # axis: {line index: [last inhabited index, [(start, stop)]]}
+            self._extents = {'x': {}, 'y': {}}
+
+        def length(self, axis: str, index: int) -> int:
+            """
+            Gets length of line of cells along passed axis, as would be
+            found by iterating over it with a CellLine.
+            :param axis: str 'x' (row) or 'y' (column)
+            :param index: int index of row or column
+            :return: int
+            """
+            last, gaps = self.extent(axis, index)
+            return gaps[0][0] if gaps else last + 1
+
+        def extent(self, axis: str, index: int) -> list:
+            """
+            Gets extent of line of cells along passed axis.
+            :param axis: str 'x' (row) or 'y' (column)
+            :param index: int index of row or column
+            :return: list[int, list[tuple[int, int]]] of the last
+                inhabited index, and the (start, stop) of each gap.
+            """
+            extents = self._extents[axis]
+            try:
+                return extents[index]
+            except KeyError:
+                extent = extents[index] = self.find_extent(
+                    self._line_values(axis, index))
+                return extent
+
+        def _line_values(self, axis: str, index: int) -> list:
+            snapshot = self._snapshot
+            if axis == 'y':
+                if index >= snapshot.width:
+                    return []
+                return snapshot.get_column_values(index)
+            else:
+                if index >= snapshot.height:
+                    return []
+                return snapshot.get_row_values(index)
+
+        @staticmethod
+        def find_extent(values: list) -> list:
+            """
+            Finds extent of a line from its values.
+            :param values: list
+            :return: list[int, list[tuple[int, int]]]
+            """
+            last = -1
+            gaps = []
+            for i, value in enumerate(values):
+                if value is None or value == '':
+                    continue
+                if i - last > MAX_CELL_GAP:
+                    gaps.append((last + 1, i))
+                last = i
+            return [last, gaps]
+
+        def update(self, x: int, y: int, value) -> None:
+            """
+            Updates extents of the column and row containing cell at
+            x, y after its value is set.
+            :param x: int
+            :param y: int
+            :param value: int, float, str or None
+            :return: None
+            """
+            self._update_line(self._extents['y'], x, y, value)
+            self._update_line(self._extents['x'], y, x, value)
+
+        def column_changed(self, x: int) -> None:
+            """
+            Discards extents changed by setting many values of column x
+            at once; those of the column, and of all rows.
+            They are found again when needed.
+            :param x: int
+            :return: None
+            """
+            self._extents['y'].pop(x, None)
+            self._extents['x'].clear()
+
+        @staticmethod
+        def _update_line(extents: dict, index: int, i: int, value) -> None:
+            try:
+                extent = extents[index]
+            except KeyError:
+                return  # extent will be found when first needed
+            last, gaps = extent
+            if value is None or value == '':
+                if i <= last:
+                    # gaps may be joined; find extent again when needed.
+                    del extents[index]
+                return
+            if i > last:
+                if i - last > MAX_CELL_GAP:
+                    gaps.append((last + 1, i))
+                extent[0] = i
+                return
+            for n, (start, stop) in enumerate(gaps):
+                if start <= i < stop:  # split gap around value
+                    gaps[n:n + 1] = [
+                        gap for gap in ((start, i), (i + 1, stop))
+                        if gap[1] - gap[0] >= MAX_CELL_GAP
+                    ]
+                    return
+
+
+class LineSeries:
+    """Class storing collection of Line, Column, or Row objects"""
+
+    COLUMNS_STR = 'columns'
+    ROWS_STR = 'rows'
+
+    def __init__(
+            self,
+            reference_line: 'Line',
+            start_index: int=0,  # iterator start index
+            end_index: int=None,  # iterator end index (exclusive)
+    ) -> None:
+        if not isinstance(reference_line, Line):
+            raise TypeError('Expected LineSeries to be passed reference line.'
+                            'Got instead: %s' % repr(reference_line))
+        self.reference_line = reference_line
+        self.start_index = start_index
+        self.end_index = end_index
+
+    def __getitem__(self, item: int or float or str):
+        """
+        If item is int, returns line of that index, otherwise looks
+        for a line of that name.
+        :param item: int, float, or str
+        :return: Line or None
+        """
+        if isinstance(item, int):
+            return self.get_by_index(item)
+        else:
+            return self.get_by_name(item)
+
+    def __iter__(self):
+        """
+        Returns Generator that iterates over columns in LineSeries
+        :return: Generator<Line>
+        """
+        # find whether this is a series of rows or columns
+        if self.end_index is not None:
+            ref_cells = self.reference_line[self.start_index:self.end_index]
+        else:
+            ref_cells = self.reference_line[self.start_index:]
+        for cell in ref_cells:
+            if self._contents_type == LineSeries.COLUMNS_STR:
+                yield cell.column
+            if self._contents_type == LineSeries.ROWS_STR:
+                yield cell.row
+
+    def __len__(self) -> int:
+        """
+        Returns size of LineSeries
+        :return: int
+        """
+        count = self.start_index
+        try:  # it feels like there should be a better way to do this
+            assert self.end_index is None or isinstance(self.end_index, int)
+            # while there is a next cell, and it is inside range
+            while self.__iter__().__next__() and \
+                    (self.end_index is None or count + 1 < self.end_index):
+                count += 1  # increment count
+        except StopIteration:
+            return count
+
+    def get_by_name(self, name: int or float or str) -> 'Line':
+        """
+        Gets line from passed line name.
         Returns None if no line of that name is found.
         :param name: int, float or str
         :return: Line or None
         """
+        contents_type = self._contents_type
+        if self.reference_line is self._sheet_reference_line:
+            index = self.sheet.get_header_index(contents_type).get(name)
+            return self.get_by_index(index) if index is not None else None
         for cell in self.reference_line:
             if cell.value == name:
-                if self._contents_type == LineSeries.COLUMNS_STR:
+                if contents_type == LineSeries.COLUMNS_STR:
                     return cell.column
-                elif self._contents_type == LineSeries.ROWS_STR:
+                elif contents_type == LineSeries.ROWS_STR:
                     return cell.row
 
     def get_by_index(self, index: int) -> 'Line':
@@ -974,6 +2087,18 @@ class LineSeries:
         """
         return self.reference_line.sheet
 
+    @property
+    def _sheet_reference_line(self) -> 'Line':
+        """
+        Gets line of sheet which holds names of the lines in this
+        series; the sheet's reference row or column.
+        :return: Line
+        """
+        if self._contents_type == LineSeries.COLUMNS_STR:
+            return self.sheet.reference_row
+        else:
+            return self.sheet.reference_column
+
     @property
     def names(self):
         """
@@ -1022,7 +2147,8 @@ class Line(WorkBookComponent):
     Abstract class for a line of cells.
     Sub-classed by both Row and Column
     """
-    _all = {}  # overwritten in sub-classes.
+    _all = weakref.WeakValueDictionary()  # overwritten in sub-classes.
+    axis = None  # axis along which cells of line lie; overwritten
 
     def __init__(
         self,
@@ -1081,6 +2207,9 @@ class Line(WorkBookComponent):
 
     @WorkBookComponent.value_cache
     def __len__(self) -> int:
+        extents = self.sheet.extents
+        if extents is not None:
+            return extents.length(self.axis, self.index)
         count = 0
         for _ in self:
             count += 1
@@ -1094,7 +2223,7 @@ class Line(WorkBookComponent):
         :param index: int
         :return: bool
         """
-        return sheet, index in cls._all
+        return (sheet, index) in cls._all
 
     def slice(self, s: slice):  # return cell generator
         """
@@ -1102,12 +2231,13 @@ class Line(WorkBookComponent):
         :param s: slice
         :return: Generator[Cell]
         """
+        length = len(self)
         if s.start is None:
             start = 0
         else:
             start = s.start
         if s.stop is None:
-            stop = len(self)
+            stop = length
         else:
             stop = s.stop
         if s.step is not None:
@@ -1115,7 +2245,7 @@ class Line(WorkBookComponent):
         else:
             rng = range(start, stop)
         for i in rng:
-            if i in range(len(self)):
+            if 0 <= i < length:
                 yield self[i]
 
     def get_cell_by_index(self, index: int) -> 'Cell':
@@ -1129,9 +2259,16 @@ class Line(WorkBookComponent):
         # specific subclasses
 
     def get_cell_by_reference(self, reference: str or float or int) -> 'Cell':
-        for i, cell in enumerate(self._reference_line):
-            if cell.value == reference:
-                return self.get_cell_by_index(i)
+        """
+        Gets cell in Line whose position in the reference line holds
+        the passed value.
+        Returns None if no such cell exists.
+        :param reference: str, float or int
+        :return: Cell or None
+        """
+        i = self.sheet.get_header_index(self._header_contents_type)\
+            .get(reference)
+        return self.get_cell_by_index(i) if i is not None else None
 
     def get_iterator(self, axis: str) -> 'CellLine':
         assert axis == 'x' or axis == 'y'
@@ -1148,6 +2285,16 @@ class Line(WorkBookComponent):
         [cell.clear() for i, cell in enumerate(self)
          if i > self.name_cell_index or include_header]
 
+    @property
+    def _header_contents_type(self) -> str:
+        """
+        Gets contents type of the lines intersecting this Line;
+        'rows' for a Column, and 'columns' for a Row.
+        Implemented in sub-classes.
+        :return: str
+        """
+        raise NotImplementedError
+
     @property
     def _reference_line(self) -> 'Line':
         """
@@ -1164,11 +2311,10 @@ class Line(WorkBookComponent):
         Returns generator of duplicate cells in Column.
         :return: cells (iterator)
         """
-        cell_values = set()
-        for cell in self:
-            if cell.value_without_whitespace in cell_values:
-                yield cell
-            cell_values.add(cell.value_without_whitespace)
+        duplicate_indices, _ = ColumnScan.find_duplicates(
+            [cell.value for cell in self])
+        for i in duplicate_indices:
+            yield self.get_cell_by_index(i)
 
     @property
     def name_cell_index(self) -> int:
@@ -1194,7 +2340,7 @@ class Line(WorkBookComponent):
         and corresponding reference row values as keys.
         :return: dict
         """
-        return {line_cell.value: ref_cell.value for
+        return {ref_cell.value: line_cell.value for
                 line_cell, ref_cell in zip(self, self._reference_line)}
 
     def __repr__(self) -> str:
@@ -1226,7 +2372,8 @@ class Column(Line):
     """
     Abstract Column class, extended by Office.XW.Column and Office.Uno.Column
     """
-    _all = {}  # dict storing all unique sheet+index possibilities
+    _all = weakref.WeakValueDictionary()  # Columns in use by sheet+index
+    axis = 'y'
 
     @staticmethod
     def factory(sheet: 'Sheet', index: int, reference_index: int) -> 'Column':
@@ -1243,7 +2390,7 @@ class Column(Line):
         try:
             column = Column._all[column_key]
         except KeyError:
-            column = Office.get_column_class()(sheet, index, reference_index)
+            column = sheet.interface.Column(sheet, index, reference_index)
         return column
 
     def get_cell_by_index(self, index: int) -> 'Cell':
@@ -1262,6 +2409,10 @@ class Column(Line):
             )
         return self.sheet.get_cell((self.index, index))
 
+    @property
+    def _header_contents_type(self) -> str:
+        return LineSeries.ROWS_STR
+
     @property
     def _reference_line(self) -> 'Line':
         return self.reference_column
@@ -1284,7 +2435,8 @@ class Row(Line):
     """
     Abstract Row obj. Extended by Office.XW.Row and Office.Uno.Row
     """
-    _all = {}  # dict storing all unique sheet+index possibilities
+    _all = weakref.WeakValueDictionary()  # Rows in use by sheet+index
+    axis = 'x'
 
     @staticmethod
     def factory(sheet: 'Sheet', index: int, reference_index: int) -> 'Row':
@@ -1301,7 +2453,7 @@ class Row(Line):
         try:
             row = Row._all[row_key]
         except KeyError:
-            row = Office.get_row_class()(sheet, index, reference_index)
+            row = sheet.interface.Row(sheet, index, reference_index)
         return row
 
     def get_cell_by_index(self, index: int) -> 'Cell':
@@ -1320,6 +2472,10 @@ class Row(Line):
             )
         return self.sheet.get_cell((index, self.index))
 
+    @property
+    def _header_contents_type(self) -> str:
+        return LineSeries.COLUMNS_STR
+
     @property
     def _reference_line(self) -> 'Line':
         return self.reference_row
@@ -1345,8 +2501,13 @@ class Row(Line):
 
 
 class Cell(WorkBookComponent):
-    """ Class handling usage of a single cell in office worksheet """
-    _all_cells = {}  # dict of all created cells, prevents duplication
+    """
+    Class handling usage of a single cell in office worksheet.
+    A Cell is a light view of a sheet position, and holds no state of
+    its own; any number of Cells may exist for the same position, and
+    compare equal to each other.
+    """
+    __slots__ = 'sheet', 'position'
 
     def __init__(
             self,
@@ -1362,21 +2523,35 @@ class Cell(WorkBookComponent):
     def factory(sheet: Sheet, position: tuple) -> 'Cell':
         """
         Gets cell belonging to sheet, with passed position.
-        If a cell with the same sheet + position already exists,
-        returns that cell instead.
         :param sheet: Sheet
         :param position: tuple[int, int]
         :return: Cell
         """
-        # first try to return an existing cell
-        cell_key = repr(sheet), position
-        try:
-            cell = Cell._all_cells[cell_key]
-        except KeyError:
-            # if cell does not exist, create it
-            Cell._all_cells[cell_key] = cell = \
-                Office.get_cell_class()(sheet, position)
-        return cell
+        return sheet.interface.Cell(sheet, position)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Cell) and self.sheet is other.sheet and \
+            self.position == other.position
+
+    def __hash__(self) -> int:
+        return hash((id(self.sheet), self.position))
+
+    @staticmethod
+    def clear_cache(setter):
+        """
+        Decorator to be used by cell value setters.
+        Clears caches as WorkBookComponent.clear_cache does, and after
+        the value is set, informs the cell's sheet of the change.
+        :param setter: callable
+        :return: callable
+        """
+        setter = WorkBookComponent.clear_cache(setter)
+
+        def cell_setter_wrapper(o, *args, **kwargs) -> None:
+            setter(o, *args, **kwargs)
+            o.sheet.cell_changed(*o.position)
+
+        return cell_setter_wrapper
 
     def set_color(self, color: int or list or tuple or Color) -> None:
         """
@@ -1384,16 +2559,45 @@ class Cell(WorkBookComponent):
         integer (as in a color hex code),
         list or tuple (containing r,g,b values)
         or a Color obj.
+        If the sheet has a snapshot, the color is set in the snapshot,
+        and written along with other colors when it is written.
         :param color: int, list, tuple, or Color
         :return: None
         """
-        raise NotImplementedError
+        if isinstance(color, list):
+            color = tuple(color)
+        color = Color(color).color
+        snapshot = self.sheet.snapshot
+        if snapshot is not None:
+            snapshot.set_color(self.x, self.y, color)
+        else:
+            self._set_color(color)
 
     def get_color(self) -> int:
         """
         Gets color contained in cell as an integer.
         :return: int
         """
+        snapshot = self.sheet.snapshot
+        if snapshot is not None:
+            color = snapshot.get_color(self.x, self.y)
+            if color is not None:
+                return color
+        return self._get_color()
+
+    def _set_color(self, color: int) -> None:
+        """
+        Sets color of cell in the office program's sheet.
+        :param color: int
+        :return: None
+        """
+        raise NotImplementedError
+
+    def _get_color(self) -> int:
+        """
+        Gets color of cell from the office program's sheet.
+        :return: int
+        """
         raise NotImplementedError
 
     def remove_whitespace(self) -> None:
@@ -1424,7 +2628,7 @@ class Cell(WorkBookComponent):
         If cell contains a number, returns False.
         :return: bool
         """
-        return self.value_without_whitespace != self.value
+        return ColumnScan.has_whitespace(self.value)
 
     @property
     def value_without_whitespace(self) -> str:
@@ -1433,10 +2637,20 @@ class Cell(WorkBookComponent):
         If cell is not a string, returns value unchanged.
         :return:
         """
-        if isinstance(self.value, str):
-            return ' '.join(self.value.split())
+        return self.without_whitespace(self.value)
+
+    @staticmethod
+    def without_whitespace(value: int or float or str or None):
+        """
+        Gets passed value without unneeded whitespace.
+        If value is not a string, returns value unchanged.
+        :param value: int, float, str or None
+        :return: int, float, str or None
+        """
+        if isinstance(value, str):
+            return ' '.join(value.split())
         else:
-            return self.value
+            return value
 
     @property
     def value(self) -> int or float or str or None:
@@ -1532,7 +2746,7 @@ class Cell(WorkBookComponent):
         if Row.exists(self.sheet, self.y):
             yield self.row
         if Column.exists(self.sheet, self.x):
-            yield self.row
+            yield self.column
         yield self.sheet
 
     def __repr__(self) -> str:
@@ -1557,6 +2771,7 @@ class CellLine:
     index = None
     i = 0
     highest_inhabited_i = -1
+    length = None  # length of line, if known from sheet's extent index
 
     # max_i = 0
 
@@ -1571,6 +2786,9 @@ class CellLine:
         self.sheet = sheet
         self.axis = axis
         self.index = index
+        extents = sheet.extents
+        if extents is not None:
+            self.length = extents.length(axis, index)
 
     def __iter__(self):
         return self
@@ -1579,6 +2797,11 @@ class CellLine:
         # set starting x, y values
         x, y = (self.index, self.i) if self.axis == 'y' else \
             (self.i, self.index)
+        if self.length is not None:  # no need to look for a gap
+            if self.i >= self.length:
+                raise StopIteration()
+            self.i += 1
+            return self.sheet.get_cell((x, y))
         cell = self.sheet.get_cell((x, y))  # get first cell
         # if cell is empty, look to see if a cell with a value follows.
         if cell.string == '' and self.i > self.highest_inhabited_i:
@@ -1601,6 +2824,19 @@ class CellLine:
 class Interface:
     """Abstract class inherited from by XW and Uno interfaces."""
 
+    @classmethod
+    def bind(cls) -> None:
+        """
+        Binds classes of interface to it, so that objects created from
+        a Model or Sheet are of the same interface, without the
+        interface in use being detected again. This allows sheets of
+        different interfaces to be used together.
+        :return: None
+        """
+        for component_class in (
+                cls.Model, cls.Sheet, cls.Column, cls.Row, cls.Cell):
+            component_class.interface = cls
+
     class Model:
         pass
 
@@ -1687,14 +2923,14 @@ class Office:
                 if isinstance(item, str) and "::" in item:
                     # split and find book + name
                     book_name, sheet_name = item.split("::")
-                    return Sheet.factory(
+                    return self._get_sheet(
                         self.active_app.books[book_name].sheets[sheet_name]
                     )
                 else:
                     # otherwise just look everywhere
                     for sheet in self._xw_sheets:
                         if sheet.name == item:
-                            return Sheet.factory(
+                            return self._get_sheet(
                                 sheet
                             )
 
@@ -1726,7 +2962,7 @@ class Office:
                 :return: Sheet
                 """
                 for xw_sheet in self._xw_sheets:
-                    yield Sheet.factory(xw_sheet)
+                    yield self._get_sheet(xw_sheet)
 
             @property
             def sheet_names(self):
@@ -1746,16 +2982,18 @@ class Office:
                     self,
                     i7e_sheet,
                     reference_row_index=0,
-                    reference_column_index=0
+                    reference_column_index=0,
+                    document=None
             ) -> None:
                 super().__init__(
                     i7e_sheet=i7e_sheet,
                     reference_column_index=reference_column_index,
-                    reference_row_index=reference_row_index
+                    reference_row_index=reference_row_index,
+                    document=document
                 )
 
             @staticmethod
-            def key(i7e_sheet):
+            def key(i7e_sheet, document=None):
                 return 'Sheet[%s::%s]' % (
                     i7e_sheet.name,
                     i7e_sheet.book.fullname,
@@ -1769,6 +3007,27 @@ class Office:
             def screen_updating(self, new_bool: bool) -> None:
                 self.i7e_sheet.book.app.screen_updating = new_bool
 
+            @property
+            def used_size(self) -> tuple:
+                """
+                Gets (width, height) of used range of sheet.
+                :return: tuple[int, int]
+                """
+                last_cell = self.i7e_sheet.used_range.last_cell
+                return last_cell.column, last_cell.row
+
+            def _clear_region(self, x0, y0, x1, y1, contents, formats):
+                # xlwings ranges are addressed from 1, and inclusive
+                i7e_range = self.i7e_sheet.range((y0 + 1, x0 + 1), (y1, x1))
+                if contents:
+                    i7e_range.clear_contents()
+                if formats:
+                    i7e_range.color = None
+
+            def set_region_color(self, x0, y0, x1, y1, color):
+                i7e_range = self.i7e_sheet.range((y0 + 1, x0 + 1), (y1, x1))
+                i7e_range.color = Color(color).rgb if color >= 0 else None
+
             @Sheet.enduring_cache
             def __str__(self) -> str:
                 return 'Sheet[%s::%s]' % (
@@ -1783,42 +3042,24 @@ class Office:
                     self.i7e_sheet.book.fullname,
                 )
 
-            class Snapshot(Sheet.Snapshot):
-                """
-                Snapshot of an XW sheet.
-                """
-
-                def _get_values(self) -> list:
-                    assert isinstance(self._width, int)
-                    assert isinstance(self._height, int)
-                    assert (self._width == 0) == (self._height == 0)
-                    if self._width == 0 and self._height == 0:
-                        values = [[]]
-                    elif self._width == 1 and self._height == 1:
-                        values = [[self._sheet.i7e_sheet.range('A1').value]]
-                    elif self._height == 1:
-                        values = [self._sheet.i7e_sheet.range(
-                            'A1', (1, self._width)
-                        ).value]
-                    elif self._width == 1:
-                        values = [[value] for value in
-                                  self._sheet.i7e_sheet.range(
-                                  'A1', (self._height, 1)
-                                  )]
-                    elif self._width > 1 and self._height > 1:
-                        values = self._sheet.i7e_sheet.range(
-                            'A1',  # start cell
-                            (self._height, self._width)  # end cell
-                        ).value
-                    else:
-                        raise ValueError(
-                            'Snapshot:_get_values: width, height were %s, %s' %
-                            self._width, self._height)
-                    assert values is not None  # just sanity checking
-                    return values
-
-                def write(self):
-                    self._sheet.i7e_sheet.range('A1').value = self._values
+            def read_block(self, x0, y0, x1, y1):
+                if x1 <= x0 or y1 <= y0:
+                    return []
+                # xlwings ranges are addressed (row, column) from 1.
+                # a range of a single cell, row or column returns a
+                # value or a flat list, rather than a list of rows.
+                values = self.i7e_sheet.range(
+                    (y0 + 1, x0 + 1), (y1, x1)).value
+                if x1 - x0 == 1 and y1 - y0 == 1:
+                    values = [[values]]
+                elif y1 - y0 == 1:
+                    values = [values]
+                elif x1 - x0 == 1:
+                    values = [[value] for value in values]
+                return values
+
+            def write_block(self, x, y, rows):
+                self.i7e_sheet.range(y + 1, x + 1).value = rows
 
         class Line(Line):
             """
@@ -1868,15 +3109,16 @@ class Office:
             """
             XW Cell
             """
+            __slots__ = ()
 
-            def set_color(self, color: int or list or tuple) -> None:
+            def _set_color(self, color: int) -> None:
                 if color >= 0:
                     color = Color(color)
                     self._range.color = color.rgb
                 elif color == -1:
                     self._range.color = None
 
-            def get_color(self) -> int:
+            def _get_color(self) -> int:
                 color_int = self._range.color
                 if color_int is None:
                     color_int = -1
@@ -1895,7 +3137,6 @@ class Office:
                 return self.sheet.i7e_sheet.range(y, x)
 
             @property
-            @Cell.value_cache
             def value(self) -> int or float or str or None:
                 if self.sheet.snapshot:  # if sheet has a snapshot:
                     try:  # try to get value from snapshot
@@ -1945,17 +3186,23 @@ class Office:
             Handles usages of PyUno Model
             """
 
-            def __init__(self) -> None:
-                # not an error; provided by macro caller
-                # noinspection PyUnresolvedReferences
-                desktop = XSCRIPTCONTEXT.getDesktop()
-                py_uno_model = desktop.getCurrentComponent()
-                if not hasattr(py_uno_model, 'Sheets'):
+            def __init__(self, document=None) -> None:
+                """
+                Creates model of passed uno document, or of the current
+                document if none is passed.
+                :param document: PyUno document or None
+                """
+                if document is None:
+                    # not an error; provided by macro caller
+                    # noinspection PyUnresolvedReferences
+                    desktop = XSCRIPTCONTEXT.getDesktop()
+                    document = desktop.getCurrentComponent()
+                if not hasattr(document, 'Sheets'):
                     raise AttributeError(
                         'Model does not have Sheets. '
                         'This macro needs to be run from a calc workbook.'
                     )
-                self.model = py_uno_model
+                self.model = self.document = document
 
             def __getitem__(self, item: str or int) -> Sheet:
                 """
@@ -1970,7 +3217,7 @@ class Office:
                 # uno message.
                 if isinstance(item, int):
                     try:
-                        return Office.Uno.Sheet(
+                        return self._get_sheet(
                             self.model.Sheets.getByIndex(item))
                     except:  # can't seem to put the actual exception
                         # class here
@@ -1978,7 +3225,7 @@ class Office:
                                          '%s' % repr(item))
                 else:
                     try:
-                        return Office.Uno.Sheet(
+                        return self._get_sheet(
                             self.model.Sheets.getByName(item))
                     except:
                         raise KeyError('Could not retrieve sheet with name %s'
@@ -2010,7 +3257,7 @@ class Office:
                 i = 0
                 while True:  # loop until break
                     try:
-                        yield Office.Uno.Sheet(self.model.Sheets.getByIndex(i))
+                        yield self._get_sheet(self.model.Sheets.getByIndex(i))
                     except:
                         break
                     else:
@@ -2033,13 +3280,81 @@ class Office:
                     self,
                     i7e_sheet,
                     reference_row_index=0,
-                    reference_column_index=0
+                    reference_column_index=0,
+                    document=None
             ) -> None:
                 super().__init__(
                     i7e_sheet=i7e_sheet,
                     reference_row_index=reference_row_index,
-                    reference_column_index=reference_column_index
+                    reference_column_index=reference_column_index,
+                    document=document
+                )
+
+            # com.sun.star.sheet.CellFlags VALUE | DATETIME | STRING | FORMULA
+            CONTENT_FLAGS = 1 | 2 | 4 | 16
+
+            @staticmethod
+            def key(i7e_sheet, document=None):
+                # uno sheets do not refer to their document, so it is
+                # identified by the document passed from its model.
+                if document is None:
+                    return 'Sheet[%s]' % i7e_sheet.Name
+                return 'Sheet[%s::%s]' % (
+                    i7e_sheet.Name,
+                    getattr(document, 'RuntimeUID', None) or document.URL,
+                )
+
+            @Sheet.enduring_cache
+            def __str__(self) -> str:
+                return 'Sheet[%s]' % self.i7e_sheet.Name
+
+            @Sheet.enduring_cache  # this Sheet's repr should not change
+            def __repr__(self) -> str:
+                return self.key(self.i7e_sheet, self.document)
+
+            @property
+            def used_size(self) -> tuple:
+                """
+                Gets (width, height) of used area of sheet, found by
+                moving a cursor to the end of the used area.
+                :return: tuple[int, int]
+                """
+                cursor = self.i7e_sheet.createCursor()
+                cursor.gotoEndOfUsedArea(False)
+                address = cursor.getRangeAddress()
+                return address.EndColumn + 1, address.EndRow + 1
+
+            def _clear_region(self, x0, y0, x1, y1, contents, formats):
+                i7e_range = self.i7e_sheet.getCellRangeByPosition(
+                    x0, y0, x1 - 1, y1 - 1)
+                if contents:
+                    i7e_range.clearContents(self.CONTENT_FLAGS)
+                if formats:
+                    i7e_range.CellBackColor = DEFAULT_COLOR
+
+            def set_region_color(self, x0, y0, x1, y1, color):
+                self.i7e_sheet.getCellRangeByPosition(
+                    x0, y0, x1 - 1, y1 - 1).CellBackColor = color
+
+            def read_block(self, x0, y0, x1, y1):
+                if x1 <= x0 or y1 <= y0:
+                    return []
+                # data array is a tuple of row tuples; empty cells
+                # are returned as empty strings, and are read as None
+                # so that number columns with blanks stay packed.
+                return [[None if value == '' else value for value in row]
+                        for row in self.i7e_sheet.getCellRangeByPosition(
+                            x0, y0, x1 - 1, y1 - 1).getDataArray()]
+
+            def write_block(self, x, y, rows):
+                # uno does not accept None; empty cells are ''
+                data = tuple(
+                    tuple('' if value is None else value for value in row)
+                    for row in rows
                 )
+                self.i7e_sheet.getCellRangeByPosition(
+                    x, y, x + len(rows[0]) - 1, y + len(rows) - 1
+                ).setDataArray(data)
 
         class Line(Line):
             pass  # no methods defined here anymore,
@@ -2091,19 +3406,16 @@ class Office:
             """
             Handles usage of an individual cell
             """
-            def set_color(self, color):
+            __slots__ = ()
+
+            def _set_color(self, color: int) -> None:
                 """
                 Sets cell background color
-                :param color: int, list or tuple
+                :param color: int
                 """
-                assert isinstance(color, (int, tuple, list))
-                if isinstance(color, int):
-                    color_int = color
-                else:
-                    color_int = color[0] * 256 ** 2 + color[1] * 256 + color[2]
-                self._source_cell.CellBackColor = color_int
+                self._source_cell.CellBackColor = color
 
-            def get_color(self) -> int:
+            def _get_color(self) -> int:
                 return self._source_cell.CellBackColor
 
             @property
@@ -2123,12 +3435,16 @@ class Office:
                 return self._uno_sheet.getCellByPosition(*self.position)
 
             @property
-            @Cell.value_cache
             def value(self) -> int or float or str:
                 """
                 Gets value of cell.
                 :return: str or float
                 """
+                if self.sheet.snapshot:  # if sheet has a snapshot:
+                    try:  # try to get value from snapshot
+                        return self.sheet.snapshot.get_value(self.x, self.y)
+                    except IndexError:
+                        pass  # if it does not contain this cell x,y: get cell
                 # get cell value type after formula evaluation has been
                 # carried out. This will return the cell value's type
                 # even if it is not a formula
@@ -2148,18 +3464,37 @@ class Office:
                 :param new_value: int, float, or str
                 """
                 assert isinstance(new_value, (str, int, float))
+                if self.sheet.snapshot:  # if sheet has a snapshot
+                    try:
+                        self.sheet.snapshot.set_value(
+                            self.x, self.y, new_value)
+                        return
+                    except IndexError:
+                        pass  # if value outside snapshot bounds, set normally
                 if isinstance(new_value, str):
                     self.string = new_value
                 else:
                     self.float = new_value
 
             @property
-            @Cell.value_cache
             def string(self) -> str:
                 """
-                Returns string value directly from source cell
+                Returns string value directly from source cell, or
+                from snapshot if one contains this cell.
                 :return: str
                 """
+                if self.sheet.snapshot:
+                    try:
+                        value = self.sheet.snapshot.get_value(self.x, self.y)
+                    except IndexError:
+                        pass
+                    else:
+                        if value is None:
+                            return ''
+                        string = str(value)
+                        if isinstance(value, float) and string[-2:] == '.0':
+                            string = string[:-2]
+                        return string
                 return self._source_cell.getString()
 
             @string.setter
@@ -2170,15 +3505,30 @@ class Office:
                 :param new_string: str
                 """
                 assert isinstance(new_string, str)
+                if self.sheet.snapshot:
+                    try:
+                        self.sheet.snapshot.set_value(
+                            self.x, self.y, new_string)
+                        return
+                    except IndexError:
+                        pass
                 self._source_cell.setString(new_string)
 
             @property
-            @Cell.value_cache
             def float(self) -> float:
                 """
-                Returns float value directly from source cell 'value'
+                Returns float value directly from source cell 'value',
+                or from snapshot if one contains this cell.
                 :return: float
                 """
+                if self.sheet.snapshot:
+                    try:
+                        value = self.sheet.snapshot.get_value(self.x, self.y)
+                    except IndexError:
+                        pass
+                    else:
+                        return float(value) if \
+                            isinstance(value, (int, float)) else 0.
                 return self._source_cell.getValue()
 
             @float.setter
@@ -2191,25 +3541,449 @@ class Office:
                 """
                 assert isinstance(new_float, (int, float))
                 new_value = float(new_float)
+                if self.sheet.snapshot:
+                    try:
+                        self.sheet.snapshot.set_value(
+                            self.x, self.y, new_value)
+                        return
+                    except IndexError:
+                        pass
                 self._source_cell.setValue(new_value)
 
-    @staticmethod
-    def get_interface() -> str or None:
+    class Mem(Interface):
         """
-        Test for what interface is using this macro, and return the string
-        of the appropriate class that should be used.
-        :return: str or None if no interface can be determined
+        Handles an in-memory workbook, requiring no office program.
+        Intended for running and timing translations headlessly.
         """
-        # test for Python Uno
-        try:
-            XSCRIPTCONTEXT  # if this variable exists, PyUno is being used.
-        except NameError:
-            pass
-        else:
-            return 'Uno'
-
-        if xw is not None:
-            return 'XW'
+
+        class Grid:
+            """
+            Plain 2D storage of cell values and colors, standing in for
+            an office program's sheet object.
+            """
+            _ids = itertools.count()  # used to give each grid a unique id
+
+            def __init__(self, name: str, values: list=None) -> None:
+                if not isinstance(name, str):
+                    raise TypeError('Grid name should be a str. Got: %s'
+                                    % repr(name))
+                self.name = name
+                self.uid = next(Office.Mem.Grid._ids)
+                # list of rows, each a list of values. Rows may be ragged.
+                self.rows = [list(row) for row in values] if values else []
+                self.colors = {}  # (x, y): color int
+
+            def get_value(self, x: int, y: int) -> int or float or str or None:
+                """
+                Gets value at x, y, or None if nothing is stored there.
+                :param x: int
+                :param y: int
+                :return: int, float, str or None
+                """
+                try:
+                    return self.rows[y][x]
+                except IndexError:
+                    return None
+
+            def set_value(self, x: int, y: int, value) -> None:
+                """
+                Sets value at x, y, growing storage as needed.
+                :param x: int
+                :param y: int
+                :param value: int, float, str or None
+                :return: None
+                """
+                if y >= len(self.rows):
+                    self.rows.extend([] for _ in range(y + 1 - len(self.rows)))
+                row = self.rows[y]
+                if x >= len(row):
+                    row.extend([None] * (x + 1 - len(row)))
+                row[x] = value
+
+            def get_block(
+                    self,
+                    x: int,
+                    y: int,
+                    width: int,
+                    height: int
+            ) -> list:
+                """
+                Gets list of rows of values within the passed rectangle.
+                Positions outside of stored values are returned as None.
+                :param x: int
+                :param y: int
+                :param width: int
+                :param height: int
+                :return: list[list]
+                """
+                block = []
+                for row in self.rows[y:y + height]:
+                    values = row[x:x + width]
+                    if len(values) < width:
+                        values += [None] * (width - len(values))
+                    block.append(values)
+                block.extend([None] * width for _ in range(height - len(block)))
+                return block
+
+            def set_block(self, x: int, y: int, rows: list) -> None:
+                """
+                Sets values from passed list of rows, with the first
+                value of the first row placed at x, y.
+                :param x: int
+                :param y: int
+                :param rows: list[list]
+                :return: None
+                """
+                for i, values in enumerate(rows):
+                    if not values:
+                        continue
+                    self.set_value(x + len(values) - 1, y + i, None)  # grow
+                    self.rows[y + i][x:x + len(values)] = values
+
+            def set_region_color(
+                    self,
+                    x0: int,
+                    y0: int,
+                    x1: int,
+                    y1: int,
+                    color: int
+            ) -> None:
+                """
+                Sets color of each position from x0, y0 up to (but not
+                including) x1, y1.
+                :param x0: int
+                :param y0: int
+                :param x1: int
+                :param y1: int
+                :param color: int
+                :return: None
+                """
+                for x in range(x0, x1):
+                    for y in range(y0, y1):
+                        if color == DEFAULT_COLOR:
+                            self.colors.pop((x, y), None)
+                        else:
+                            self.colors[(x, y)] = color
+
+            def clear_region(
+                    self,
+                    x0: int,
+                    y0: int,
+                    x1: int,
+                    y1: int,
+                    contents: bool=True,
+                    formats: bool=True
+            ) -> None:
+                """
+                Clears values and / or colors from x0, y0 up to (but
+                not including) x1, y1.
+                :param x0: int
+                :param y0: int
+                :param x1: int
+                :param y1: int
+                :param contents: bool
+                :param formats: bool
+                :return: None
+                """
+                if contents:
+                    for row in self.rows[y0:y1]:
+                        n = len(row[x0:x1])
+                        row[x0:x0 + n] = [None] * n
+                if formats:
+                    for position in [
+                            (x, y) for x, y in self.colors
+                            if x0 <= x < x1 and y0 <= y < y1]:
+                        del self.colors[position]
+
+            @property
+            def width(self) -> int:
+                return max([len(row) for row in self.rows], default=0)
+
+            @property
+            def height(self) -> int:
+                return len(self.rows)
+
+        class Model(Model):
+            """
+            In-memory model, holding Grids by name.
+            """
+
+            def __init__(self, sheets: dict=None) -> None:
+                """
+                Creates model, optionally populated with sheets from a
+                dict of sheet name: list of rows of values.
+                :param sheets: dict[str, list[list]]
+                """
+                self.grids = collections.OrderedDict()
+                for name, values in (sheets or {}).items():
+                    self.add_sheet(name, values)
+
+            def add_sheet(self, name: str, values: list=None) -> 'Sheet':
+                """
+                Adds a new sheet to model and returns it.
+                :param name: str
+                :param values: list[list] or None
+                :return: Sheet
+                """
+                if name in self.grids:
+                    raise ValueError('Sheet %s already exists' % repr(name))
+                self.grids[name] = Office.Mem.Grid(name, values)
+                return self[name]
+
+            def __getitem__(self, item: str or int) -> Sheet:
+                """
+                Gets sheet by name or index.
+                :param item: str or int
+                :return: Sheet
+                """
+                if isinstance(item, int):
+                    try:
+                        grid = list(self.grids.values())[item]
+                    except IndexError:
+                        raise IndexError('Could not retrieve sheet at index '
+                                         '%s' % repr(item))
+                else:
+                    try:
+                        grid = self.grids[item]
+                    except KeyError:
+                        raise KeyError('Could not retrieve sheet with name %s'
+                                       % repr(item))
+                return self._get_sheet(grid)
+
+            def __iter__(self):
+                return self.sheets
+
+            def sheet_exists(self, *sheet_name: str) -> str:
+                """
+                Returns first passed sheet name that exists in model,
+                or None.
+                :param sheet_name: str
+                :return: str or None
+                """
+                for sheet_name_ in sheet_name:
+                    if sheet_name_ in self.grids:
+                        return sheet_name_
+
+            @property
+            def sheets(self):
+                """
+                Generator returning each sheet in Model
+                :return: Sheet
+                """
+                for grid in list(self.grids.values()):
+                    yield self._get_sheet(grid)
+
+            @property
+            def sheet_names(self):
+                """
+                Gets iterable of sheet names in Model
+                :return: iterator
+                """
+                return iter(list(self.grids))
+
+        class Sheet(Sheet):
+            """
+            In-memory Sheet, whose i7e_sheet is a Grid.
+            """
+            threaded_io = True
+            forks_workers = True
+
+            def __init__(
+                    self,
+                    i7e_sheet,
+                    reference_row_index=0,
+                    reference_column_index=0,
+                    document=None
+            ) -> None:
+                super().__init__(
+                    i7e_sheet=i7e_sheet,
+                    reference_row_index=reference_row_index,
+                    reference_column_index=reference_column_index,
+                    document=document
+                )
+
+            @staticmethod
+            def key(i7e_sheet, document=None):
+                return 'Sheet[%s::mem%s]' % (i7e_sheet.name, i7e_sheet.uid)
+
+            def __str__(self) -> str:
+                return 'Sheet[%s]' % self.i7e_sheet.name
+
+            def __repr__(self) -> str:
+                return self.key(self.i7e_sheet)
+
+            @property
+            def used_size(self) -> tuple:
+                """
+                Gets (width, height) of grid storing sheet values.
+                :return: tuple[int, int]
+                """
+                return self.i7e_sheet.width, self.i7e_sheet.height
+
+            def _clear_region(self, x0, y0, x1, y1, contents, formats):
+                self.i7e_sheet.clear_region(x0, y0, x1, y1, contents, formats)
+
+            def set_region_color(self, x0, y0, x1, y1, color):
+                self.i7e_sheet.set_region_color(x0, y0, x1, y1, color)
+
+            def read_block(self, x0, y0, x1, y1):
+                if x1 <= x0 or y1 <= y0:
+                    return []
+                return self.i7e_sheet.get_block(x0, y0, x1 - x0, y1 - y0)
+
+            def write_block(self, x, y, rows):
+                self.i7e_sheet.set_block(x, y, rows)
+
+        class Line(Line):
+            pass  # kept for MRO purposes, as in XW and Uno
+
+        class Column(Line, Column):
+            """
+            In-memory Column
+            """
+            def __init__(
+                    self,
+                    sheet: Sheet,
+                    column_index: int,
+                    reference_column_index: int=0):
+                super().__init__(
+                    sheet=sheet,
+                    index=column_index,
+                    reference_index=reference_column_index
+                )
+
+            def __iter__(self):
+                return self.get_iterator(axis='y')
+
+        class Row(Line, Row):
+            """
+            In-memory Row
+            """
+            def __init__(
+                    self,
+                    sheet: Sheet,
+                    row_index: int,
+                    reference_row_index: int=0
+            ) -> None:
+                super().__init__(
+                    sheet=sheet,
+                    index=row_index,
+                    reference_index=reference_row_index,
+                )
+
+            def __iter__(self):
+                return self.get_iterator(axis='x')
+
+        class Cell(Cell):
+            """
+            In-memory Cell
+            """
+            __slots__ = ()
+
+            def _set_color(self, color: int) -> None:
+                if color == DEFAULT_COLOR:
+                    self._grid.colors.pop(self.position, None)
+                else:
+                    self._grid.colors[self.position] = color
+
+            def _get_color(self) -> int:
+                return self._grid.colors.get(self.position, DEFAULT_COLOR)
+
+            @property
+            def _grid(self) -> 'Office.Mem.Grid':
+                """
+                Gets Grid storing this cell's values
+                :return: Office.Mem.Grid
+                """
+                return self.sheet.i7e_sheet
+
+            @property
+            def value(self) -> int or float or str or None:
+                if self.sheet.snapshot:  # if sheet has a snapshot:
+                    try:  # try to get value from snapshot
+                        return self.sheet.snapshot.get_value(self.x, self.y)
+                    except IndexError:
+                        pass  # if it does not contain this cell x,y: use grid
+                return self._grid.get_value(self.x, self.y)
+
+            @value.setter
+            @Cell.clear_cache
+            def value(self, new_v) -> None:
+                if self.sheet.snapshot:  # if sheet has a snapshot
+                    try:
+                        self.sheet.snapshot.set_value(self.x, self.y, new_v)
+                        return
+                    except IndexError:
+                        pass  # if value outside snapshot bounds, set normally
+                self._grid.set_value(self.x, self.y, new_v)
+
+            @property
+            def float(self):
+                value = self.value
+                if isinstance(value, (int, float)):
+                    return float(value)
+                else:
+                    return 0.
+
+            @float.setter
+            def float(self, new_float: int or float) -> None:
+                assert isinstance(new_float, (int, float))
+                self.value = float(new_float)
+
+            @property
+            def string(self):
+                value = self.value
+                if value is not None:
+                    string = str(value)
+                    # remove unneeded digits, as XW does
+                    if isinstance(value, float) and string[-2:] == '.0':
+                        string = string[:-2]
+                    return string
+                else:
+                    return ''
+
+            @string.setter
+            def string(self, new_string: str) -> None:
+                assert isinstance(new_string, str)
+                self.value = new_string
+
+    selected_interface = None  # name of explicitly selected interface
+
+    @staticmethod
+    def select_interface(interface_name: str or None) -> None:
+        """
+        Explicitly selects the interface to be used, ie; 'Mem' to run
+        without an office program. Passing None returns to detecting
+        the interface in use.
+        :param interface_name: str or None
+        :return: None
+        """
+        if interface_name is not None and not (
+                isinstance(getattr(Office, interface_name, None), type) and
+                issubclass(getattr(Office, interface_name), Interface)):
+            raise ValueError('Unknown interface: %s' % repr(interface_name))
+        Office.selected_interface = interface_name
+
+    @staticmethod
+    def get_interface() -> str or None:
+        """
+        Test for what interface is using this macro, and return the string
+        of the appropriate class that should be used.
+        :return: str or None if no interface can be determined
+        """
+        if Office.selected_interface is not None:
+            return Office.selected_interface
+
+        # test for Python Uno
+        try:
+            XSCRIPTCONTEXT  # if this variable exists, PyUno is being used.
+        except NameError:
+            pass
+        else:
+            return 'Uno'
+
+        if xw is not None:
+            return 'XW'
 
         # otherwise, return None / False
 
@@ -2219,7 +3993,8 @@ class Office:
         interface = Office.get_interface()  # gets str name of interface class
         if not interface:
             raise ValueError('Should be run as macro using XLWings or PyUno.'
-                             'Neither could be detected.')
+                             'Neither could be detected, and no interface '
+                             'was selected.')
         return getattr(Office, interface)
 
     @staticmethod
@@ -2252,6 +4027,11 @@ class Office:
         return Office.get_interface_class().Cell
 
 
+Office.XW.bind()
+Office.Uno.bind()
+Office.Mem.bind()
+
+
 ###############################################################################
 # Column Data
 
@@ -2277,7 +4057,18 @@ class Translation:
             read_log: bool=False,
             write_log: bool=False,
             log_group: str=None,
+            interactive: bool=True,
+            check_pool: str=CHECK_SERIAL_STR,
+            check_workers: int=None,
     ):
+        """
+        Creates translation.
+        If interactive is False, no dialogs are raised; feedback is
+        printed instead, and overwriting of target cells is assumed to
+        be ok. This allows translations to be run headlessly.
+        Source columns are checked on the pool named by check_pool
+        (one of CHECK_POOLS), with up to check_workers workers.
+        """
 
         if not isinstance(source_sheet, Sheet):
             raise TypeError('Source sheet should be a Sheet, got: %s'
@@ -2285,6 +4076,9 @@ class Translation:
         if not isinstance(target_sheet, Sheet):
             raise TypeError('Target sheet should be a Sheet, got: %s'
                             % repr(source_sheet))
+        if check_pool not in CHECK_POOLS:
+            raise ValueError('Check pool should be one of %s. Got: %s'
+                             % (CHECK_POOLS, repr(check_pool)))
         self._dialog_parent = dialog_parent
         self._source_sheet = source_sheet
         self._target_sheet = target_sheet
@@ -2298,22 +4092,55 @@ class Translation:
         self.read_log = read_log
         self.write_log = write_log
         self.log_group = log_group
+        self.interactive = interactive
+        self.check_pool = check_pool
+        self.check_workers = check_workers
         self.row_log = RowLog(OS.get_log_dir_path()) if \
             read_log or write_log else None
-        self._source_sheet.take_snapshot()  # take snapshot of source sheet
         # create column translations from passed list of dicts
         # in settings
         self._column_translations = []
         self.add_column_translation(*column_translations)
 
-        self.translation_rows = {}  # y_index: set(x_indices)
-        self.cell_translation_generators = []  # x_index: generator
-        self.cell_translations = {}  # src_pos: CellTranslation
-
-        self._get_cell_generators()
-        self._generate_cell_translations()
+        # values of each column translation's source column, as will
+        # be placed in its target column, from source row _row_offset.
+        self._column_values = []
+        self._row_offset = 0
+        self._row_mask = bytearray()  # 1 for each source row to be moved
+        # target row of the first source row to be moved
+        self._target_row = target_start_row
+        # (src_x, src_y, cell color, row color); src_y is an index into
+        # _column_values.
+        self._highlights = []
+        # positions found in source sheet, for feedback
+        self._duplicate_positions = []
+        self._whitespace_positions = []
+        # row of first occurrence of each duplicate's value, by position
+        self._duplicate_first_rows = {}
+        # if set, list of dicts of value: first row for each column
+        # translation, carried between scans for duplicates.
+        self._duplicate_indexes = None
+        self._prepare()
+
+    def _prepare(self) -> None:
+        """
+        Reads source columns from a snapshot of the source sheet, and
+        checks them for duplicates and whitespace. Rows are moved to
+        the target sheet on commit.
+        :return: None
+        """
+        self._source_sheet.take_snapshot()  # take snapshot of source sheet
+        self._read_source_columns()
+        self._check_rows()
         self._source_sheet.discard_snapshot()  # we're done with source sheet
+        self._feedback()
 
+    def _check_rows(self) -> None:
+        """
+        Checks rows in source column values for duplicates and
+        whitespace, and acts on those found.
+        :return: None
+        """
         if self.duplicate_action == DUPLICATE_HIGHLIGHT_STR:
             self._highlight_translation_rows_with_duplicates()
         elif self.duplicate_action == DUPLICATE_REMOVE_ROW_STR:
@@ -2324,107 +4151,190 @@ class Translation:
         elif self.whitespace_action == WHITESPACE_REMOVE_STR:
             self._remove_whitespace_in_translation_rows()
 
+    def _feedback(self) -> None:
+        """
+        Reports duplicates and whitespace found to user.
+        :return: None
+        """
+        self._duplicates_feedback(self._duplicate_positions)
+        self._whitespace_feedback(self._whitespace_positions)
+
     def commit(self):
         print('committing translations')
         self.target_sheet.take_snapshot()
-        self.clear_target()
-        self._apply_translation_rows()
+        if not self.clear_target():
+            self.target_sheet.discard_snapshot()
+            return
+        self._target_row = self._target_start_row
+        self._apply_column_translations()
+        self._apply_highlights()
         if self.write_log:  # write log if that setting is set by user.
-            self.row_log.make_log(self.log_group, self.target_sheet)
+            # the translated rows end the logged table; the target
+            # need not be measured again.
+            self.row_log.make_log(
+                self.log_group, self.target_sheet,
+                self._target_row + self._row_mask.count(1))
         self.target_sheet.write_snapshot()
 
-    def _apply_translation_rows(self):
-        for y in self.translation_rows:
-            t_row = self.translation_rows[y]
-            assert isinstance(t_row, TranslationRow)
-            t_row.apply(self.target_sheet, y)
-
-    def _get_cell_generators(self):
-        for column_translation in self.column_translations:
-            assert isinstance(column_translation, ColumnTranslation)
-            self.cell_translation_generators.append(
-                column_translation.get_generator())
-
-    def _generate_cell_translations(self):
-        print('mapping row translations')
-        y = self._source_start_row
-        while any([generator.has_next() for generator in
-                   self.cell_translation_generators]):
-            row = TranslationRow()
-            for generator in self.cell_translation_generators:
-                assert isinstance(generator, CellGenerator)
-                if not generator.has_next():
-                    continue
-                cell_translation = generator.next()
-                self.cell_translations[cell_translation.src_pos] = \
-                    cell_translation
-                row.add_cell_translation(cell_translation)
-            self.translation_rows[y] = row
+    @property
+    def _first_row(self) -> int:
+        """
+        Gets index in column values of the first source row to be
+        moved.
+        :return: int
+        """
+        return max(self._source_start_row - self._row_offset, 0)
+
+    def _read_source_columns(self):
+        """
+        Reads values of each source column as a whole, and marks each
+        source row from the source start row onwards to be moved.
+        :return: None
+        """
+        print('reading source columns')
+        self._column_values = [
+            column_translation.get_source_values()
+            for column_translation in self._column_translations
+        ]
+        self._mark_rows()
+        print('done reading source columns')
+
+    def _mark_rows(self) -> None:
+        """
+        Marks each row of column values from the first source row
+        onwards to be moved.
+        :return: None
+        """
+        n_rows = max([len(values) for values in self._column_values],
+                     default=0)
+        start = self._first_row
+        self._row_mask = bytearray(n_rows)
+        if n_rows > start:
+            self._row_mask[start:] = b'\x01' * (n_rows - start)
+
+    def _apply_column_translations(self):
+        """
+        Places values of each source column into its target column,
+        one column at a time. Rows that have been removed are left
+        out, so that the moved rows are placed contiguously from the
+        target start row.
+        :return: None
+        """
+        start = self._first_row
+        mask = self._row_mask[start:]
+        compact = mask.count(0) > 0
+        columns = {}  # target x: values
+        for column_translation, values in zip(
+                self._column_translations, self._column_values):
+            values = values[start:]
+            if compact:
+                values = list(itertools.compress(values, mask))
+            if values:
+                columns[column_translation.target_column.index] = values
+        self._write_target_columns(columns)
+
+    def _write_target_columns(self, columns: dict) -> None:
+        """
+        Places passed values of target columns into the target
+        snapshot, from the target row.
+        :param columns: dict of target column index: list of values
+        :return: None
+        """
+        snapshot = self.target_sheet.snapshot
+        for x, values in columns.items():
+            snapshot.set_column(x, values, self._target_row)
+
+    def _target_rows(self) -> list:
+        """
+        Gets the target row index of each source row, once removed
+        rows have been left out.
+        :return: list of target row indices, by source row index;
+            None for rows that are not moved.
+        """
+        target_rows = [None] * len(self._row_mask)
+        y = self._target_row
+        for src_y in itertools.compress(
+                range(len(self._row_mask)), self._row_mask):
+            target_rows[src_y] = y
             y += 1
-        print('done mapping row translations')
+        return target_rows
+
+    def _apply_highlights(self):
+        """
+        Colors target cells of source cells that were highlighted, and
+        the other moved cells in their rows, unless those have already
+        been colored by another highlight. (The target region has been
+        cleared of colors by clear_target.) Colors are set in the target
+        snapshot, and written with it.
+        :return: None
+        """
+        if not self._highlights:
+            return
+        target_rows = self._target_rows()
+        columns = [
+            (column_translation.source_column.index,
+             column_translation.target_column.index,
+             len(values))
+            for column_translation, values in zip(
+                self._column_translations, self._column_values)
+        ]
+        colors = {}  # target position: color
+        for src_x, src_y, cell_color, row_color in self._highlights:
+            if src_y >= len(target_rows) or target_rows[src_y] is None:
+                continue  # row is not moved
+            for column_src_x, tgt_x, length in columns:
+                if src_y >= length:
+                    continue
+                position = tgt_x, target_rows[src_y]
+                if column_src_x == src_x:
+                    colors[position] = cell_color
+                elif row_color != DEFAULT_COLOR and \
+                        position not in colors:
+                    colors[position] = row_color
+        self._write_target_colors(colors)
+
+    def _write_target_colors(self, colors: dict) -> None:
+        """
+        Sets passed colors of target cells in the target snapshot.
+        :param colors: dict of target position: color
+        :return: None
+        """
+        for position, color in colors.items():
+            self.target_sheet.get_cell(position).set_color(color)
 
     def _highlight_translation_rows_with_whitespace(self):
         whitespace_positions = list(self.get_whitespace_positions())
-        assert isinstance(whitespace_positions, list)
-        for item in whitespace_positions:
-            assert isinstance(item, tuple), 'got: %s' % item
-            assert len(item) == 2, 'got: %s' % item
-        for pos in whitespace_positions:
-            try:
-                cell_t = self.cell_translations[pos]
-            except KeyError:
-                continue
-            assert isinstance(cell_t, CellTranslation)
-            row = cell_t.row
-            assert isinstance(row, TranslationRow)
-            row.color_cell_and_row(
-                pos[0],
-                WHITESPACE_CELL_COLOR,
-                WHITESPACE_ROW_COLOR,
-            )
-        self._whitespace_feedback(whitespace_positions)
+        self._highlights.extend(
+            (x, y - self._row_offset,
+             WHITESPACE_CELL_COLOR, WHITESPACE_ROW_COLOR)
+            for x, y in whitespace_positions
+        )
+        self._whitespace_positions.extend(whitespace_positions)
 
     def _remove_whitespace_in_translation_rows(self):
-        whitespace_positions = list(self.get_whitespace_positions())
-        for pos in whitespace_positions:
-            try:
-                cell_t = self.cell_translations[pos]
-                assert isinstance(cell_t, CellTranslation)
-                cell_t.add_transform(lambda cell: cell.remove_whitespace())
-            except KeyError:
-                continue
-        self._whitespace_feedback(whitespace_positions)
+        for i, x, mask, cleaned_values in self._find_whitespace():
+            self._whitespace_positions.extend(
+                (x, y + self._row_offset)
+                for y in itertools.compress(range(len(mask)), mask))
+            self._column_values[i] = cleaned_values
 
     def _highlight_translation_rows_with_duplicates(self):
         duplicate_positions = list(self.get_duplicate_positions())
-        for pos in duplicate_positions:
-            try:
-                cell_t = self.cell_translations[pos]
-            except KeyError:
-                continue
-            assert isinstance(cell_t, CellTranslation)
-            row = cell_t.row
-            assert isinstance(row, TranslationRow)
-            row.color_cell_and_row(
-                pos[0],
-                DUPLICATE_CELL_COLOR,
-                DUPLICATE_ROW_COLOR
-            )
-        self._duplicates_feedback(duplicate_positions)
+        self._highlights.extend(
+            (x, y - self._row_offset,
+             DUPLICATE_CELL_COLOR, DUPLICATE_ROW_COLOR)
+            for x, y in duplicate_positions
+        )
+        self._duplicate_positions.extend(duplicate_positions)
 
     def _remove_translation_rows_with_duplicates(self):
         duplicate_positions = list(self.get_duplicate_positions())
-        for pos in duplicate_positions:
-            try:
-                cell_t = self.cell_translations[pos]
-            except KeyError:
-                continue
-            row = cell_t.row
-            for y in self.translation_rows:
-                if self.translation_rows[y] is row:
-                    del self.translation_rows[y]
-                    break
-        self._duplicates_feedback(duplicate_positions)
+        for x, y in duplicate_positions:
+            i = y - self._row_offset
+            if i < len(self._row_mask) and self._row_mask[i]:
+                self._row_mask[i] = 0
+                self._row_deletions.add(y)
+        self._duplicate_positions.extend(duplicate_positions)
 
     def get_duplicate_positions(self):
         """
@@ -2432,28 +4342,92 @@ class Translation:
         :return: iterator of tuples
         """
         print('looking for duplicate cells')
-        for column_translation in self._column_translations:
-            assert isinstance(column_translation, ColumnTranslation)
-            if not column_translation.check_for_duplicates:
-                continue
-            for duplicate_cell in \
-                    column_translation.get_duplicate_source_cells():
-                assert isinstance(duplicate_cell, Cell)
-                yield duplicate_cell.position
+        checked = [(i, column_translation.source_column.index)
+                   for i, column_translation in
+                   enumerate(self._column_translations)
+                   if column_translation.check_for_duplicates]
+        pool = self.check_pool
+        if self._duplicate_indexes is not None and \
+                pool in (CHECK_PROCESSES_STR, CHECK_AUTO_STR):
+            # carried indexes are updated by each scan, so they must be
+            # scanned in this process.
+            pool = CHECK_THREADS_STR
+        # long columns are only partitioned between forked workers if
+        # worker processes were asked for, and never in office hosts.
+        partition = \
+            self.check_pool in (CHECK_PROCESSES_STR, CHECK_AUTO_STR) and \
+            self._source_sheet.forks_workers and \
+            self._target_sheet.forks_workers
+        results = ColumnScan.map_columns(
+            ColumnScan.find_duplicates,
+            [(self._column_values[i],
+              self._first_row,
+              self._duplicate_indexes[i] if
+              self._duplicate_indexes is not None else None,
+              self._row_offset,
+              partition) for i, _ in checked],
+            pool, self.check_workers)
+        read_log = self.read_log and self.log_group is not None and \
+            self.log_group in self.row_log.group_names
+        for (i, x), (duplicate_rows, first_rows) in zip(checked, results):
+            for y, first_y in zip(duplicate_rows, first_rows):
+                self._duplicate_first_rows[(x, y)] = first_y
+                yield x, y
+            if read_log:
+                yield from self._find_logged_duplicates(i, x, duplicate_rows)
         print('done looking for duplicates')
 
+    def _find_logged_duplicates(self, i: int, x: int, duplicate_rows: list):
+        """
+        Finds rows of a column translation's source values whose values
+        were previously logged in the log group, in the column with
+        the translation's target column name.
+        Rows already found to be duplicates within the sheet are not
+        looked up.
+        :param i: int index of column translation
+        :param x: int source column index
+        :param duplicate_rows: list[int] of rows already found
+        :return: iterator of tuples
+        """
+        column_name = self._column_translations[i].target_column_name
+        found = set(duplicate_rows)
+        values = self._column_values[i]
+        for i_y in range(self._first_row, len(values)):
+            y = i_y + self._row_offset
+            value = Cell.without_whitespace(values[i_y])
+            if y in found or value is None or value == '':
+                continue
+            if any(self.row_log.find_duplicates(
+                    value, self.log_group, column_name)):
+                yield x, y
+
     def get_whitespace_positions(self):
         """
         Returns lists of tuples of positions
         :return: iterator of tuples
         """
+        for _, x, mask, _ in self._find_whitespace():
+            for y in itertools.compress(range(len(mask)), mask):
+                yield x, y + self._row_offset
+
+    def _find_whitespace(self):
+        """
+        Scans each source column that is checked for whitespace.
+        :return: iterator of tuples of column translation index,
+            source column index, bytearray mask of rows with
+            whitespace, and list of column values without it.
+        """
         print('looking for whitespace in cells')
-        for column_translation in self._column_translations:
-            assert isinstance(column_translation, ColumnTranslation)
-            if not column_translation.check_for_whitespace:
-                continue
-            for cell in column_translation.get_whitespace_source_cells():
-                yield cell.position
+        checked = [(i, column_translation.source_column.index)
+                   for i, column_translation in
+                   enumerate(self._column_translations)
+                   if column_translation.check_for_whitespace]
+        results = ColumnScan.map_columns(
+            ColumnScan.find_whitespace,
+            [(self._column_values[i], self._first_row) for i, _ in checked],
+            self.check_pool, self.check_workers)
+        for (i, x), (mask, cleaned_values) in zip(checked, results):
+            yield i, x, mask, cleaned_values
         print('done looking for whitespace')
 
     def _confirm_overwrite(self):
@@ -2528,27 +4502,27 @@ class Translation:
                 )
             )
 
-    def clear_target(self):
+    def clear_target(self) -> bool:
         """
-        Clears target sheet of conflicting cell data
+        Clears target sheet of conflicting cell data, below the target
+        start row, in a single clear of that region.
         Raises dialog for user to ok if anything is to be deleted.
+        :return: bool; False if the user did not ok the deletion.
         """
-        user_ok = False  # whether user has been presented with dialog
-        for column in self._target_sheet.columns:
-            assert isinstance(column, Column)
-            for cell in column:
-                if cell.y < self._target_start_row:
-                    continue
-                if not user_ok and cell.value != '':
-                    # if user has not yet ok'd deletion of cells:
-                    if self._confirm_overwrite:
-                        print('confirm dlg')
-                        proceed = self._confirm_overwrite()
-                        if not proceed:
-                            return False
-                    user_ok = True
-                cell.value = ''
-                cell.set_color(DEFAULT_COLOR)
+        sheet = self._target_sheet
+        if sheet.snapshot is not None:
+            width, height = sheet.snapshot.width, sheet.snapshot.height
+        else:
+            width, height = sheet.used_size or \
+                (len(sheet.reference_row), len(sheet.reference_column))
+        y0 = self._target_start_row
+        if self.interactive and \
+                not sheet.region_is_empty(0, y0, width, height):
+            print('confirm dlg')
+            if not self._confirm_overwrite():
+                return False
+        sheet.clear_region(0, y0, width, height)
+        return True
 
     def _whitespace_feedback(self, whitespace_positions):
         """
@@ -2572,8 +4546,7 @@ class Translation:
                 '%s Cell values were highlighted in '
                 'checked '
                 'columns' % len(whitespace_positions))
-        InfoMessage(
-            parent=self._dialog_parent,
+        self._report(
             title='Whitespace Found',
             main='Whitespace found in %s cells' % len(
                 whitespace_positions),
@@ -2603,38 +4576,65 @@ class Translation:
                 [pos[1] for pos in duplicate_positions]))
             secondary_string = '%s Cell rows containing duplicate ' \
                                'values were removed' % n_rows_w_duplicates
-        InfoMessage(
-            parent=self._dialog_parent,
+        self._report(
             title='Duplicate Values',
             main='%s Duplicate cell values found' % len(duplicate_positions),
             secondary=secondary_string,
-            detail=self._position_report(*duplicate_positions)
+            detail=self._position_report(
+                *duplicate_positions, first_rows=self._duplicate_first_rows)
         )
 
-    def _position_report(self, *src_positions):
+    def _report(self, title, main, secondary='', detail='') -> None:
+        """
+        Displays feedback to user, or prints it if translation is not
+        interactive.
+        :param title: str
+        :param main: str
+        :param secondary: str
+        :param detail: str
+        :return: None
+        """
+        if self.interactive:
+            InfoMessage(
+                parent=self._dialog_parent,
+                title=title,
+                main=main,
+                secondary=secondary,
+                detail=detail
+            )
+        else:
+            print('\n'.join(s for s in (title, main, secondary, detail) if s))
+
+    def _position_report(self, *src_positions, first_rows: dict=None):
         """
         Converts iterable of positions into a more user-friendly
         report.
         output should consist of a list of row numbers, each with
-        the names of the column containing passed position
+        the names of the column containing passed position.
+        If first_rows is passed, the row of the first occurrence of
+        each position's value is given after the column name.
         :param positions: tuples (int x, int y)
+        :param first_rows: dict of position: first occurrence row index
         :return: str
         """
-
-        rows = []  # list of row indices in report.
-        # This keeps the columns in order.
-        row_columns = {}  # dictionary of string lists
+        # row index: list of column strings; kept in order of rows.
+        row_columns = collections.OrderedDict()
+        column_names = {}  # x: column name
         for x, y in src_positions:
-            column_name = self._source_sheet.get_column(x).name
-            y += 1  # convert to office 1-base index
-            if y not in rows:
-                row_columns[y] = list()
-                rows.append(y)
-            row_columns[y].append(column_name)
+            try:
+                column_name = column_names[x]
+            except KeyError:
+                column_name = column_names[x] = \
+                    str(self._source_sheet.get_column(x).name)
+            if first_rows and (x, y) in first_rows:
+                # convert to office 1-base index
+                column_name = '%s (first in row %s)' % (
+                    column_name, first_rows[(x, y)] + 1)
+            row_columns.setdefault(y + 1, []).append(column_name)
         # now make the report
         row_strings = [
-            'Row %s; %s' % (y, ', '.join(row_columns[y]))
-            for y in rows]
+            'Row %s; %s' % (y, ', '.join(columns))
+            for y, columns in row_columns.items()]
         return '\n'.join(row_strings)
 
     @property
@@ -2768,6 +4768,238 @@ class Translation:
         return self._tgt_cell_transforms.copy()
 
 
+class StreamingTranslation(Translation):
+    """
+    Translation that moves rows from source to target sheet one window
+    of rows at a time, so that memory used is bound by the size of a
+    window, rather than by the length of the source sheet.
+    Each window of source rows is read, checked, and written to the
+    target sheet before the next is read; no snapshot of either sheet
+    is taken. Duplicates are found using an index of values that is
+    carried from one window to the next.
+    Nothing is read from the source sheet until commit, and feedback
+    is given once all windows have been moved.
+    Where both sheets allow it, the next window is read, and finished
+    windows are written, by worker threads while the current window is
+    checked, so that time taken approaches the greater of the time
+    spent on sheet reads and writes, and the time spent on checks,
+    rather than their sum.
+    """
+    DFT_WINDOW_SIZE = 10000
+    MAX_PENDING_WRITES = 8  # max writes queued before commit waits
+
+    def __init__(
+            self,
+            *args,
+            window_size: int=DFT_WINDOW_SIZE,
+            threaded: bool=None,
+            **kwargs
+    ):
+        """
+        Creates translation.
+        Accepts the arguments of Translation, the number of rows
+        to be moved in each window, and whether sheet reads and writes
+        are made by worker threads. By default they are if both
+        sheets' threaded_io is set.
+        :param window_size: int
+        :param threaded: bool or None
+        """
+        if not isinstance(window_size, int) or window_size < 1:
+            raise ValueError('Window size should be a positive int. Got: %s'
+                             % repr(window_size))
+        self.window_size = window_size
+        self._threaded = threaded
+        self._writer = None  # write-behind executor, during commit
+        self._pending_writes = collections.deque()
+        self._log_file = None  # log being written, during commit
+        self._log_width = 0  # number of target columns logged
+        super().__init__(*args, **kwargs)
+
+    @property
+    def threaded(self) -> bool:
+        """
+        Gets whether sheet reads and writes are made by worker threads
+        during commit.
+        :return: bool
+        """
+        if self._threaded is not None:
+            return self._threaded
+        return self._source_sheet.threaded_io and \
+            self._target_sheet.threaded_io
+
+    def _prepare(self) -> None:
+        pass  # source rows are read and checked on commit
+
+    def commit(self):
+        print('committing translations in windows of %s rows'
+              % self.window_size)
+        if not self.clear_target():
+            return
+        self._target_row = self._target_start_row
+        self._duplicate_indexes = [{} for _ in self._column_translations]
+        height = self._source_height()
+        windows = [(y, min(y + self.window_size, height)) for y in
+                   range(self._source_start_row, height, self.window_size)]
+        indices = [column_translation.source_column.index
+                   for column_translation in self._column_translations]
+        if self.write_log:  # write log if that setting is set by user.
+            # moved rows are logged as each window is written, rather
+            # than read back from the target sheet.
+            names = list(self._target_sheet.columns.names)
+            self._log_width = len(names)
+            self._log_file = self.row_log.begin_log(self.log_group, names)
+        reader = None
+        if self.threaded:
+            reader = concurrent.futures.ThreadPoolExecutor(1)
+            self._writer = concurrent.futures.ThreadPoolExecutor(1)
+        try:
+            for y0, rows in self._read_windows(windows, indices, reader):
+                self._read_window(y0, indices, rows)
+                self._check_rows()
+                self._apply_column_translations()
+                self._apply_highlights()
+                self._target_row += self._row_mask.count(1)
+            while self._pending_writes:
+                self._pending_writes.popleft().result()
+        except BaseException:
+            if self._log_file is not None:
+                self._log_file.discard()
+                self._log_file = None
+            raise
+        finally:
+            if reader is not None:
+                reader.shutdown()
+                self._writer.shutdown()
+            self._writer = None
+            self._pending_writes.clear()
+            self._column_values = []
+            self._row_mask = bytearray()
+            self._highlights = []
+            self._duplicate_indexes = None
+        if self._log_file is not None:
+            self._log_file.finish()
+            self.row_log.add_log(self.log_group, self._log_file)
+            self._log_file = None
+        self._feedback()
+
+    def _source_height(self) -> int:
+        """
+        Gets number of rows in source sheet, from a single query if
+        the interface allows.
+        :return: int
+        """
+        used_size = self._source_sheet.used_size
+        if used_size is not None:
+            return used_size[1]
+        return len(self._source_sheet.reference_column)
+
+    def _read_windows(self, windows: list, indices: list, reader=None):
+        """
+        Generates rows of source columns in each passed window.
+        If a reader executor is passed, each window is read by it while
+        the previous window is being used by the caller.
+        :param windows: list[tuple[int, int]] of (y0, y1)
+        :param indices: list[int] of source column indices
+        :param reader: concurrent.futures.Executor or None
+        :return: Iterator[tuple[int, list]] of y0, rows
+        """
+        if reader is None:
+            for y0, y1 in windows:
+                yield y0, self._read_rows(y0, y1, indices)
+            return
+        future = None
+        for i, (y0, y1) in enumerate(windows):
+            if future is None:
+                future = reader.submit(self._read_rows, y0, y1, indices)
+            rows = future.result()
+            future = reader.submit(
+                self._read_rows, *windows[i + 1], indices) \
+                if i + 1 < len(windows) else None
+            yield y0, rows
+
+    def _read_rows(self, y0: int, y1: int, indices: list) -> list:
+        """
+        Reads rows of source columns from row y0 up to (but not
+        including) y1, in a single read of the source sheet.
+        :param y0: int
+        :param y1: int
+        :param indices: list[int] of source column indices
+        :return: list[list] of rows, from the leftmost source column
+        """
+        print('reading source rows %s to %s' % (y0, y1))
+        return self._source_sheet.read_block(
+            min(indices, default=0), y0, max(indices, default=-1) + 1, y1)
+
+    def _read_window(self, y0: int, indices: list, rows: list) -> None:
+        """
+        Sets values of each source column from the rows read from
+        row y0.
+        :param y0: int
+        :param indices: list[int] of source column indices
+        :param rows: list[list] of rows, from the leftmost source column
+        :return: None
+        """
+        x0 = min(indices, default=0)
+        self._column_values = [
+            [row[x - x0] for row in rows] for x in indices]
+        self._row_offset = y0
+        self._highlights = []
+        self._mark_rows()
+
+    def _write(self, f, *args) -> None:
+        """
+        Calls passed sheet write function with args; by the write-behind
+        executor if there is one, after any earlier writes, otherwise
+        immediately.
+        Errors raised by a queued write are raised by a later call,
+        or at the end of commit.
+        :param f: callable
+        :return: None
+        """
+        if self._writer is None:
+            f(*args)
+            return
+        self._pending_writes.append(self._writer.submit(f, *args))
+        while len(self._pending_writes) > self.MAX_PENDING_WRITES:
+            self._pending_writes.popleft().result()
+
+    def _write_target_columns(self, columns: dict) -> None:
+        """
+        Writes passed values of target columns to the target sheet,
+        from the target row. Adjacent columns are written together in
+        a single block.
+        If a log is being written, the rows are also appended to it.
+        :param columns: dict of target column index: list of values
+        :return: None
+        """
+        if self._log_file is not None:
+            n_rows = max([len(values) for values in columns.values()],
+                         default=0)
+            empty = [None] * n_rows
+            self._log_file.append_columns(
+                [columns.get(x, empty) for x in range(self._log_width)])
+        run = []  # adjacent column indices
+        for x in sorted(columns) + [None]:
+            if run and x != run[-1] + 1:
+                self._write(
+                    self._target_sheet.write_block, run[0], self._target_row,
+                    [list(row) for row in zip(*[columns[x_] for x_ in run])])
+                run = []
+            run.append(x)
+
+    def _write_target_colors(self, colors: dict) -> None:
+        """
+        Sets passed colors of target cells in the target sheet, one
+        rectangle of equal color at a time.
+        :param colors: dict of target position: color
+        :return: None
+        """
+        for x0, y0, x1, y1, color in \
+                Sheet.Snapshot.find_color_rectangles(colors):
+            self._write(self._target_sheet.set_region_color,
+                        x0, y0, x1, y1, color)
+
+
 class ColumnTranslation:
     """
     Handles movement and modification of a column
@@ -2811,13 +5043,32 @@ class ColumnTranslation:
         self._source_column_name = source_column_name
         self._duplicates_check = check_for_duplicates
         self._whitespace_check = check_for_whitespace
-
-    def get_generator(self):
-        return CellGenerator(
-            src_col=self.source_column,
-            tgt_col=self.target_column,
-            start_index=self._parent_translation.source_start_row
-        )
+        self._source_values = None  # read by get_source_values
+
+    def get_source_values(self) -> list:
+        """
+        Gets list of values in source column.
+        Values are read from the source sheet's snapshot where it
+        contains the column, otherwise from the column's cells.
+        Values are read once, and the same list is returned by later
+        calls.
+        :return: list
+        """
+        if self._source_values is not None:
+            return self._source_values
+        column = self.source_column
+        snapshot = self.source_sheet.snapshot
+        if snapshot is None or column.index >= snapshot.width:
+            values = [cell.value for cell in column]
+        else:
+            length = len(column)
+            values = snapshot.get_column_values(column.index, 0, length)
+            # column may extend beyond snapshot if it is longer than the
+            # reference column.
+            values += [column.get_cell_by_index(y).value
+                       for y in range(len(values), length)]
+        self._source_values = values
+        return values
 
     # source sheet getters / setters
 
@@ -2870,7 +5121,8 @@ class ColumnTranslation:
         :return: None
         """
         assert isinstance(new_column_name, (int, float, str))
-        if new_column_name not in self.source_sheet.columns.names:
+        if self.source_sheet.get_column_index_from_name(
+                new_column_name) is None:
             raise ValueError('Passed column name %s not found in source sheet'
                              % new_column_name)
         self._source_column_name = new_column_name
@@ -2940,7 +5192,7 @@ class ColumnTranslation:
         :return: None
         """
         assert isinstance(new_name, (int, float, str))
-        if new_name not in self.target_sheet.columns.names:
+        if self.target_sheet.get_column_index_from_name(new_name) is None:
             raise ValueError('Column name %s not found in target sheet'
                              % new_name)
         self._target_column_name = new_name
@@ -2991,131 +5243,365 @@ class ColumnTranslation:
         """
         self._whitespace_check = new_bool
 
-    def get_whitespace_source_cells(self):
-        """
-        Yields cells in source column which contain whitespace
-        :return: iterator of cells
-        """
-        assert self._parent_translation is not None, \
-            "Parent translation must be set"
-        for cell in self.source_column:
-            if cell.has_whitespace:
-                yield cell
-
-    def get_duplicate_source_cells(self):
+    def get_duplicate_rows(self) -> tuple:
         """
-        Yields cells in source column with values that are duplicates of
-        previously occurring values
-        :return: iterator of cells
+        Gets rows of source column, from the source start row onwards,
+        with values that are duplicates of previously occurring values.
+        :return: tuple[list[int], list[int]] of the row index of each
+            duplicate, and the row index of the first occurrence of its
+            value.
         """
         assert self._parent_translation is not None, \
             "Parent translation must be set"
-        values = set()
-        for cell in self.source_column:
-            value = cell.value_without_whitespace
-            # if cell's value is in set of existing values, return cell.
-            if value in values:
-                yield cell
-            else:  # otherwise, check if cell is in log
-                parent = self._parent_translation
-                if parent.read_log:  # if option is set
-                    parent.row_log.find_duplicates(
-                        value, parent.log_group, self.target_column_name
-                    )
-                values.add(value)  # add value to set of existing values
-
-
-class CellGenerator:
-    def __init__(self, src_col, tgt_col, start_index):
-        if not isinstance(src_col, Column):
-            raise TypeError('expected Column. got: %s' % src_col)
-        if not isinstance(tgt_col, Column):
-            raise TypeError
-        if not isinstance(start_index, int):
-            raise TypeError
-        self.tgt_col = tgt_col
-        self.src_col = src_col
-        self.i = start_index
-        self.end_index_exclusive = len(src_col)
-
-    def has_next(self):
-        if self.i < self.end_index_exclusive:
-            return True
-
-    def next(self):
-        cell_translation = CellTranslation(
-            cell=self.src_col.get_cell_by_index(self.i),
-            src_x=self.src_col.index,
-            tgt_x=self.tgt_col.index
+        return ColumnScan.find_duplicates(
+            self.get_source_values(),
+            self._parent_translation.source_start_row
         )
-        self.i += 1
-        return cell_translation
 
 
-class TranslationRow:
-    def __init__(self):
-        self.cell_translations = []
-
-    def add_cell_translation(self, *translations):
-        for cell_translation in translations:
-            cell_translation.row = self
-            self.cell_translations.append(cell_translation)
-
-    def color_cell_and_row(self, cell_x, cell_color, row_color):
-        for cell_t in self.cell_translations:
-            assert isinstance(cell_t, CellTranslation)
-            if cell_t.src_x != cell_x:
-                cell_t.add_transform(
-                    lambda cell:
-                    cell.set_color(row_color) if
-                    cell.get_color() == -1  # if cell is default color
-                    else None
-                )
-            else:
-                cell_t.add_transform(lambda cell: cell.set_color(cell_color))
+class ColumnScan:
+    """
+    Finds cells of interest in a column from a list of its values, in a
+    single pass over the list, without reading any cells.
+    """
+    # columns shorter than this are scanned as quickly without NumPy
+    NUMPY_MIN_LENGTH = 10000
+    # matches strings that are changed by removing unneeded whitespace:
+    # those with whitespace at either end, runs of whitespace, or
+    # whitespace other than single spaces.
+    UNNEEDED_WHITESPACE = re.compile(r'^\s|\s$|\s\s|[^\S ]')
+
+    # in CHECK_AUTO_STR pools, columns at least this long are checked in
+    # worker processes; shorter ones are not worth sending to them.
+    PROCESS_MIN_LENGTH = 100000
+    # columns at least this long are checked for duplicates by
+    # partitioning their values between worker processes.
+    PARTITION_MIN_LENGTH = 1000000
+    _partition_values = None  # values shared with forked workers
+    _partition_lock = threading.Lock()  # held while values are shared
+
+    @staticmethod
+    def map_columns(
+            f,
+            args_list: list,
+            pool: str=CHECK_SERIAL_STR,
+            workers: int=None
+    ) -> list:
+        """
+        Calls f with each of the passed tuples of args, each of which
+        begins with a list of column values, on the named pool.
+        Results are returned in the order of the passed args,
+        regardless of the order in which calls finish.
+        In CHECK_AUTO_STR pools, columns of at least PROCESS_MIN_LENGTH
+        values are checked in worker processes, and others in threads.
+        Worker processes are started by a fork server, or spawned,
+        rather than forked from this process, whose other threads
+        (including those of any thread pool) may hold locks.
+        f and args sent to worker processes must be picklable.
+        :param f: callable
+        :param args_list: list[tuple]
+        :param pool: str, one of CHECK_POOLS
+        :param workers: int max number of workers, or None for the
+            executor's default.
+        :return: list of results
+        """
+        if pool == CHECK_SERIAL_STR or len(args_list) < 2:
+            return [f(*args) for args in args_list]
+        in_process = [
+            pool == CHECK_PROCESSES_STR or pool == CHECK_AUTO_STR and
+            len(args[0]) >= ColumnScan.PROCESS_MIN_LENGTH
+            for args in args_list]
+        executors = {}  # bool in_process: executor
+        try:
+            futures = []
+            for args, process in zip(args_list, in_process):
+                if process not in executors:
+                    executors[process] = \
+                        concurrent.futures.ProcessPoolExecutor(
+                            workers, mp_context=ColumnScan.process_context()) \
+                        if process else \
+                        concurrent.futures.ThreadPoolExecutor(workers)
+                futures.append(executors[process].submit(f, *args))
+            return [future.result() for future in futures]
+        finally:
+            for executor in executors.values():
+                executor.shutdown()
 
-    def apply(self, tgt_sheet, y):
-        for cell_t in self.cell_translations:
-            assert isinstance(cell_t, CellTranslation)
-            cell_t.apply(tgt_sheet, y)
+    @staticmethod
+    def process_context() -> multiprocessing.context.BaseContext:
+        """
+        Gets multiprocessing context by which check worker processes
+        are started without forking this process: a fork server where
+        available, otherwise spawned processes.
+        :return: multiprocessing context
+        """
+        if 'forkserver' in multiprocessing.get_all_start_methods():
+            return multiprocessing.get_context('forkserver')
+        return multiprocessing.get_context('spawn')
 
+    @staticmethod
+    def has_whitespace(value: int or float or str or None) -> bool:
+        """
+        Gets bool of whether value is a string containing unneeded
+        whitespace.
+        :param value: int, float, str or None
+        :return: bool
+        """
+        return type(value) is str and \
+            ColumnScan.UNNEEDED_WHITESPACE.search(value) is not None
 
-class CellTranslation:
-    row = None
+    @staticmethod
+    def find_whitespace(values: list, start: int=0) -> tuple:
+        """
+        Finds strings containing unneeded whitespace, and cleans them,
+        in a single pass over passed values. Strings without any such
+        whitespace are not split.
+        :param values: list of column values
+        :param start: int index of first row to check
+        :return: tuple[bytearray, list] of a mask holding 1 for each
+            row with whitespace, and a copy of values with that
+            whitespace removed.
+        """
+        mask = bytearray(len(values))
+        cleaned_values = list(values)
+        search = ColumnScan.UNNEEDED_WHITESPACE.search
+        for y in range(start, len(values)):
+            value = values[y]
+            if type(value) is str and search(value):
+                mask[y] = 1
+                cleaned_values[y] = ' '.join(value.split())
+        return mask, cleaned_values
 
-    def __init__(self, cell, src_x, tgt_x):
-        self.cell, self.src_x, self.tgt_x = cell, src_x, tgt_x
-        self.transforms = []
+    @staticmethod
+    def find_duplicates(
+            values: list,
+            start: int=0,
+            first_rows: dict=None,
+            offset: int=0,
+            partition: bool=False
+    ) -> tuple:
+        """
+        Finds values that are duplicates of a previous value, ignoring
+        unneeded whitespace in strings. Empty cells are not counted as
+        duplicates of each other.
+        Values of a column may be scanned in parts by passing the same
+        first_rows dict to each scan; values found in earlier parts
+        are then counted as previous values.
+        If partition is True, columns of at least PARTITION_MIN_LENGTH
+        values scanned as a whole are scanned by
+        find_duplicates_partitioned, where can_partition allows.
+        This forks the calling process, so it is never done unless
+        asked for.
+        :param values: list of column values
+        :param start: int index of first row to check
+        :param first_rows: dict of value: row index of its first
+            occurrence, which is updated with values found.
+        :param offset: int row index of the first of passed values.
+        :param partition: bool of whether long columns may be scanned
+            by forked worker processes.
+        :return: tuple[list[int], list[int]] of the row index of each
+            duplicate, and the row index of the first occurrence of its
+            value.
+        """
+        if first_rows is None and np is not None and \
+                len(values) - start >= ColumnScan.NUMPY_MIN_LENGTH:
+            found = ColumnScan._find_number_duplicates_np(values, start)
+            if found is not None:
+                if offset:
+                    found = ([y + offset for y in found[0]],
+                             [y + offset for y in found[1]])
+                return found
+        if partition and first_rows is None and \
+                len(values) - start >= ColumnScan.PARTITION_MIN_LENGTH and \
+                ColumnScan.can_partition():
+            return ColumnScan.find_duplicates_partitioned(
+                values, start, offset=offset)
+        if first_rows is None:
+            first_rows = {}  # value: row index of first occurrence
+        duplicate_rows = []
+        duplicate_first_rows = []
+        for y in range(start + offset, len(values) + offset):
+            value = values[y - offset]
+            if value is None:
+                continue
+            if type(value) is str:
+                value = ' '.join(value.split())
+                if not value:
+                    continue
+            first_y = first_rows.setdefault(value, y)
+            if first_y != y:
+                duplicate_rows.append(y)
+                duplicate_first_rows.append(first_y)
+        return duplicate_rows, duplicate_first_rows
 
-    def apply(self, tgt_sheet, y_pos):
-        if not isinstance(tgt_sheet, Sheet):
-            raise TypeError
-        if not isinstance(y_pos, int):
-            raise TypeError
-        tgt_cell = tgt_sheet.get_cell((self.tgt_x, y_pos))
-        tgt_cell.value = self.cell.value
-        [transform(tgt_cell) for transform in self.transforms]
+    @staticmethod
+    def can_partition() -> bool:
+        """
+        Gets bool of whether columns may be scanned for duplicates by
+        find_duplicates_partitioned: there must be more than one cpu,
+        worker processes must be able to be forked, and this must not
+        itself be a worker process.
+        No other threads may be running either, as a forked worker
+        could deadlock on a lock held by one of them at the fork; so
+        columns checked in thread pools or alongside streaming reads
+        and writes are scanned in-process.
+        :return: bool
+        """
+        return (os.cpu_count() or 1) > 1 and \
+            'fork' in multiprocessing.get_all_start_methods() and \
+            multiprocessing.parent_process() is None and \
+            threading.active_count() == 1
 
-    def add_transform(self, transform):
-        assert hasattr(transform, '__call__')
-        self.transforms.append(transform)
+    @staticmethod
+    def find_duplicates_partitioned(
+            values: list,
+            start: int=0,
+            partitions: int=None,
+            offset: int=0
+    ) -> tuple:
+        """
+        Finds duplicates as find_duplicates does, using worker
+        processes, which are forked so that they share passed values
+        rather than being sent them. Rows of chunks of the column are
+        first divided into partitions by the hash of their values, so
+        that equal values are in the same partition; each partition is
+        then scanned separately. Rows of each partition remain in
+        order, so the first occurrence of each value is that found by
+        a single scan, and results are merged back into row order.
+        :param values: list of column values
+        :param start: int index of first row to check
+        :param partitions: int number of partitions and workers, or
+            None for one per cpu.
+        :param offset: int row index of the first of passed values.
+        :return: tuple[list[int], list[int]]
+        """
+        partitions = partitions or os.cpu_count() or 1
+        chunk_size = -(-(len(values) - start) // partitions) or 1
+        with ColumnScan._partition_lock:
+            ColumnScan._partition_values = values
+            try:
+                with concurrent.futures.ProcessPoolExecutor(
+                        partitions,
+                        mp_context=multiprocessing.get_context('fork')
+                ) as executor:
+                    chunks = list(executor.map(
+                        ColumnScan._partition_rows,
+                        range(start, len(values), chunk_size),
+                        itertools.repeat(chunk_size),
+                        itertools.repeat(partitions)))
+                    found = list(executor.map(
+                        ColumnScan._find_partition_duplicates,
+                        [array.array('q', itertools.chain.from_iterable(
+                            chunk[i] for chunk in chunks))
+                         for i in range(partitions)]))
+            finally:
+                ColumnScan._partition_values = None
+        return ColumnScan._merge_partitions(found, len(values), offset)
 
-    @property
-    def src_pos(self):
-        return self.cell.position
+    @staticmethod
+    def _merge_partitions(found: list, length: int, offset: int) -> tuple:
+        """
+        Merges duplicates found in each partition into row order.
+        :param found: list[tuple[array.array, array.array]] of
+            duplicate rows and first rows found in each partition.
+        :param length: int number of column values
+        :param offset: int row index of the first column value
+        :return: tuple[list[int], list[int]]
+        """
+        if np is not None:
+            rows = np.concatenate(
+                [np.frombuffer(rows, dtype=np.int64) for rows, _ in found])
+            first_rows = np.concatenate(
+                [np.frombuffer(first, dtype=np.int64) for _, first in found])
+            order = np.argsort(rows)
+            return (rows[order] + offset).tolist(), \
+                (first_rows[order] + offset).tolist()
+        first_row_of = [None] * length  # first row of each duplicate
+        for rows, first_rows in found:
+            for y, first_y in zip(rows, first_rows):
+                first_row_of[y] = first_y
+        duplicate_rows = [y for y in range(length)
+                          if first_row_of[y] is not None]
+        return [y + offset for y in duplicate_rows], \
+            [first_row_of[y] + offset for y in duplicate_rows]
 
+    @staticmethod
+    def _partition_rows(y0: int, length: int, partitions: int) -> list:
+        """
+        Divides inhabited rows of a chunk of the shared column values
+        into partitions, by hash of their normalized values. Forked
+        workers share the hash seed of strings, so equal strings are
+        placed in the same partition in every worker.
+        :param y0: int index of first row of chunk
+        :param length: int number of rows in chunk
+        :param partitions: int
+        :return: list[array.array] of rows in each partition
+        """
+        partitioned = [array.array('q') for _ in range(partitions)]
+        appends = [rows.append for rows in partitioned]
+        for y, value in enumerate(
+                ColumnScan._partition_values[y0:y0 + length], y0):
+            if value is None:
+                continue
+            if type(value) is str:
+                value = ' '.join(value.split())
+                if not value:
+                    continue
+            appends[hash(value) % partitions](y)
+        return partitioned
 
-class CellTransform:
-    def __init__(self, position, sheet, call_obj):
-        assert all([isinstance(x, int) for x in position])
-        assert sheet in ('src', 'tgt')
-        assert hasattr(call_obj, '__call__')
-        self.position = position
-        self.sheet = sheet
-        self.call_obj = call_obj
+    @staticmethod
+    def _find_partition_duplicates(rows: array.array) -> tuple:
+        """
+        Finds duplicates among the passed rows of the shared column
+        values, which are in row order.
+        :param rows: array.array of row indices
+        :return: tuple[array.array, array.array] of the row index of
+            each duplicate, and the row index of the first occurrence
+            of its value.
+        """
+        values = ColumnScan._partition_values
+        first_rows = {}  # value: row index of first occurrence
+        duplicate_rows = array.array('q')
+        duplicate_first_rows = array.array('q')
+        for y in rows:
+            value = values[y]
+            if type(value) is str:
+                value = ' '.join(value.split())
+            first_y = first_rows.setdefault(value, y)
+            if first_y != y:
+                duplicate_rows.append(y)
+                duplicate_first_rows.append(first_y)
+        return duplicate_rows, duplicate_first_rows
 
-    def __call__(self, cell):
-        self.call_obj(cell)
+    @staticmethod
+    def _find_number_duplicates_np(values: list, start: int) -> tuple:
+        """
+        Finds duplicates as find_duplicates does, using numpy.unique.
+        Only columns holding floats and empty cells are handled; for
+        others, and for columns holding NaN, which numpy.unique treats
+        as equal to each other but a dict does not, None is returned.
+        :param values: list of column values
+        :param start: int index of first row to check
+        :return: tuple[list[int], list[int]] or None
+        """
+        column = np.array(values[start:], dtype=object)
+        inhabited = np.flatnonzero(column != None)  # noqa: E711
+        numbers = column[inhabited]
+        if not all(type(value) is float for value in numbers):
+            return None
+        numbers = numbers.astype(float)
+        if np.isnan(numbers).any():
+            return None
+        _, first_i, inverse = np.unique(
+            numbers, return_index=True, return_inverse=True)
+        first_i_of_each = first_i[inverse.ravel()]
+        duplicate_i = np.flatnonzero(
+            first_i_of_each != np.arange(len(numbers)))
+        return (
+            (inhabited[duplicate_i] + start).tolist(),
+            (inhabited[first_i_of_each[duplicate_i]] + start).tolist()
+        )
 
 
 ###############################################################################
@@ -4804,12 +7290,51 @@ class RowLog:
     each source translation is recorded as a new file
     """
     translation_logs_dir_name = 'logs'
-    log_file_ext = '.csv'
+    log_file_ext = '.rlog'  # extension of new log files
+    index_file_name = 'index.sqlite'
+    filters_file_name = 'filters' + SERIALIZED_OBJ_SUFFIX
+    compaction_lock_file_name = 'compaction.lock'
+    temp_file_ext = '.tmp'  # extension of files being written
+    COMPACTION_LOCK_TIMEOUT = 3600  # seconds before a lock is stale
+    COMPACTION_LOCK_WAIT = 60  # seconds to wait for a compaction to end
+    COMPACTION_LOCK_POLL_INTERVAL = 0.05  # seconds between attempts
+    # columns of compacted segments holding the log files and rows in
+    # which each row was logged. A row logged more than once holds the
+    # names and rows of all of them, each joined by SOURCE_SEPARATOR.
+    SOURCE_FILE_COLUMN = '__source_file__'
+    SOURCE_ROW_COLUMN = '__source_row__'
+    SOURCE_COLUMNS = SOURCE_FILE_COLUMN, SOURCE_ROW_COLUMN
+    SOURCE_SEPARATOR = '\n'
 
-    def __init__(self, path: str):
+    def __init__(
+            self,
+            path: str,
+            filter_capacity: int=None,
+            filter_false_positive_rate: float=None,
+            filter_size: int=None,
+            compaction_threshold: int=None
+    ):
+        """
+        Creates RowLog of groups in passed dir.
+        Filter arguments are passed to the bloom filters of each
+        group's logged columns; see RowLog.BloomFilter.
+        If a compaction threshold is passed, a group is compacted in
+        the background once make_log has given it that many files.
+        :param path: str
+        :param filter_capacity: int or None
+        :param filter_false_positive_rate: float or None
+        :param filter_size: int bytes, or None
+        :param compaction_threshold: int or None
+        """
         OS.ensure_dir_exists(path)
         assert os.path.exists(path)
         self.path = path
+        self.filter_settings = {
+            'capacity': filter_capacity,
+            'false_positive_rate': filter_false_positive_rate,
+            'size': filter_size,
+        }
+        self.compaction_threshold = compaction_threshold
         self._groups = self._find_groups()
 
     def file_names(self, group_name):
@@ -4828,8 +7353,11 @@ class RowLog:
         :return: dict
         """
         return {
-            item_name: RowLog.Group(os.path.join(self.path, item_name)) for
-            item_name in os.listdir(self.path) if
+            item_name: RowLog.Group(
+                os.path.join(self.path, item_name),
+                compaction_threshold=self.compaction_threshold,
+                **self.filter_settings)
+            for item_name in os.listdir(self.path) if
             os.path.isdir(os.path.join(self.path, item_name))
         }
 
@@ -4855,88 +7383,635 @@ class RowLog:
         :param name: str
         :return: None
         """
-        self._groups[name] = RowLog.Group(os.path.join(self.path, name))
+        self._groups[name] = RowLog.Group(
+            os.path.join(self.path, name),
+            compaction_threshold=self.compaction_threshold,
+            **self.filter_settings)
 
     def delete_group(self, name: str) -> None:
         """
-        Deletes group and contained files
+        Deletes group and contained files.
+        If the group is being compacted, waits for the compaction to
+        end; if it does not end within COMPACTION_LOCK_WAIT seconds,
+        an IOError is raised and nothing is deleted.
         :param name: str
         :return: None
         """
         group = self._groups[name]
-        [os.remove(os.path.join(group.path, f)) for f in group.file_names]
+        if not group.acquire_compaction_lock(RowLog.COMPACTION_LOCK_WAIT):
+            raise IOError('Group %s is being compacted' % name)
+        try:
+            with group.lock:
+                [os.remove(os.path.join(group.path, f))
+                 for f in group.file_names]
+                if group.index is not None:
+                    group.index.delete()
+                if os.path.exists(group.filters_path):
+                    os.remove(group.filters_path)
+                # remove files left by writes that did not complete
+                for file_name in os.listdir(group.path):
+                    if file_name.endswith(RowLog.temp_file_ext):
+                        os.remove(os.path.join(group.path, file_name))
+        finally:
+            group.release_compaction_lock()
         os.rmdir(group.path)
         del self._groups[name]
 
-    def make_log(self, group_name: str, sheet: 'Sheet'):
+    def make_log(self, group_name: str, sheet: 'Sheet', height: int=None):
         """
         Creates a log file from a source sheet
         :param group_name: str name of group to add sheet to
         :param sheet: Sheet to log
+        :param height: int number of rows of sheet to log, if known;
+            see RowLogFile.write.
+        :return: None
+        """
+        self._groups[group_name].add_file(sheet, height)
+
+    def begin_log(self, group_name: str, names: list) -> 'RowLog.RowLogFile':
+        """
+        Begins a log file in the named group, to which rows are
+        appended as they are produced; see RowLog.Group.begin_log.
+        :param group_name: str
+        :param names: list of column names
+        :return: RowLogFile
+        """
+        return self._groups[group_name].begin_log(names)
+
+    def add_log(self, group_name: str, log: 'RowLog.RowLogFile'):
+        """
+        Adds a finished log file to the named group.
+        :param group_name: str
+        :param log: RowLogFile
         :return: None
         """
-        self._groups[group_name].add_file(sheet)
+        self._groups[group_name].add_log(log)
+
+    def compact(self, group_name: str) -> str or None:
+        """
+        Merges log files of named group into a single segment.
+        See RowLog.Group.compact.
+        :param group_name: str
+        :return: str name of segment, or None
+        """
+        return self._groups[group_name].compact()
+
+    @property
+    def group_names(self):
+        """
+        Yields each group name in self
+        :return: Generator[str]
+        """
+        for group_name in self._groups:
+            assert isinstance(group_name, str)
+            yield group_name
+
+    class Group:
+        """
+        Class representing a grouping of source leads
+        """
+        def __init__(
+                self,
+                path: str,
+                compaction_threshold: int=None,
+                **filter_settings
+        ) -> None:
+            """
+            Creates group of log files in passed dir.
+            :param path: str
+            :param compaction_threshold: int number of files at which
+                add_file starts a compaction in the background, or None
+            :param filter_settings: arguments of RowLog.BloomFilter
+                for filters of logged columns.
+            """
+            if os.path.exists(path) and not os.path.isdir(path):
+                raise ValueError('Path passed exists and is not a dir')
+            self.path = path
+            if not OS.ensure_dir_exists(path):  # ensure .path is a dir
+                raise IOError('path %s does not exist and could not be'
+                              'created.' % self.path)
+            self.log_files = self._find_log_files()
+            # index of logged values, if sqlite3 is available
+            self.index = RowLog.Index(
+                os.path.join(self.path, RowLog.index_file_name)) if \
+                sqlite3 is not None else None
+            self._index_updated = False  # true once files are indexed
+            self.filter_settings = {
+                k: v for k, v in filter_settings.items() if v is not None}
+            self._filters = None  # {column name: BloomFilter}, on first use
+            self._filtered_files = None  # names of files added to filters
+            self.compaction_threshold = compaction_threshold
+            self.compaction = None  # thread of background compaction
+            # held while log_files is changed or read by lookups, so
+            # that a background compaction swaps files all at once.
+            self._lock = threading.RLock()
+
+        def _find_log_files(self) -> dict:
+            """
+            Returns dict of log files, with file name as key,
+            RowLogFile as value.
+            Files that have already been converted to the format of
+            new logs are left out; see _is_converted.
+            :return: dict[str:RowLogFile]
+            """
+            file_names = os.listdir(self.path)
+            return {
+                filename: RowLog.log_file_classes[os.path.splitext(
+                    filename)[1]](os.path.join(self.path, filename)) for
+                filename in file_names if
+                os.path.splitext(filename)[1] in RowLog.log_file_classes and
+                not self._is_converted(filename, file_names)
+            }
+
+        @staticmethod
+        def _is_converted(filename: str, file_names: list) -> bool:
+            """
+            Gets bool of whether passed log file has a file of the same
+            name in the format of new logs beside it. Such a file is
+            left by a conversion that was interrupted between replacing
+            the new file and removing the old one, and its rows are
+            those of the new file.
+            :param filename: str name of log file
+            :param file_names: list[str] names of files in group dir
+            :return: bool
+            """
+            stem, ext = os.path.splitext(filename)
+            return ext != RowLog.log_file_ext and \
+                stem + RowLog.log_file_ext in file_names
+
+        def find_duplicates(
+                self,
+                value: int or float or str,
+                column_name: int or float or str
+                ):
+            """
+            Finds duplicates. Yields generator of
+            tuple[file name str, row index int]
+            :param value: int, float, or str
+            :param column_name: int, float, or str
+            :return: Generator[tuple[str, int]]
+            """
+            try:
+                found = self._find_duplicates(value, column_name)
+            except FileNotFoundError:
+                # a file was removed by a compaction since files were
+                # listed; the compacted segment holds its rows.
+                self.refresh()
+                found = self._find_duplicates(value, column_name)
+            yield from found
+
+        def _find_duplicates(
+                self,
+                value: int or float or str,
+                column_name: int or float or str
+        ) -> list:
+            """
+            Finds duplicates, as find_duplicates does. Rows of
+            compacted segments are reported by each file and row in
+            which they were logged.
+            :param value: int, float, or str
+            :param column_name: int, float, or str
+            :return: list[tuple[str, int]]
+            """
+            with self._lock:
+                if not self.might_contain(value, column_name):
+                    return []  # value has definitely not been logged
+                if self.index is not None:
+                    if not self._index_updated:
+                        self.index.update(self.log_files)
+                        self._index_updated = True
+                    found = list(self.index.find(value, column_name))
+                else:
+                    found = [
+                        (log_file.name, index)
+                        for log_file in list(self.log_files.values())
+                        for index in
+                        log_file.find_duplicates(value, column_name)]
+                return [source for name, row in found for source in (
+                        self.log_files[name].sources(row)
+                        if name in self.log_files else [(name, row)])]
+
+        def refresh(self) -> None:
+            """
+            Finds log files of group again, after files have been added
+            or removed by another process.
+            :return: None
+            """
+            with self._lock:
+                self.log_files = self._find_log_files()
+                self._index_updated = False
+                self._filters = None
+
+        def add_file(self, sheet: 'Sheet', height: int=None):
+            """
+            Creates a RowLogFile in this group.
+            :param sheet: Sheet
+            :param height: int number of rows of sheet to log, if known
+            :return: None
+            """
+            self.add_log(RowLog.log_file_classes[RowLog.log_file_ext](
+                self.path, sheet, height))
+
+        def begin_log(self, names: list) -> 'RowLog.RowLogFile':
+            """
+            Begins a new log file in this group, with columns of passed
+            names, to which rows are appended in batches as they are
+            produced; see RowLogFile.begin. Once finished, the file is
+            added to the group by add_log.
+            :param names: list of column names
+            :return: RowLogFile
+            """
+            log_file_class = RowLog.log_file_classes[RowLog.log_file_ext]
+            log = log_file_class(
+                os.path.join(self.path, log_file_class.generate_name()))
+            log.begin(names)
+            return log
+
+        def add_log(self, log: 'RowLog.RowLogFile'):
+            """
+            Adds a written log file to this group.
+            :param log: RowLogFile
+            :return: None
+            """
+            with self._lock:
+                self.log_files[log.name] = log
+                if self.index is not None:
+                    self.index.add(log)
+                if self._filters is not None:
+                    self._update_filters()
+            if self.compaction_threshold is not None and \
+                    len(self.log_files) >= self.compaction_threshold and \
+                    (self.compaction is None or
+                     not self.compaction.is_alive()):
+                self.compaction = threading.Thread(
+                    target=self.compact, name='compaction of %s' % self.name)
+                self.compaction.start()
+
+        def compact(self) -> str or None:
+            """
+            Merges the group's log files into a single segment, without
+            rows that are exact duplicates of rows already merged.
+            Each row of the segment records every log file and row in
+            which it was logged, which lookups report.
+            The segment is written in full, and replaces the merged
+            files only once it is complete; a lookup that finds a
+            merged file missing lists the group's files again.
+            Only one compaction of a group runs at a time; if another
+            holds the group's lock, None is returned.
+            Index and filters are updated by the next lookup, so that
+            this may be run on a background thread.
+            :return: str name of segment, or None if not compacted.
+            """
+            if not self.acquire_compaction_lock():
+                return None
+            temp_path = None
+            try:
+                with self._lock:
+                    log_files = dict(self.log_files)
+                if len(log_files) < 2:
+                    return None
+                log_file_class = \
+                    RowLog.log_file_classes[RowLog.log_file_ext]
+                path = os.path.join(
+                    self.path, log_file_class.generate_name())
+                temp_path = path + RowLog.temp_file_ext
+                self._merge(log_files, log_file_class(temp_path))
+                os.replace(temp_path, path)
+                segment = log_file_class(path)
+                with self._lock:
+                    for name, log_file in log_files.items():
+                        if os.path.exists(log_file.path):
+                            os.remove(log_file.path)
+                        self.log_files.pop(name, None)
+                    self.log_files[segment.name] = segment
+                    self._index_updated = False
+                    self._filters = None
+                print('compacted %s log files of %s into %s'
+                      % (len(log_files), self.name, segment.name))
+                return segment.name
+            finally:
+                if temp_path is not None and os.path.exists(temp_path):
+                    os.remove(temp_path)  # segment was not completed
+                self.release_compaction_lock()
+
+        @property
+        def compaction_lock_path(self) -> str:
+            """
+            Gets path of file held while group's files are compacted.
+            :return: str
+            """
+            return os.path.join(self.path, RowLog.compaction_lock_file_name)
+
+        @property
+        def lock(self) -> threading.RLock:
+            """
+            Gets lock held while group's files are listed or replaced.
+            :return: threading.RLock
+            """
+            return self._lock
+
+        def acquire_compaction_lock(self, timeout: float=0) -> bool:
+            """
+            Creates the group's compaction lock file, which is held
+            while its files are compacted or replaced by any process.
+            A lock file older than COMPACTION_LOCK_TIMEOUT seconds was
+            left by a compaction that failed, and is removed.
+            :param timeout: float seconds to wait for another holder
+                to release the lock.
+            :return: bool of whether lock was acquired.
+            """
+            lock_path = self.compaction_lock_path
+            deadline = time.time() + timeout
+            while True:
+                try:
+                    os.close(os.open(
+                        lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                    return True
+                except FileExistsError:
+                    pass
+                try:
+                    if time.time() - os.path.getmtime(lock_path) >= \
+                            RowLog.COMPACTION_LOCK_TIMEOUT:
+                        os.remove(lock_path)  # stale
+                        continue
+                except FileNotFoundError:
+                    continue  # released meanwhile
+                if time.time() >= deadline:
+                    return False
+                time.sleep(RowLog.COMPACTION_LOCK_POLL_INTERVAL)
+
+        def release_compaction_lock(self) -> None:
+            """
+            Removes the group's compaction lock file.
+            :return: None
+            """
+            os.remove(self.compaction_lock_path)
+
+        @staticmethod
+        def _merge(log_files: dict, out: 'RowLog.RowLogFile') -> None:
+            """
+            Merges columns of passed log files, in order of file name,
+            into passed log file, leaving out rows that are exact
+            duplicates of earlier rows. Columns missing from a file are
+            None in its rows. The source columns of each merged row
+            hold the sources of every row it stands for.
+            Files are read one at a time, twice: first to find the rows
+            that are kept, from a digest of the values of each row, and
+            then to append the kept rows of each file column by column.
+            Of the whole group, only a digest of each merged row and
+            the sources of duplicate rows are held at once.
+            :param log_files: dict[str:RowLogFile]
+            :param out: RowLogFile to be written
+            :return: None
+            """
+            names = []  # union of column names, in order found
+            for log_file in log_files.values():
+                for column_name in log_file.column_names:
+                    if column_name not in names and \
+                            column_name not in RowLog.SOURCE_COLUMNS:
+                        names.append(column_name)
+            key = RowLog.Index.key
+            merged = {}  # digest of values of row: index of merged row
+            kept = {}  # file name: bytearray of whether each row is kept
+            later_sources = collections.defaultdict(list)  # by merged row
+            for name, log_file in sorted(log_files.items()):
+                columns = RowLog.Group._merge_columns(log_file, names)
+                mask = kept[name] = bytearray(
+                    len(columns[0]) if columns else 0)
+                for row_i, row in enumerate(zip(*columns)):
+                    digest = hashlib.blake2b(
+                        repr([key(value) for value in row]).encode(),
+                        digest_size=16).digest()
+                    n_merged = len(merged)
+                    merged_i = merged.setdefault(digest, n_merged)
+                    if merged_i == n_merged:  # first of its values
+                        mask[row_i] = 1
+                    else:
+                        later_sources[merged_i].extend(
+                            log_file.sources(row_i))
+            del merged
+            out.begin(names + list(RowLog.SOURCE_COLUMNS))
+            try:
+                merged_i = 0
+                for name, log_file in sorted(log_files.items()):
+                    mask = kept[name]
+                    columns = [list(itertools.compress(column, mask))
+                               for column in RowLog.Group._merge_columns(
+                                   log_file, names)]
+                    source_files, source_rows = [], []
+                    join_sources = RowLog.RowLogFile.join_sources
+                    for row_i in itertools.compress(
+                            range(len(mask)), mask):
+                        source_file, source_row = join_sources(
+                            log_file.sources(row_i) +
+                            later_sources.pop(merged_i, []))
+                        source_files.append(source_file)
+                        source_rows.append(source_row)
+                        merged_i += 1
+                    out.append_columns(columns + [source_files, source_rows])
+            except BaseException:
+                out.discard()
+                raise
+            out.finish()
 
-    @property
-    def group_names(self):
-        """
-        Yields each group name in self
-        :return: Generator[str]
-        """
-        for group_name in self._groups:
-            assert isinstance(group_name, str)
-            yield group_name
+        @staticmethod
+        def _merge_columns(
+                log_file: 'RowLog.RowLogFile',
+                names: list
+        ) -> list:
+            """
+            Reads columns of passed log file in the order of passed
+            names, each with a value for every row of the file; columns
+            missing from the file are None.
+            :param log_file: RowLogFile
+            :param names: list of column names
+            :return: list[list]
+            """
+            file_names, file_columns = log_file.read_columns()
+            n_rows = max(map(len, file_columns), default=0)
+            by_name = {}  # first column of each name
+            for column_name, column in zip(file_names, file_columns):
+                by_name.setdefault(column_name, column)
+            return [
+                list(by_name[column_name]) +
+                [None] * (n_rows - len(by_name[column_name]))
+                if column_name in by_name else [None] * n_rows
+                for column_name in names]
+
+        def convert_logs(self) -> list:
+            """
+            Converts each log file of this group that is not of the
+            format of new logs, into a file of that format with the
+            same name and the new extension. Each new file is written
+            in full before it replaces the old file.
+            The group's compaction lock is held while converting, so
+            that no compaction merges files as they are replaced; if a
+            compaction does not end within COMPACTION_LOCK_WAIT
+            seconds, an IOError is raised.
+            :return: list[str] names of new files
+            """
+            if not self.acquire_compaction_lock(RowLog.COMPACTION_LOCK_WAIT):
+                raise IOError('Group %s is being compacted' % self.name)
+            try:
+                with self._lock:
+                    return self._convert_logs()
+            finally:
+                self.release_compaction_lock()
 
-    class Group:
-        """
-        Class representing a grouping of source leads
-        """
-        def __init__(self, path: str) -> None:
-            if os.path.exists(path) and not os.path.isdir(path):
-                raise ValueError('Path passed exists and is not a dir')
-            self.path = path
-            if not OS.ensure_dir_exists(path):  # ensure .path is a dir
-                raise IOError('path %s does not exist and could not be'
-                              'created.' % self.path)
-            self.log_files = self._find_log_files()
+        def _convert_logs(self) -> list:
+            """
+            Converts log files while locks are held; see convert_logs.
+            :return: list[str] names of new files
+            """
+            log_file_class = RowLog.log_file_classes[RowLog.log_file_ext]
+            # old files left by an interrupted conversion are removed
+            file_names = os.listdir(self.path)
+            for filename in file_names:
+                if self._is_converted(filename, file_names):
+                    os.remove(os.path.join(self.path, filename))
+            converted = []
+            for name, log_file in sorted(self.log_files.items()):
+                if type(log_file) is log_file_class:
+                    continue
+                path = os.path.splitext(log_file.path)[0] + \
+                    RowLog.log_file_ext
+                temp_path = path + RowLog.temp_file_ext
+                try:
+                    log_file_class(temp_path).write_columns(
+                        *log_file.read_columns())
+                    os.replace(temp_path, path)
+                finally:
+                    if os.path.exists(temp_path):
+                        os.remove(temp_path)  # file was not completed
+                os.remove(log_file.path)
+                del self.log_files[name]
+                new_log_file = log_file_class(path)
+                self.log_files[new_log_file.name] = new_log_file
+                converted.append(new_log_file.name)
+            if converted:
+                if self.index is not None:
+                    self.index.update(self.log_files)
+                if self._filters is not None:
+                    self._update_filters()
+            return converted
 
-        def _find_log_files(self) -> dict:
+        @property
+        def filters_path(self) -> str:
             """
-            Returns dict of log files, with file name as key,
-            RowLogFile as value.
-            :return: dict[str:RowLogFile]
+            Gets path of file in which group's bloom filters are kept.
+            :return: str
             """
-            return {
-                filename:
-                    RowLog.RowLogFile(os.path.join(self.path, filename)) for
-                filename in os.listdir(self.path) if
-                filename.endswith(RowLog.log_file_ext)
-            }
+            return os.path.join(self.path, RowLog.filters_file_name)
 
-        def find_duplicates(
+        @property
+        def filters(self) -> dict:
+            """
+            Gets bloom filter of each logged column, loaded from file
+            and updated with any log files that were not yet added.
+            :return: dict[str:BloomFilter]
+            """
+            if self._filters is None:
+                self._filters, self._filtered_files = {}, set()
+                if os.path.exists(self.filters_path):
+                    with open(self.filters_path, 'rb') as f:
+                        self._filters, self._filtered_files = pickle.load(f)
+                self._update_filters()
+            return self._filters
+
+        def might_contain(
                 self,
                 value: int or float or str,
                 column_name: int or float or str
-                ):
+        ) -> bool:
             """
-            Finds duplicates. Yields generator of
-            tuple[file name str, row index int]
+            Gets bool of whether value may have been logged in columns
+            of passed name. If False, it has definitely not been.
             :param value: int, float, or str
             :param column_name: int, float, or str
-            :return: Generator[tuple[str, int]]
+            :return: bool
             """
-            for log_file in self.log_files.values():
-                for index in log_file.find_duplicates(value, column_name):
-                    yield log_file.name, index
+            column_filter = self.filters.get(str(column_name))
+            return column_filter is not None and value in column_filter
 
-        def add_file(self, sheet: 'Sheet'):
+        def _update_filters(self) -> None:
             """
-            Creates a RowLogFile in this group.
-            :param sheet: Sheet
+            Adds values of log files that have not been added to the
+            filters, and saves filters if they were changed.
+            Filters are rebuilt if a file they contain was removed, or
+            if they hold more values than they were sized for.
+            :return: None
+            """
+            if self._filtered_files - self.log_files.keys():
+                self._rebuild_filters()
+                return
+            new_files = self.log_files.keys() - self._filtered_files
+            for name in sorted(new_files):
+                self._add_to_filters(self.log_files[name])
+            if any(column_filter.count > column_filter.capacity
+                   for column_filter in self._filters.values()):
+                self._rebuild_filters()
+            elif new_files:
+                self._save_filters()
+
+        def _add_to_filters(self, log_file: 'RowLog.RowLogFile') -> None:
+            """
+            Adds values of all columns of passed log file to filters,
+            reading the file once.
+            :param log_file: RowLogFile
+            :return: None
+            """
+            column_names, columns = log_file.read_columns()
+            for column_name, column in zip(column_names, columns):
+                if column_name in RowLog.SOURCE_COLUMNS:
+                    continue
+                if column_name not in self._filters:
+                    self._filters[column_name] = RowLog.BloomFilter(
+                        **self.filter_settings)
+                self._filters[column_name].update(column)
+            self._filtered_files.add(log_file.name)
+
+        def _rebuild_filters(self) -> None:
+            """
+            Creates filters anew from all log files, each sized for at
+            least twice the values counted by its previous filter.
+            That count includes values of removed files, so it is not
+            less than the values logged in the column, and is known
+            without reading any file; each file is then read once.
+            :return: None
+            """
+            counts = {column_name: column_filter.count for
+                      column_name, column_filter in self._filters.items()}
+            self._filters, self._filtered_files = {}, set()
+            for column_name, count in counts.items():
+                settings = dict(self.filter_settings)
+                settings['capacity'] = max(
+                    count * 2, settings.get(
+                        'capacity', RowLog.BloomFilter.DFT_CAPACITY))
+                self._filters[column_name] = RowLog.BloomFilter(**settings)
+            for name in sorted(self.log_files):
+                self._add_to_filters(self.log_files[name])
+            self._save_filters()
+
+        def _save_filters(self) -> None:
+            """
+            Saves filters to file, replacing the previous file only once
+            the new one has been written.
             :return: None
             """
-            log = RowLog.RowLogFile(self.path, sheet)
-            self.log_files[log.name] = log
+            temp_path = self.filters_path + RowLog.temp_file_ext
+            with open(temp_path, 'wb') as f:
+                pickle.dump((self._filters, self._filtered_files), f)
+            os.replace(temp_path, self.filters_path)
+
+        def filter_report(self) -> str:
+            """
+            Gets report of the size and false positive rate of each
+            column's bloom filter, to be shown to user.
+            :return: str
+            """
+            return '\n'.join('%s: %s' % (column_name, column_filter)
+                             for column_name, column_filter in
+                             sorted(self.filters.items()))
 
         @property
         def name(self):
@@ -4955,6 +8030,251 @@ class RowLog:
             for log_name in self.log_files:
                 yield log_name
 
+    class Index:
+        """
+        On-disk index of the values logged in a group's log files,
+        mapping each column name and value to the log files and rows
+        in which it was logged, so that a value is looked up without
+        reading any log file.
+        Files are indexed once, by update, which is called as files
+        are added to the group.
+        """
+        # seconds to wait for another writer to finish indexing a file
+        LOCK_TIMEOUT = 60
+
+        def __init__(self, path: str) -> None:
+            self.path = path
+            self._connection = None  # opened on first use
+
+        @property
+        def connection(self) -> 'sqlite3.Connection':
+            """
+            Gets connection to index database, creating its tables if
+            they do not yet exist.
+            :return: sqlite3.Connection
+            """
+            if self._connection is None:
+                self._connection = sqlite3.connect(
+                    self.path, timeout=self.LOCK_TIMEOUT)
+                with self._connection:
+                    self._connection.execute(
+                        'CREATE TABLE IF NOT EXISTS files '
+                        '(name TEXT PRIMARY KEY)')
+                    self._connection.execute(
+                        'CREATE TABLE IF NOT EXISTS entries '
+                        '(column_name TEXT, value TEXT, file TEXT, '
+                        'row INTEGER)')
+                    self._connection.execute(
+                        'CREATE INDEX IF NOT EXISTS entries_by_value '
+                        'ON entries (column_name, value)')
+            return self._connection
+
+        @staticmethod
+        def key(value: int or float or str or None) -> str:
+            """
+            Gets str under which a value is indexed. Numbers are
+            indexed by float value, so that values which are equal are
+            found whatever their type.
+            :param value: int, float, str, or None
+            :return: str
+            """
+            if isinstance(value, (int, float)):
+                return 'num:%r' % float(value)
+            return RowLog.RowLogFile._format_val(value)
+
+        @property
+        def file_names(self) -> set:
+            """
+            Gets names of log files that have been indexed.
+            :return: set[str]
+            """
+            return {name for name, in
+                    self.connection.execute('SELECT name FROM files')}
+
+        def update(self, log_files: dict) -> None:
+            """
+            Indexes passed log files that have not yet been indexed,
+            and removes files that are no longer passed from index.
+            Each file is indexed in a single transaction.
+            :param log_files: dict[str:RowLogFile]
+            :return: None
+            """
+            indexed = self.file_names
+            for name in indexed - log_files.keys():
+                with self.connection as connection:
+                    connection.execute(
+                        'DELETE FROM entries WHERE file = ?', (name,))
+                    connection.execute(
+                        'DELETE FROM files WHERE name = ?', (name,))
+            for name in log_files.keys() - indexed:
+                self.add(log_files[name])
+
+        def add(self, log_file: 'RowLog.RowLogFile') -> None:
+            """
+            Adds values of passed log file to index, unless it has
+            already been indexed, by this or another RowLog.
+            The file is claimed and its values inserted in the same
+            transaction, so that two writers do not index it twice.
+            Columns are read whole, so that columns sharing a name
+            are each indexed.
+            :param log_file: RowLogFile
+            :return: None
+            """
+            key = self.key
+            name = log_file.name
+            with self.connection as connection:
+                if not connection.execute(
+                        'INSERT OR IGNORE INTO files VALUES (?)',
+                        (name,)).rowcount:
+                    return  # already indexed
+                column_names, columns = log_file.read_columns()
+                for column_name, column in zip(column_names, columns):
+                    if column_name in RowLog.SOURCE_COLUMNS:
+                        continue
+                    column_name = str(column_name)
+                    connection.executemany(
+                        'INSERT INTO entries VALUES (?, ?, ?, ?)',
+                        ((column_name, key(value), name, row_i)
+                         for row_i, value in enumerate(column)))
+
+        def find(
+                self,
+                value: int or float or str,
+                column_name: int or float or str
+        ):
+            """
+            Finds logged occurrences of value in columns of passed name.
+            :param value: int, float, or str
+            :param column_name: int, float, or str
+            :return: Generator[tuple[str, int]] of log file name and
+                row index.
+            """
+            yield from self.connection.execute(
+                'SELECT file, row FROM entries '
+                'WHERE column_name = ? AND value = ? ORDER BY file, row',
+                (str(column_name), self.key(value)))
+
+        def close(self) -> None:
+            """
+            Closes connection to index, if open.
+            :return: None
+            """
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+        def delete(self) -> None:
+            """
+            Closes and removes index file.
+            :return: None
+            """
+            self.close()
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    class BloomFilter:
+        """
+        Set of values that may hold false positives, but no false
+        negatives, in a fixed amount of memory; used to find whether a
+        value has definitely not been logged without looking it up.
+        Sized either for a capacity of values at a false positive rate,
+        or by a passed size in bytes.
+        Values are keyed as by RowLog.Index, so that equal numbers are
+        found whatever their type.
+        """
+        DFT_CAPACITY = 100000
+        DFT_FALSE_POSITIVE_RATE = 0.01
+
+        def __init__(
+                self,
+                capacity: int=DFT_CAPACITY,
+                false_positive_rate: float=DFT_FALSE_POSITIVE_RATE,
+                size: int=None
+        ) -> None:
+            """
+            Creates empty filter.
+            :param capacity: int number of values filter is sized for
+            :param false_positive_rate: float rate of false positives
+                once capacity values have been added.
+            :param size: int bytes; if passed, this is used instead of
+                the size needed for the false positive rate.
+            """
+            if capacity < 1:
+                raise ValueError('Capacity should be positive. Got: %s'
+                                 % repr(capacity))
+            if not 0 < false_positive_rate < 1:
+                raise ValueError('False positive rate should be between 0 '
+                                 'and 1. Got: %s' % repr(false_positive_rate))
+            self.capacity = capacity
+            self.false_positive_rate = false_positive_rate
+            if size is None:
+                size = math.ceil(-capacity * math.log(false_positive_rate) /
+                                 math.log(2) ** 2 / 8)
+            self.bits = bytearray(max(size, 1))
+            self.n_hashes = max(round(
+                len(self.bits) * 8 / capacity * math.log(2)), 1)
+            self.count = 0  # number of values added
+
+        def _positions(self, value: int or float or str or None):
+            """
+            Gets bit positions of value, by double hashing.
+            :param value: int, float, str or None
+            :return: Generator[int]
+            """
+            digest = hashlib.blake2b(
+                RowLog.Index.key(value).encode('utf-8', 'surrogatepass'),
+                digest_size=16).digest()
+            h1 = int.from_bytes(digest[:8], 'little')
+            h2 = int.from_bytes(digest[8:], 'little') | 1
+            n_bits = len(self.bits) * 8
+            for i in range(self.n_hashes):
+                yield (h1 + i * h2) % n_bits
+
+        def add(self, value: int or float or str or None) -> None:
+            """
+            Adds value to filter.
+            :param value: int, float, str or None
+            :return: None
+            """
+            bits = self.bits
+            for position in self._positions(value):
+                bits[position >> 3] |= 1 << (position & 7)
+            self.count += 1
+
+        def update(self, values) -> None:
+            """
+            Adds each passed value to filter.
+            :param values: Iterable
+            :return: None
+            """
+            for value in values:
+                self.add(value)
+
+        def __contains__(self, value: int or float or str or None) -> bool:
+            bits = self.bits
+            return all(bits[position >> 3] & (1 << (position & 7))
+                       for position in self._positions(value))
+
+        def expected_false_positive_rate(self, count: int=None) -> float:
+            """
+            Gets expected rate of false positives once passed number of
+            values have been added; by default, the number added so far.
+            :param count: int or None
+            :return: float
+            """
+            count = self.count if count is None else count
+            n_bits = len(self.bits) * 8
+            return (1 - math.exp(
+                -self.n_hashes * count / n_bits)) ** self.n_hashes
+
+        def __str__(self) -> str:
+            return '%s values, %s bytes, %s hashes, %.4f%% false ' \
+                'positives (%.4f%% at capacity of %s)' % (
+                    self.count, len(self.bits), self.n_hashes,
+                    self.expected_false_positive_rate() * 100,
+                    self.expected_false_positive_rate(self.capacity) * 100,
+                    self.capacity)
+
     class RowLogFile:
         """
         Class operating on a single log
@@ -4968,8 +8288,15 @@ class RowLog:
         type_dict = {v: k for k, v in prefix_dict.items()}  # inverted prefix d
 
         none_str = 'None'
+        WRITE_BUFFER_SIZE = 2 ** 20  # bytes buffered before written to file
+        ext = '.csv'
 
-        def __init__(self, path: str, sheet: 'Sheet'=None) -> None:
+        def __init__(
+                self,
+                path: str,
+                sheet: 'Sheet'=None,
+                height: int=None
+        ) -> None:
             """
             Creates a new RowLogFile at/from passed path.
             If a sheet is passed to constructor,
@@ -4980,36 +8307,139 @@ class RowLog:
             creates a file with that name.
             :param path: str
             :param sheet: sheet
+            :param height: int number of rows of sheet to log, if
+                known; see write.
             """
             if os.path.isdir(path):
                 # if passed path is a dir, create a path for self within it
                 assert sheet is not None  # sheet is needed for name generation
-                self.path = os.path.join(path, self._generate_name())
+                self.path = os.path.join(path, self.generate_name())
             else:  # if passed path is a file/doesn't exist,
                 # that will be used as the path for this log file.
                 self.path = path
             self._rows = None  # list of rows read from this file.
             self._col_values = {}  # dictionary of column value sets
+            self._column_names = None  # header of file, read on first use
+            self._sources = None  # sources of rows of compacted segments
+            self._out = None  # file being written, between begin & finish
+            # files are only read once their values are used.
             if sheet:
-                self.write(sheet)
-            else:
-                self.read(self.path)
+                self.write(sheet, height)
 
-        def write(self, sheet: 'Sheet'):
+        def write(self, sheet: 'Sheet', height: int=None):
             """
             Writes sheet info to file.
             If path is a dir, writes to a file within that dir,
             otherwise, creates/writes to a file located at path.
+            Columns are read from the sheet's snapshot, or from bulk
+            reads of the sheet, one window at a time, and written
+            through a buffer in a single pass.
             :param sheet: Sheet
+            :param height: int number of rows of sheet to log, such as
+                the row count of the translation that filled it. If not
+                passed, the height of the sheet's snapshot is used, or,
+                if none has been taken, the reference column's length,
+                which is found by reading the sheet.
+            :return: None
+            """
+            names = list(sheet.columns.names)
+            if height is None:
+                height = sheet.snapshot.height if \
+                    sheet.snapshot is not None else \
+                    len(sheet.reference_column)
+            self.begin(names)
+            try:
+                for columns in sheet.read_columns(
+                        0, sheet.table_row_start_i, len(names), height):
+                    self.append_columns(columns)
+            except BaseException:
+                self.discard()
+                raise
+            self.finish()
+
+        def begin(self, names: list) -> None:
+            """
+            Begins writing file with columns of passed names. Rows are
+            then appended in batches by append_rows or append_columns,
+            so that they need not all be held at once, and are written
+            to a temporary file, which replaces the file at path once
+            finish is called.
+            :param names: list of column names
+            :return: None
+            """
+            self._out = open(self.path + RowLog.temp_file_ext, 'w',
+                             newline='', buffering=self.WRITE_BUFFER_SIZE)
+            self._csv_writer = csv.writer(self._out)
+            self._csv_writer.writerow(names)
+
+        def append_rows(self, rows) -> None:
+            """
+            Appends passed rows to file being written.
+            :param rows: iterable of lists of values
+            :return: None
+            """
+            # values are formatted as by _format_val, inlined.
+            prefixes = self.prefix_dict
+            none_str = self.none_str
+            self._csv_writer.writerows(
+                [none_str if value is None else
+                 prefixes[value.__class__] + str(value)
+                 for value in row] for row in rows)
+
+        def append_columns(self, columns: list) -> None:
+            """
+            Appends rows of passed columns of equal length to file
+            being written.
+            :param columns: list[list] of values of each column
+            :return: None
+            """
+            # each column is formatted whole, then rows are written
+            # from the formatted columns without being built as lists.
+            prefixes = self.prefix_dict
+            none_str = self.none_str
+            self._csv_writer.writerows(zip(*[
+                [none_str if value is None else
+                 prefixes[value.__class__] + str(value)
+                 for value in column] for column in columns]))
+
+        def finish(self) -> None:
+            """
+            Completes file being written, which then replaces any file
+            at path.
+            :return: None
+            """
+            self._out.close()
+            self._out = self._csv_writer = None
+            os.replace(self.path + RowLog.temp_file_ext, self.path)
+            self._column_names = None
+
+        def discard(self) -> None:
+            """
+            Discards file being written, leaving any file at path.
             :return: None
             """
-            with open(self.path, 'w') as f:
-                writer = csv.DictWriter(
-                    f, sheet.columns.names,  # generator
-                    restval=None,
-                    extrasaction='raise')  # raise ValueError on unexpected key
-                writer.writerows([self._format_dict(row.to_dict()) for
-                                  row in sheet.table_rows])
+            if self._out is not None:
+                self._out.close()
+                self._out = self._csv_writer = None
+            temp_path = self.path + RowLog.temp_file_ext
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        def read_columns(self) -> tuple:
+            """
+            Reads names and values of all columns from file.
+            Unlike rows, columns of the same name are kept apart.
+            :return: tuple[list[str], list[list]]
+            """
+            with open(self.path, 'r', newline='') as f:
+                reader = csv.reader(f)
+                names = next(reader, [])
+                parse = self._parse_val
+                columns = [[] for _ in names]
+                for row in reader:
+                    for column, s in zip(columns, row):
+                        column.append(parse(s))
+            return names, columns
 
         def read(self, path: str=None) -> list:
             """
@@ -5018,11 +8448,46 @@ class RowLog:
             :return: list[dict]
             """
             path = path if path else self.path
-            with open(path, 'r') as f:
+            with open(path, 'r', newline='') as f:
                 reader = csv.DictReader(f)
                 # parse each row in reader from str to original types & return.
                 return [self._parse_dict(row) for row in reader]
 
+        @property
+        def column_names(self) -> list:
+            """
+            Gets names of logged columns, from the first line of the
+            file, which is read once.
+            :return: list[str]
+            """
+            if self._column_names is None:
+                with open(self.path, 'r', newline='') as f:
+                    self._column_names = next(csv.reader(f), [])
+            return self._column_names
+
+        def read_column(self, col_name: int or float or str) -> list:
+            """
+            Reads values of a single column from file, without parsing
+            values of other columns. The file is memory-mapped, rather
+            than read into memory as a whole.
+            Raises KeyError if file has no column of passed name.
+            :param col_name: int, float or str
+            :return: list
+            """
+            try:
+                x = self.column_names.index(col_name)
+            except ValueError:
+                raise KeyError(col_name)
+            parse = self._parse_val
+            encoding = locale.getpreferredencoding(False)  # as by open()
+            with open(self.path, 'rb') as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                lines = (line.decode(encoding)
+                         for line in iter(m.readline, b''))
+                reader = csv.reader(lines)
+                next(reader)  # skip header
+                return [parse(row[x]) for row in reader]
+
         def find_duplicates(
                 self,
                 value: int or float or str,
@@ -5089,12 +8554,11 @@ class RowLog:
             """
             if not isinstance(s, str):
                 raise ValueError('Expected str, got %s' % repr(s))
-            prefix = s[:3]
-            if prefix == RowLog.RowLogFile.none_str:
+            if s == RowLog.RowLogFile.none_str:
                 return None
             else:
                 # try to convert string value to value
-                return RowLog.RowLogFile.type_dict[prefix](s)
+                return RowLog.RowLogFile.type_dict[s[:4]](s[4:])
 
         def column_values(self, col_name: int or float or str or None) -> dict:
             """
@@ -5106,12 +8570,12 @@ class RowLog:
             try:  # try to get {value: row indices} dict from col_values dict.
                 d = self._col_values[col_name]
             except KeyError:  # if col_name key has not been entered, do that.
+                # only the column itself is read, unless all rows
+                # have already been read.
+                values = [row[col_name] for row in self._rows] if \
+                    self._rows is not None else self.read_column(col_name)
                 d = self._col_values[col_name] = {}
-                for row_i, row in enumerate(self.rows):  # for each row:
-                    # get relevant value for col.
-                    # this is accessed here to prevent a possible key error
-                    # from silently breaking and being caught below.
-                    v = row[col_name]
+                for row_i, v in enumerate(values):  # for each row:
                     try:  # try to add row index to set of indices with value
                         d[v].add(row_i)
                     except KeyError:  # if key does not exist, create entry
@@ -5124,12 +8588,54 @@ class RowLog:
             Gets rows from file.
             :return: list[dict]
             """
-            if not self._rows:
+            if self._rows is None:
                 self._rows = self.read()  # read file at path
             return self._rows
 
-        def _generate_name(self) -> str:
-            return datetime.datetime.now().isoformat()
+        @classmethod
+        def generate_name(cls) -> str:
+            """
+            Gets name of a new log file, from the current time.
+            :return: str
+            """
+            return datetime.datetime.now().isoformat() + cls.ext
+
+        def sources(self, row_i: int) -> list:
+            """
+            Gets the log file names and rows in which the passed row
+            of this file was logged; for files other than compacted
+            segments, this is the row itself.
+            :param row_i: int
+            :return: list[tuple[str, int]]
+            """
+            if RowLog.SOURCE_FILE_COLUMN not in self.column_names:
+                return [(self.name, row_i)]
+            if self._sources is None:
+                self._sources = list(zip(
+                    self.read_column(RowLog.SOURCE_FILE_COLUMN),
+                    self.read_column(RowLog.SOURCE_ROW_COLUMN)))
+            source_file, source_row = self._sources[row_i]
+            if not isinstance(source_row, str):
+                return [(source_file, source_row)]
+            return list(zip(
+                source_file.split(RowLog.SOURCE_SEPARATOR),
+                map(int, source_row.split(RowLog.SOURCE_SEPARATOR))))
+
+        @staticmethod
+        def join_sources(sources: list) -> tuple:
+            """
+            Gets values of source columns of a row of a compacted
+            segment, from the sources of the rows it stands for. A
+            single source is kept as file name and row index; several
+            are each joined by SOURCE_SEPARATOR.
+            :param sources: list[tuple[str, int]]
+            :return: tuple[str, int or str]
+            """
+            if len(sources) == 1:
+                return sources[0]
+            source_files, source_rows = zip(*sources)
+            return RowLog.SOURCE_SEPARATOR.join(source_files), \
+                RowLog.SOURCE_SEPARATOR.join(map(str, source_rows))
 
         @property
         def name(self) -> str:
@@ -5147,6 +8653,334 @@ class RowLog:
             return 'Log from: %s' % \
                    os.path.splitext(os.path.basename(self.path))[0]
 
+    class BinaryRowLogFile(RowLogFile):
+        """
+        Log file in a columnar binary format, from which single columns
+        are read without reading the others.
+        The file begins with a header holding the number of rows and
+        columns, then the name, offset and length of each column's
+        section. Each section holds a type code for each row, followed
+        by packed floats, packed ints, and dictionary codes of strings,
+        in row order, and finally the dictionary of distinct strings.
+        Numbers are packed little-endian.
+        """
+        ext = '.rlog'
+        MAGIC = b'RLOG\x01'
+        NONE, FLOAT, INT, STR = range(4)  # type codes of values
+
+        APPEND_BATCH_SIZE = 10000  # rows appended to columns at once
+
+        def write_columns(self, names: list, columns: list) -> None:
+            """
+            Writes passed columns of equal length to file.
+            :param names: list[str]
+            :param columns: list[list] of values of each column
+            :return: None
+            """
+            self.begin(names)
+            try:
+                self.append_columns(columns)
+            except BaseException:
+                self.discard()
+                raise
+            self.finish()
+
+        def begin(self, names: list) -> None:
+            """
+            Begins writing file with columns of passed names, as
+            RowLogFile.begin does. Each column is encoded as its values
+            are appended, and kept in temporary files until finish.
+            :param names: list of column names
+            :return: None
+            """
+            self._out_names = [
+                '' if name is None else str(name) for name in names]
+            self._out = [self.ColumnEncoder() for _ in names]
+
+        def append_rows(self, rows) -> None:
+            """
+            Appends passed rows to file being written, in batches of
+            APPEND_BATCH_SIZE rows.
+            :param rows: iterable of lists of values
+            :return: None
+            """
+            rows = iter(rows)
+            while True:
+                batch = list(itertools.islice(rows, self.APPEND_BATCH_SIZE))
+                if not batch:
+                    return
+                self.append_columns(
+                    [list(column) for column in zip(*batch)] if
+                    len(batch[0]) else [[] for _ in self._out])
+
+        def append_columns(self, columns: list) -> None:
+            """
+            Appends rows of passed columns of equal length to file
+            being written.
+            :param columns: list[list] of values of each column
+            :return: None
+            """
+            for encoder, values in zip(self._out, columns):
+                encoder.extend(values)
+
+        def finish(self) -> None:
+            """
+            Writes header and the section of each column to a temporary
+            file, which then replaces any file at path.
+            :return: None
+            """
+            encoders, self._out = self._out, None
+            temp_path = self.path + RowLog.temp_file_ext
+            try:
+                encoded_names = [
+                    name.encode('utf-8') for name in self._out_names]
+                offset = len(self.MAGIC) + 8 + sum(
+                    4 + len(name) + 16 for name in encoded_names)
+                header = [self.MAGIC, struct.pack(
+                    '<II', encoders[0].n_rows if encoders else 0,
+                    len(encoders))]
+                for name, encoder in zip(encoded_names, encoders):
+                    header.append(
+                        struct.pack('<I', len(name)) + name +
+                        struct.pack('<QQ', offset, encoder.length))
+                    offset += encoder.length
+                with open(temp_path, 'wb') as f:
+                    f.write(b''.join(header))
+                    for encoder in encoders:
+                        encoder.write_to(f)
+                os.replace(temp_path, self.path)
+            finally:
+                for encoder in encoders:
+                    encoder.close()
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+            self._column_names = None
+
+        def discard(self) -> None:
+            """
+            Discards file being written, leaving any file at path.
+            :return: None
+            """
+            if self._out is not None:
+                for encoder in self._out:
+                    encoder.close()
+                self._out = None
+
+        class ColumnEncoder:
+            """
+            Encodes values of a column as a section of a log file, one
+            batch of values at a time. Encoded values are kept in
+            temporary files, in memory until they grow large, so that
+            only the column's distinct strings are held in memory.
+            """
+            SPOOL_SIZE = 2 ** 20  # bytes of each part kept in memory
+
+            def __init__(self) -> None:
+                self.n_rows = 0
+                self.counts = [0, 0, 0]  # of floats, ints and str codes
+                self.strings = {}  # str: code
+                # types, floats, ints and str codes, in row order
+                self._parts = [tempfile.SpooledTemporaryFile(self.SPOOL_SIZE)
+                               for _ in range(4)]
+                self._encoded = None  # encoded strings, once finished
+
+            def extend(self, values: list) -> None:
+                """
+                Encodes passed values, following those already encoded.
+                :param values: list of int, float, str or None
+                :return: None
+                """
+                log_file_class = RowLog.BinaryRowLogFile
+                types = bytearray(len(values))
+                floats = array.array('d')
+                ints = array.array('q')
+                codes = array.array('I')
+                strings = self.strings
+                for i, value in enumerate(values):
+                    value_type = value.__class__
+                    if value is None:
+                        continue
+                    elif value_type is float:
+                        types[i] = log_file_class.FLOAT
+                        floats.append(value)
+                    elif value_type is int:
+                        types[i] = log_file_class.INT
+                        ints.append(value)
+                    elif value_type is str:
+                        types[i] = log_file_class.STR
+                        codes.append(strings.setdefault(value, len(strings)))
+                    else:
+                        raise TypeError('Cannot log value: %s' % repr(value))
+                packed = [floats, ints, codes]
+                if sys.byteorder != 'little':
+                    for a in packed:
+                        a.byteswap()
+                self._parts[0].write(types)
+                for part, a in zip(self._parts[1:], packed):
+                    part.write(a.tobytes())
+                self.n_rows += len(values)
+                self.counts = [n + len(a) for n, a in
+                               zip(self.counts, packed)]
+
+            @property
+            def encoded_strings(self) -> list:
+                """
+                Gets column's distinct strings, encoded in code order.
+                :return: list[bytes]
+                """
+                if self._encoded is None:
+                    self._encoded = [string.encode('utf-8', 'surrogatepass')
+                                     for string in self.strings]
+                return self._encoded
+
+            @property
+            def length(self) -> int:
+                """
+                Gets length in bytes of column's section.
+                :return: int
+                """
+                encoded = self.encoded_strings
+                return 32 + self.n_rows + 8 * self.counts[0] + \
+                    8 * self.counts[1] + 4 * self.counts[2] + \
+                    4 * len(encoded) + sum(map(len, encoded))
+
+            def write_to(self, f) -> None:
+                """
+                Writes column's section to passed binary file.
+                :param f: file object
+                :return: None
+                """
+                encoded = self.encoded_strings
+                f.write(struct.pack('<QQQQ', *self.counts, len(encoded)))
+                for part in self._parts:
+                    part.seek(0)
+                    shutil.copyfileobj(part, f)
+                lengths = array.array('I', [len(string) for string in encoded])
+                if sys.byteorder != 'little':
+                    lengths.byteswap()
+                f.write(lengths.tobytes())
+                f.write(b''.join(encoded))
+
+            def close(self) -> None:
+                """
+                Closes column's temporary files.
+                :return: None
+                """
+                for part in self._parts:
+                    part.close()
+
+        @classmethod
+        def _decode_column(cls, section: bytes, n_rows: int) -> list:
+            """
+            Decodes column values from a section of a log file.
+            :param section: bytes
+            :param n_rows: int
+            :return: list
+            """
+            counts = struct.unpack_from('<QQQQ', section)
+            position = 32
+            types = section[position:position + n_rows]
+            position += n_rows
+            packed = []
+            for type_code, count in zip('dqII', counts):
+                a = array.array(type_code)
+                a.frombytes(section[position:position + count * a.itemsize])
+                if sys.byteorder != 'little':
+                    a.byteswap()
+                packed.append(a)
+                position += count * a.itemsize
+            floats, ints, codes, lengths = packed
+            strings = []
+            for length in lengths:
+                strings.append(section[position:position + length].decode(
+                    'utf-8', 'surrogatepass'))
+                position += length
+            sources = (None, iter(floats), iter(ints),
+                       (strings[code] for code in codes))
+            return [None if type_code == cls.NONE else
+                    next(sources[type_code]) for type_code in types]
+
+        def _read_header(self) -> None:
+            """
+            Reads number of rows and the section of each column from
+            file header.
+            :return: None
+            """
+            with open(self.path, 'rb') as f:
+                if f.read(len(self.MAGIC)) != self.MAGIC:
+                    raise ValueError('%s is not a binary log file'
+                                     % self.path)
+                self._n_rows, n_columns = struct.unpack('<II', f.read(8))
+                self._column_names = []
+                self._sections = []
+                for _ in range(n_columns):
+                    length, = struct.unpack('<I', f.read(4))
+                    self._column_names.append(f.read(length).decode('utf-8'))
+                    self._sections.append(struct.unpack('<QQ', f.read(16)))
+
+        @property
+        def column_names(self) -> list:
+            """
+            Gets names of logged columns, from file header, which is
+            read once.
+            :return: list[str]
+            """
+            if self._column_names is None:
+                self._read_header()
+            return self._column_names
+
+        def _read_column_at(self, x: int) -> list:
+            """
+            Reads values of the column at index x of the file.
+            :param x: int
+            :return: list
+            """
+            names = self.column_names  # header is read if needed
+            assert 0 <= x < len(names)
+            offset, length = self._sections[x]
+            with open(self.path, 'rb') as f:
+                f.seek(offset)
+                return self._decode_column(f.read(length), self._n_rows)
+
+        def read_column(self, col_name: int or float or str) -> list:
+            """
+            Reads values of a single column from its section of file.
+            Raises KeyError if file has no column of passed name.
+            :param col_name: int, float or str
+            :return: list
+            """
+            try:
+                x = self.column_names.index(col_name)
+            except ValueError:
+                raise KeyError(col_name)
+            return self._read_column_at(x)
+
+        def read_columns(self) -> tuple:
+            """
+            Reads names and values of all columns from file.
+            :return: tuple[list[str], list[list]]
+            """
+            names = self.column_names
+            return names, [self._read_column_at(x) for x in range(len(names))]
+
+        def read(self, path: str=None) -> list:
+            """
+            Reads rows from file.
+            :param path: str path to file to read; by default, that of
+                this log file.
+            :return: list[dict]
+            """
+            log_file = self if path is None or path == self.path else \
+                RowLog.BinaryRowLogFile(path)
+            names, columns = log_file.read_columns()
+            return [dict(zip(names, row)) for row in zip(*columns)]
+
+    # log file class of each extension
+    log_file_classes = {
+        RowLogFile.ext: RowLogFile,
+        BinaryRowLogFile.ext: BinaryRowLogFile,
+    }
+
 
 class Color:
     """
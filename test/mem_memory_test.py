@@ -0,0 +1,65 @@
+"""
+Measures memory used by Cell objects and line / sheet registries
+when every cell of a sheet is visited, using the in-memory Mem
+interface, and how much of it is still held once the model and its
+sheets are no longer referenced.
+
+usage: python test/mem_memory_test.py [n rows] [n columns]
+"""
+
+from leadmacro import Office
+
+import gc
+import sys
+import tracemalloc
+
+DFT_ROWS = 100000
+DFT_COLUMNS = 40
+
+
+def visit_all_cells(n_rows: int, n_columns: int) -> int:
+    """
+    Creates a Mem model of n_rows x n_columns, takes a snapshot of
+    its sheet, and reads the value of every cell through Cell objects.
+    :return: int number of cells visited
+    """
+    model = Office.Mem.Model({'sheet': [
+        [float(x * y) for x in range(n_columns)] for y in range(n_rows)
+    ]})
+    sheet = model['sheet']
+    sheet.take_snapshot()
+    n = 0
+    for x in range(n_columns):
+        for cell in sheet.get_column(x):
+            cell.value
+            n += 1
+    return n
+
+
+def run_memory_benchmark(
+        n_rows: int=DFT_ROWS,
+        n_columns: int=DFT_COLUMNS
+) -> tuple:
+    """
+    Measures peak memory while visiting all cells of a sheet, and
+    memory retained after the visit has finished.
+    :return: tuple[int, int] of peak and retained bytes
+    """
+    Office.select_interface('Mem')
+    gc.collect()
+    tracemalloc.start()
+    n = visit_all_cells(n_rows, n_columns)
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    Office.select_interface(None)
+    print('visited %s cells' % n)
+    print('PEAK         : %.1f MiB' % (peak / 2 ** 20))
+    print('RETAINED     : %.1f MiB' % (retained / 2 ** 20))
+    return peak, retained
+
+
+if __name__ == '__main__':
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else DFT_ROWS
+    columns = int(sys.argv[2]) if len(sys.argv) > 2 else DFT_COLUMNS
+    run_memory_benchmark(rows, columns)
@@ -0,0 +1,176 @@
+"""
+Tests speed at which a translation is applied using the in-memory
+Mem interface. Unlike xw_speed_test, no office program is needed, so
+this may be run on any machine.
+
+usage: python test/mem_speed_test.py [n rows] [n columns]
+"""
+
+from leadmacro import Office, Translation, RowLog, CHECK_POOLS
+
+from time import time
+from random import Random
+
+from cProfile import run
+
+import csv
+import tempfile
+
+import settings
+
+import os
+import sys
+
+SOURCE_COLUMN_NAME_KEY = 'source_column_name'
+TARGET_COLUMN_NAME_KEY = 'target_column_name'
+WHITESPACE_CHK_KEY = 'check_for_whitespace'
+DUPLICATE_CHK_KEY = 'check_for_duplicates'
+
+DFT_ROWS = 100000
+DFT_COLUMNS = 20
+DFT_CHECK_COLUMNS = 40
+
+
+def make_model(n_rows: int, n_columns: int, seed: int=0):
+    """
+    Creates Mem model with a 'src' sheet of generated values and an
+    empty 'tgt' sheet whose headers are the src headers, reversed.
+    :param n_rows: int
+    :param n_columns: int
+    :param seed: int
+    :return: Office.Mem.Model
+    """
+    random = Random(seed)
+    headers = ['col %s' % x for x in range(n_columns)]
+    src_rows = [headers]
+    for y in range(n_rows):
+        row = []
+        for x in range(n_columns):
+            if x % 2:
+                value = 'value %s  %s' % (random.randrange(n_rows), x) \
+                    if random.random() < 0.05 else \
+                    'value %s %s' % (random.randrange(n_rows), x)
+            else:
+                value = float(random.randrange(n_rows * 10))
+            row.append(value)
+        src_rows.append(row)
+    return Office.Mem.Model({
+        'src': src_rows,
+        'tgt': [list(reversed(headers))],
+    })
+
+
+def run_translation_benchmark(n_rows: int=DFT_ROWS, n_columns: int=DFT_COLUMNS):
+    """
+    Times a translation of n_rows x n_columns, with 1/5 of columns
+    checked for duplicates and all checked for whitespace.
+    :return: float elapsed seconds
+    """
+    Office.select_interface('Mem')
+    print('building %s x %s model' % (n_rows, n_columns))
+    model = make_model(n_rows, n_columns)
+    src_sheet = model['src']
+    tgt_sheet = model['tgt']
+    src_sheet.exclusive_editor = True
+    tgt_sheet.exclusive_editor = True
+    translation_dicts = [{
+        SOURCE_COLUMN_NAME_KEY: name,
+        TARGET_COLUMN_NAME_KEY: name,
+        DUPLICATE_CHK_KEY: x <= n_columns / 5,
+        WHITESPACE_CHK_KEY: True
+    } for x, name in enumerate(src_sheet.columns.names)]
+    print('starting clock')
+    start_time = time()
+    translation_build_t1 = time()
+    translation = Translation(
+        None,
+        source_sheet=src_sheet,
+        target_sheet=tgt_sheet,
+        column_translations=translation_dicts,
+        interactive=False,
+    )
+    print('finished building translation (%ss)'
+          % (time() - translation_build_t1))
+    commit_t1 = time()
+    translation.commit()
+    print('finished commit. (%ss)' % (time() - commit_t1))
+    elapsed_time = time() - start_time
+    print('\nRUN TIME     : %s\n' % elapsed_time)
+    Office.select_interface(None)
+    return elapsed_time
+
+
+def run_check_benchmark(n_rows: int=DFT_ROWS, n_columns: int=DFT_CHECK_COLUMNS):
+    """
+    Times the checks made when a translation of n_rows x n_columns is
+    created, with all columns checked for duplicates and whitespace,
+    on each pool of CHECK_POOLS.
+    Pools can only be faster than serial checks on a machine with
+    more than one core; on a single core this shows their overhead.
+    :return: dict of pool name: float elapsed seconds
+    """
+    Office.select_interface('Mem')
+    print('building %s x %s model' % (n_rows, n_columns))
+    model = make_model(n_rows, n_columns)
+    src_sheet = model['src']
+    src_sheet.exclusive_editor = True
+    translation_dicts = [{
+        SOURCE_COLUMN_NAME_KEY: name,
+        TARGET_COLUMN_NAME_KEY: name,
+        DUPLICATE_CHK_KEY: True,
+        WHITESPACE_CHK_KEY: True
+    } for name in src_sheet.columns.names]
+    times = {}
+    for pool in CHECK_POOLS:
+        start_time = time()
+        Translation(
+            None,
+            source_sheet=src_sheet,
+            target_sheet=model['tgt'],
+            column_translations=translation_dicts,
+            interactive=False,
+            check_pool=pool,
+        )
+        times[pool] = time() - start_time
+    for pool, elapsed_time in times.items():
+        print('%-13s: %.3fs' % (pool.upper(), elapsed_time))
+    Office.select_interface(None)
+    return times
+
+
+def run_log_benchmark(n_rows: int=DFT_ROWS, n_columns: int=DFT_COLUMNS):
+    """
+    Times writing a log of a sheet of n_rows x n_columns, against
+    writing the same values to a csv file directly.
+    :return: tuple[float, float] of elapsed seconds for log and csv
+    """
+    Office.select_interface('Mem')
+    print('building %s x %s model' % (n_rows, n_columns))
+    model = make_model(n_rows, n_columns)
+    src_sheet = model['src']
+    src_sheet.exclusive_editor = True
+    # a translation logs its target from the snapshot it has filled,
+    # whose height is known.
+    src_sheet.take_snapshot()
+    with tempfile.TemporaryDirectory() as dir_path:
+        start_time = time()
+        RowLog.RowLogFile(dir_path, src_sheet, src_sheet.snapshot.height)
+        log_time = time() - start_time
+        start_time = time()
+        with open(os.path.join(dir_path, 'plain.csv'), 'w', newline='') as f:
+            csv.writer(f).writerows(src_sheet.i7e_sheet.rows)
+        csv_time = time() - start_time
+    print('LOG          : %.3fs' % log_time)
+    print('CSV          : %.3fs' % csv_time)
+    Office.select_interface(None)
+    return log_time, csv_time
+
+
+if __name__ == '__main__':
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else DFT_ROWS
+    columns = int(sys.argv[2]) if len(sys.argv) > 2 else DFT_COLUMNS
+    out_dir = os.path.join(settings.PROJECT_ROOT, 'out_test')
+    if not os.path.exists(out_dir):
+        os.mkdir(out_dir)
+    out = os.path.join(out_dir, 'mem_speed_test.cprof')
+    run('run_translation_benchmark(%s, %s)' % (rows, columns), out)
@@ -0,0 +1,255 @@
+"""
+Tests ColumnScan, which finds duplicate values and their first
+occurrences, and unneeded whitespace, in a single pass over a
+column's values.
+"""
+
+import threading
+
+from random import Random
+from unittest import TestCase, skipIf
+
+import leadmacro
+
+from leadmacro import ColumnScan, np, CHECK_SERIAL_STR, CHECK_THREADS_STR, \
+    CHECK_PROCESSES_STR, CHECK_AUTO_STR
+
+
+def naive_duplicates(values, start=0):
+    """
+    Finds duplicates by comparing each value with all previous values.
+    """
+    duplicates, firsts = [], []
+    for y in range(start, len(values)):
+        if values[y] is None:
+            continue
+        for first_y in range(start, y):
+            if values[first_y] == values[y]:
+                duplicates.append(y)
+                firsts.append(first_y)
+                break
+    return duplicates, firsts
+
+
+class TestFindDuplicates(TestCase):
+    def test_duplicates_and_first_occurrences_are_found(self):
+        values = ['a', 'b', 'a', 'c', 'b', 'a']
+        self.assertEqual(
+            ([2, 4, 5], [0, 1, 0]), ColumnScan.find_duplicates(values))
+
+    def test_scan_begins_at_start(self):
+        values = ['id', 'a', 'id', 'a']
+        self.assertEqual(([3], [1]), ColumnScan.find_duplicates(values, 1))
+
+    def test_whitespace_is_ignored(self):
+        values = ['new  york', ' new york', 'new\tyork\n', 'newyork']
+        self.assertEqual(
+            ([1, 2], [0, 0]), ColumnScan.find_duplicates(values))
+
+    def test_empty_cells_are_not_duplicates(self):
+        values = [None, '', 1., None, ' ', '', 1.]
+        self.assertEqual(([6], [2]), ColumnScan.find_duplicates(values))
+
+    def test_numbers_are_compared_by_value(self):
+        values = [1., 2., 1, 2.5, 2.]
+        self.assertEqual(
+            ([2, 4], [0, 1]), ColumnScan.find_duplicates(values))
+
+    def test_mixed_column_matches_naive_search(self):
+        random = Random(9)
+        values = [random.choice((None, 'a', 'b', 1., 2., 3))
+                  for _ in range(500)]
+        self.assertEqual(
+            naive_duplicates(values), ColumnScan.find_duplicates(values))
+
+    def test_million_rows(self):
+        n = 1000000
+        values = ['v%s' % (i % 250000) for i in range(n)]
+        values[0] = 'header'
+        duplicates, firsts = ColumnScan.find_duplicates(values, 1)
+        # 'v0' first occurs in place of the header's value, at 250000
+        self.assertEqual(n - 1 - 250000, len(duplicates))
+        self.assertEqual(250001, duplicates[0])
+        self.assertEqual(1, firsts[0])
+        self.assertEqual(500000, duplicates[249999])
+        self.assertEqual(250000, firsts[249999])
+        self.assertEqual(n - 1, duplicates[-1])
+        self.assertEqual(249999, firsts[-1])
+        self.assertTrue(all(values[y] == values[first_y]
+                            for y, first_y in zip(duplicates, firsts)))
+
+
+class TestFindWhitespace(TestCase):
+    def test_mask_and_cleaned_values(self):
+        values = ['a b', ' a', 'a\tb', 'a  b', 3., None, 'b\n', '']
+        mask, cleaned = ColumnScan.find_whitespace(values)
+        self.assertEqual(bytearray([0, 1, 1, 1, 0, 0, 1, 0]), mask)
+        self.assertEqual(
+            ['a b', 'a', 'a b', 'a b', 3., None, 'b', ''], cleaned)
+        self.assertEqual(' a', values[1])  # passed list is unchanged
+
+    def test_scan_begins_at_start(self):
+        mask, cleaned = ColumnScan.find_whitespace([' id ', ' a'], 1)
+        self.assertEqual(bytearray([0, 1]), mask)
+        self.assertEqual([' id ', 'a'], cleaned)
+
+    def test_precheck_matches_split(self):
+        random = Random(3)
+        characters = 'ab \t\n\r\x0b\x0c\xa0\u2003'
+        for _ in range(5000):
+            value = ''.join(random.choice(characters)
+                            for _ in range(random.randrange(6)))
+            self.assertEqual(
+                ' '.join(value.split()) != value,
+                ColumnScan.has_whitespace(value), repr(value))
+
+    def test_numbers_have_no_whitespace(self):
+        self.assertFalse(ColumnScan.has_whitespace(1.))
+        self.assertFalse(ColumnScan.has_whitespace(None))
+
+
+class TestFindDuplicatesPartitioned(TestCase):
+    def make_values(self):
+        random = Random(5)
+        return [random.choice((None, '', 'a', ' a', 'b  c', 'b c', 1., 1, 2.,
+                               'x%s' % random.randrange(300)))
+                for _ in range(3000)]
+
+    def test_partitioned_scan_matches_single_scan(self):
+        values = self.make_values()
+        for partitions in (1, 3, 4):
+            self.assertEqual(
+                ColumnScan.find_duplicates(values, 5),
+                ColumnScan.find_duplicates_partitioned(values, 5, partitions))
+
+    def test_offset_is_added_to_rows(self):
+        values = self.make_values()
+        duplicates, firsts = ColumnScan.find_duplicates(values, 2)
+        self.assertEqual(
+            ([y + 10 for y in duplicates], [y + 10 for y in firsts]),
+            ColumnScan.find_duplicates_partitioned(values, 2, 2, offset=10))
+
+    def test_long_columns_are_partitioned(self):
+        values = self.make_values()
+        expected = ColumnScan.find_duplicates(values, 1)
+        calls = []
+        partitioned = ColumnScan.find_duplicates_partitioned
+        can_partition = ColumnScan.can_partition
+        min_length = ColumnScan.PARTITION_MIN_LENGTH
+
+        def find_duplicates_partitioned(*args, **kwargs):
+            calls.append(args)
+            return partitioned(*args, **kwargs)
+
+        try:
+            ColumnScan.PARTITION_MIN_LENGTH = 1000
+            ColumnScan.can_partition = staticmethod(lambda: True)
+            ColumnScan.find_duplicates_partitioned = \
+                staticmethod(find_duplicates_partitioned)
+            self.assertEqual(expected, ColumnScan.find_duplicates(
+                values, 1, partition=True))
+            ColumnScan.find_duplicates(values, 1, first_rows={},
+                                       partition=True)
+            ColumnScan.find_duplicates(values[:900], partition=True)
+            self.assertEqual(expected, ColumnScan.find_duplicates(values, 1))
+        finally:
+            ColumnScan.PARTITION_MIN_LENGTH = min_length
+            ColumnScan.can_partition = staticmethod(can_partition)
+            ColumnScan.find_duplicates_partitioned = staticmethod(partitioned)
+        # carried indexes, short columns, and columns for which
+        # partitioning was not asked are scanned without workers
+        self.assertEqual(1, len(calls))
+
+    def test_columns_are_not_partitioned_while_threads_run(self):
+        stop = threading.Event()
+        thread = threading.Thread(target=stop.wait)
+        thread.start()
+        try:
+            self.assertFalse(ColumnScan.can_partition())
+        finally:
+            stop.set()
+            thread.join()
+
+    @skipIf(np is None, 'numpy is not installed')
+    def test_partitions_are_merged_without_numpy(self):
+        values = self.make_values()
+        expected = ColumnScan.find_duplicates_partitioned(values, 1, 3)
+        try:
+            leadmacro.np = None
+            self.assertEqual(
+                expected, ColumnScan.find_duplicates_partitioned(values, 1, 3))
+        finally:
+            leadmacro.np = np
+
+
+class TestMapColumns(TestCase):
+    def make_columns(self):
+        random = Random(4)
+        return [[random.choice(('a', ' b', 1., None)) for _ in range(200)]
+                for _ in range(6)]
+
+    def test_pools_return_results_in_order(self):
+        columns = self.make_columns()
+        expected = [ColumnScan.find_duplicates(values, 1)
+                    for values in columns]
+        for pool in (CHECK_SERIAL_STR, CHECK_THREADS_STR,
+                     CHECK_PROCESSES_STR, CHECK_AUTO_STR):
+            self.assertEqual(expected, ColumnScan.map_columns(
+                ColumnScan.find_duplicates,
+                [(values, 1) for values in columns], pool, 2), pool)
+
+    def test_processes_return_cleaned_values(self):
+        columns = self.make_columns()
+        self.assertEqual(
+            [ColumnScan.find_whitespace(values) for values in columns],
+            ColumnScan.map_columns(
+                ColumnScan.find_whitespace, [(values,) for values in columns],
+                CHECK_PROCESSES_STR, 2))
+
+    def test_worker_processes_are_not_forked(self):
+        self.assertNotEqual(
+            'fork', ColumnScan.process_context().get_start_method())
+
+    def test_errors_are_raised(self):
+        self.assertRaises(
+            TypeError, ColumnScan.map_columns, ColumnScan.find_whitespace,
+            [([' a'],), (None,)], CHECK_THREADS_STR)
+
+
+@skipIf(np is None, 'numpy is not installed')
+class TestFindDuplicatesWithNumPy(TestCase):
+    def test_number_column_matches_python_scan(self):
+        random = Random(12)
+        n = ColumnScan.NUMPY_MIN_LENGTH * 3
+        values = [float(random.randrange(n // 2))
+                  if random.random() < 0.9 else None for _ in range(n)]
+        values[0] = 'header'
+        found = ColumnScan._find_number_duplicates_np(values, 1)
+        self.assertIsNotNone(found)
+        firsts = {}
+        expected = [], []
+        for y in range(1, n):
+            if values[y] is not None:
+                first_y = firsts.setdefault(values[y], y)
+                if first_y != y:
+                    expected[0].append(y)
+                    expected[1].append(first_y)
+        self.assertEqual(expected, found)
+        self.assertEqual(expected, ColumnScan.find_duplicates(values, 1))
+
+    def test_python_scan_is_used_for_nan(self):
+        values = [float(i % 10) for i in range(ColumnScan.NUMPY_MIN_LENGTH)]
+        values[3] = float('nan')
+        values[5] = float('nan')
+        self.assertIsNone(ColumnScan._find_number_duplicates_np(values, 0))
+        duplicates, firsts = ColumnScan.find_duplicates(values)
+        self.assertNotIn(3, duplicates)
+        self.assertNotIn(5, duplicates)
+        self.assertEqual(naive_duplicates(values), (duplicates, firsts))
+
+    def test_python_scan_is_used_for_strings(self):
+        values = ['a'] * ColumnScan.NUMPY_MIN_LENGTH
+        self.assertIsNone(ColumnScan._find_number_duplicates_np(values, 0))
+        duplicates, firsts = ColumnScan.find_duplicates(values)
+        self.assertEqual(list(range(1, len(values))), duplicates)
+        self.assertEqual({0}, set(firsts))
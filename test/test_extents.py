@@ -0,0 +1,105 @@
+"""
+Tests Sheet.ExtentIndex, which finds line lengths without reading
+cells, against lengths found by iterating over lines with CellLine.
+"""
+
+from random import Random
+from unittest import TestCase
+
+from leadmacro import Office, Sheet, CellLine, MAX_CELL_GAP
+
+
+def probed_length(sheet, axis, index):
+    """
+    Gets length of line found by CellLine gap probing.
+    """
+    line = CellLine(sheet, axis, index)
+    line.length = None  # ignore extent index
+    return sum(1 for _ in line)
+
+
+class TestExtentIndex(TestCase):
+    def setUp(self):
+        Office.select_interface('Mem')
+        random = Random(4)
+        rows = []
+        for y in range(60):
+            rows.append([
+                'v%s' % random.randrange(100)
+                if random.random() < 0.15 or y < 2 else None
+                for _ in range(40)
+            ])
+        rows[3][25] = ''  # empty string is not a value
+        self.model = Office.Mem.Model({'sheet': rows})
+        self.sheet = self.model['sheet']
+        self.sheet.take_snapshot()
+
+    def tearDown(self):
+        Office.select_interface(None)
+
+    def assert_lengths_match_probing(self):
+        extents = self.sheet.extents
+        for x in range(45):
+            self.assertEqual(probed_length(self.sheet, 'y', x),
+                             extents.length('y', x), 'column %s' % x)
+        for y in range(65):
+            self.assertEqual(probed_length(self.sheet, 'x', y),
+                             extents.length('x', y), 'row %s' % y)
+
+    def test_complete_snapshot_has_extent_index(self):
+        self.assertTrue(self.sheet.snapshot.complete)
+        self.assertIs(self.sheet.snapshot.extents, self.sheet.extents)
+
+    def test_lengths_match_probing(self):
+        self.assert_lengths_match_probing()
+
+    def test_lengths_match_probing_after_writes(self):
+        self.assert_lengths_match_probing()  # find extents before writes
+        random = Random(5)
+        for _ in range(300):
+            x, y = random.randrange(45), random.randrange(65)
+            value = random.choice((None, '', 'new', 1.))
+            self.sheet.get_cell((x, y)).value = value
+        self.assert_lengths_match_probing()
+
+    def test_gap_is_split_by_write(self):
+        extents = self.sheet.extents
+        column = self.sheet.get_column(0)
+        for y in range(2, 60):
+            column.get_cell_by_index(y).value = None
+        self.assertEqual(2, len(column))
+        column.get_cell_by_index(2 + MAX_CELL_GAP).value = 'a'
+        self.assertEqual(2, len(column))
+        column.get_cell_by_index(2 + MAX_CELL_GAP // 2).value = 'b'
+        self.assertEqual(3 + MAX_CELL_GAP, len(column))
+        self.assertEqual([2 + MAX_CELL_GAP, []], extents.extent('y', 0))
+
+    def test_line_iteration_does_not_probe_cells(self):
+        column = self.sheet.get_column(1)
+        cells = list(column)
+        self.assertEqual(len(column), len(cells))
+        self.assertEqual(
+            [cell.position for cell in cells],
+            [(1, y) for y in range(len(cells))]
+        )
+
+    def test_sheet_without_snapshot_has_no_extent_index(self):
+        self.sheet.discard_snapshot()
+        self.assertIsNone(self.sheet.extents)
+
+    def test_exclusive_editor_reads_extent_index_from_used_range(self):
+        self.sheet.discard_snapshot()
+        self.sheet.exclusive_editor = True
+        try:
+            extents = self.sheet.extents
+            self.assertIsInstance(extents, Sheet.ExtentIndex)
+            self.assertIs(extents, self.sheet.extents)
+            self.sheet.get_cell((39, 0)).value = None  # clears cached index
+            self.assertIsNot(extents, self.sheet.extents)
+            self.assertEqual(39, len(self.sheet.get_row(0)))
+        finally:
+            self.sheet.exclusive_editor = False
+
+    def test_incomplete_snapshot_has_no_extent_index(self):
+        self.sheet.take_snapshot(width=5, height=5)
+        self.assertIsNone(self.sheet.extents)
@@ -0,0 +1,90 @@
+"""
+Tests lookup of columns and rows by name through a sheet's header
+index, using the in-memory Mem interface.
+"""
+
+from unittest import TestCase
+
+from leadmacro import Office, LineSeries
+
+
+class TestHeaderIndex(TestCase):
+    def setUp(self):
+        Office.select_interface('Mem')
+        self.model = Office.Mem.Model({'sheet': [
+            ['id', 'name', 'city', 'name'],
+            ['a', 1., 'x', None],
+            ['b', 2., 'y', None],
+        ]})
+        self.sheet = self.model['sheet']
+        self.sheet.exclusive_editor = True
+
+    def tearDown(self):
+        Office.select_interface(None)
+
+    def test_column_is_found_by_name(self):
+        self.assertEqual(2, self.sheet.get_column_index_from_name('city'))
+        self.assertEqual(2, self.sheet.get_column('city').index)
+        self.assertIsNone(self.sheet.get_column_index_from_name('foo'))
+
+    def test_first_column_of_repeated_name_is_found(self):
+        self.assertEqual(1, self.sheet.get_column_index_from_name('name'))
+
+    def test_row_is_found_by_name(self):
+        self.assertEqual(2, self.sheet.get_row_index_from_name('b'))
+        self.assertEqual(2, self.sheet.get_row('b').index)
+
+    def test_index_is_kept_between_lookups(self):
+        header_index = self.sheet.get_header_index(LineSeries.COLUMNS_STR)
+        self.sheet.get_column_index_from_name('id')
+        self.assertIs(
+            header_index,
+            self.sheet.get_header_index(LineSeries.COLUMNS_STR)
+        )
+
+    def test_index_is_not_kept_unless_exclusive_editor(self):
+        self.sheet.exclusive_editor = False
+        self.assertEqual(2, self.sheet.get_column_index_from_name('city'))
+        # header renamed by another editor
+        self.sheet.i7e_sheet.set_value(2, 0, 'town')
+        self.assertIsNone(self.sheet.get_column_index_from_name('city'))
+        self.assertEqual(2, self.sheet.get_column_index_from_name('town'))
+
+    def test_index_is_kept_with_complete_snapshot(self):
+        self.sheet.exclusive_editor = False
+        self.sheet.take_snapshot()
+        header_index = self.sheet.get_header_index(LineSeries.COLUMNS_STR)
+        self.assertIs(
+            header_index,
+            self.sheet.get_header_index(LineSeries.COLUMNS_STR)
+        )
+
+    def test_writing_header_cell_updates_index(self):
+        self.assertEqual(2, self.sheet.get_column_index_from_name('city'))
+        self.sheet.get_cell((2, 0)).value = 'town'
+        self.assertIsNone(self.sheet.get_column_index_from_name('city'))
+        self.assertEqual(2, self.sheet.get_column_index_from_name('town'))
+
+    def test_writing_other_cell_keeps_index(self):
+        header_index = self.sheet.get_header_index(LineSeries.COLUMNS_STR)
+        self.sheet.get_cell((2, 1)).value = 'z'
+        self.assertIs(
+            header_index,
+            self.sheet.get_header_index(LineSeries.COLUMNS_STR)
+        )
+
+    def test_changing_reference_row_updates_index(self):
+        self.assertEqual(0, self.sheet.get_column_index_from_name('id'))
+        self.sheet.reference_row_index = 1
+        self.assertEqual(2, self.sheet.get_column_index_from_name('x'))
+        self.assertIsNone(self.sheet.get_column_index_from_name('id'))
+
+    def test_line_series_get_by_name(self):
+        self.assertEqual(2, self.sheet.columns['city'].index)
+        self.assertEqual(1, self.sheet.rows['a'].index)
+        self.assertIsNone(self.sheet.columns.get_by_name('foo'))
+
+    def test_cell_by_reference(self):
+        self.assertEqual(2., self.sheet.get_column('name')['b'].value)
+        self.assertEqual('y', self.sheet.get_row(2)['city'].value)
+        self.assertIsNone(self.sheet.get_row(2).get_cell_by_reference('foo'))
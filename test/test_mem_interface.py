@@ -0,0 +1,244 @@
+"""
+Runs tests on the in-memory Mem interface, and on translations run
+through it. No office program is required for these tests.
+"""
+
+from unittest import TestCase
+
+import leadmacro
+from leadmacro import Office, Translation, DEFAULT_COLOR, \
+    SOURCE_COLUMN_NAME_KEY, TARGET_COLUMN_NAME_KEY, WHITESPACE_CHK_KEY, \
+    DUPLICATE_CHK_KEY, WHITESPACE_REMOVE_STR, DUPLICATE_REMOVE_ROW_STR, \
+    DUPLICATE_HIGHLIGHT_STR, DUPLICATE_CELL_COLOR
+
+
+class TestMemObj(TestCase):
+    def setUp(self):
+        Office.select_interface('Mem')
+        self.model = Office.Mem.Model({
+            'src': [
+                ['id', 'name', 'city'],
+                [1., 'a', 'x'],
+                [2., 'b  b', 'y'],
+                [3., 'c', 'z'],
+            ],
+            'tgt': [
+                ['city', 'ident', 'name'],
+            ],
+        })
+        self.src = self.model['src']
+        self.tgt = self.model['tgt']
+
+    def tearDown(self):
+        Office.select_interface(None)
+
+
+class TestMemModel(TestMemObj):
+    def test_get_interface_returns_selected_interface(self):
+        self.assertEqual('Mem', Office.get_interface())
+        self.assertIs(Office.Mem.Cell, Office.get_cell_class())
+
+    def test_select_interface_rejects_unknown_name(self):
+        self.assertRaises(ValueError, Office.select_interface, 'Foo')
+
+    def test_model_returns_same_sheet_for_name(self):
+        self.assertIsInstance(self.src, Office.Mem.Sheet)
+        self.assertIs(self.src, self.model['src'])
+        self.assertIs(self.src, self.model[0])
+
+    def test_sheet_exists_returns_first_existing_name(self):
+        self.assertEqual('tgt', self.model.sheet_exists('foo', 'tgt', 'src'))
+        self.assertIsNone(self.model.sheet_exists('foo'))
+
+    def test_sheet_names(self):
+        self.assertEqual(['src', 'tgt'], list(self.model.sheet_names))
+
+    def test_missing_sheet_raises_key_error(self):
+        self.assertRaises(KeyError, self.model.__getitem__, 'foo')
+
+
+class TestMemSheet(TestMemObj):
+    def test_cell_returns_stored_value(self):
+        self.assertEqual('b  b', self.src.get_cell((1, 2)).value)
+        self.assertIsNone(self.src.get_cell((10, 10)).value)
+
+    def test_cell_value_is_set_in_grid(self):
+        self.tgt.get_cell((2, 3)).value = 'new'
+        self.assertEqual('new', self.tgt.i7e_sheet.get_value(2, 3))
+
+    def test_cell_string_drops_trailing_zero(self):
+        self.assertEqual('2', self.src.get_cell((0, 2)).string)
+
+    def test_cell_color_defaults_and_is_set(self):
+        cell = self.tgt.get_cell((0, 1))
+        self.assertEqual(DEFAULT_COLOR, cell.get_color())
+        cell.set_color((255, 0, 0))
+        self.assertEqual(0xff0000, cell.get_color())
+        cell.set_color(DEFAULT_COLOR)
+        self.assertEqual(DEFAULT_COLOR, cell.get_color())
+
+    def test_column_names_and_lengths(self):
+        self.assertEqual(['id', 'name', 'city'], list(self.src.columns.names))
+        self.assertEqual(4, len(self.src.get_column('name')))
+        self.assertEqual(3, len(self.src.get_row(0)))
+
+    def test_snapshot_values_are_written_on_write(self):
+        self.src.take_snapshot()
+        self.src.get_cell((1, 1)).value = 'changed'
+        self.assertEqual('a', self.src.i7e_sheet.get_value(1, 1))
+        self.assertEqual('changed', self.src.get_cell((1, 1)).value)
+        self.src.write_snapshot()
+        self.src.discard_snapshot()
+        self.assertEqual('changed', self.src.i7e_sheet.get_value(1, 1))
+
+
+class TestMemTranslation(TestMemObj):
+    def make_translation(self, **kwargs):
+        return Translation(
+            None,
+            source_sheet=self.src,
+            target_sheet=self.tgt,
+            column_translations=[
+                {
+                    SOURCE_COLUMN_NAME_KEY: 'id',
+                    TARGET_COLUMN_NAME_KEY: 'ident',
+                    DUPLICATE_CHK_KEY: True,
+                    WHITESPACE_CHK_KEY: False,
+                },
+                {
+                    SOURCE_COLUMN_NAME_KEY: 'name',
+                    TARGET_COLUMN_NAME_KEY: 'name',
+                    DUPLICATE_CHK_KEY: False,
+                    WHITESPACE_CHK_KEY: True,
+                },
+            ],
+            interactive=False,
+            **kwargs
+        )
+
+    def tgt_values(self):
+        return self.tgt.i7e_sheet.get_block(0, 0, 3, 4)
+
+    def test_translation_moves_columns_by_name(self):
+        self.make_translation().commit()
+        self.assertEqual([
+            ['city', 'ident', 'name'],
+            [None, 1., 'a'],
+            [None, 2., 'b  b'],
+            [None, 3., 'c'],
+        ], self.tgt_values())
+
+    def test_translation_removes_whitespace(self):
+        self.make_translation(whitespace_action=WHITESPACE_REMOVE_STR).commit()
+        self.assertEqual('b b', self.tgt.i7e_sheet.get_value(2, 2))
+
+    def test_translation_highlights_duplicates(self):
+        self.src.i7e_sheet.set_value(0, 3, 1.)
+        self.make_translation(duplicate_action=DUPLICATE_HIGHLIGHT_STR)\
+            .commit()
+        self.assertEqual(
+            DUPLICATE_CELL_COLOR, self.tgt.i7e_sheet.colors[(1, 3)])
+        self.assertNotIn((1, 1), self.tgt.i7e_sheet.colors)
+
+    def test_translation_highlights_only_cells_in_moved_rows(self):
+        self.src.i7e_sheet.set_value(0, 3, 1.)
+        self.make_translation(duplicate_action=DUPLICATE_HIGHLIGHT_STR)\
+            .commit()
+        # whitespace in 'b  b' is highlighted as well
+        self.assertEqual({(1, 3), (2, 2)}, set(self.tgt.i7e_sheet.colors))
+
+    def test_translation_writes_from_target_start_row(self):
+        self.make_translation(target_start_row=3).commit()
+        values = self.tgt.i7e_sheet.get_block(0, 0, 3, 6)
+        self.assertEqual([None, None, None], values[1])
+        self.assertEqual([None, 1., 'a'], values[3])
+        self.assertEqual([None, 3., 'c'], values[5])
+
+    def test_removed_rows_are_left_out_of_target(self):
+        self.src.i7e_sheet.set_value(0, 2, 1.)
+        translation = self.make_translation(
+            duplicate_action=DUPLICATE_REMOVE_ROW_STR)
+        self.assertEqual({2}, translation.row_deletions)
+        translation.commit()
+        self.assertEqual([
+            ['city', 'ident', 'name'],
+            [None, 1., 'a'],
+            [None, 3., 'c'],
+            [None, None, None],
+        ], self.tgt_values())
+
+    def test_highlights_follow_compacted_rows(self):
+        self.src.i7e_sheet.set_value(0, 2, 1.)
+        self.src.i7e_sheet.set_value(1, 3, ' c')
+        self.make_translation(
+            duplicate_action=DUPLICATE_REMOVE_ROW_STR).commit()
+        self.assertEqual({(2, 2)}, set(self.tgt.i7e_sheet.colors))
+
+    def test_translation_removes_rows_with_duplicates(self):
+        self.src.i7e_sheet.set_value(0, 3, 1.)
+        self.make_translation(duplicate_action=DUPLICATE_REMOVE_ROW_STR)\
+            .commit()
+        values = self.tgt_values()
+        self.assertEqual([None, 2., 'b  b'], values[2])
+        self.assertNotIn('c', [row[2] for row in values])
+
+    def test_translation_clears_target_below_start_row(self):
+        self.tgt.i7e_sheet.set_block(0, 1, [['old', 'old', 'old']] * 5)
+        self.tgt.get_cell((0, 5)).set_color(DUPLICATE_CELL_COLOR)
+        self.tgt.get_cell((0, 0)).set_color(DUPLICATE_CELL_COLOR)
+        self.make_translation().commit()
+        self.assertEqual([None, None, None, None, None], [
+            row[0] for row in self.tgt.i7e_sheet.get_block(0, 1, 1, 5)])
+        self.assertEqual([None, None, None], self.tgt.i7e_sheet.rows[5])
+        self.assertNotIn((0, 5), self.tgt.i7e_sheet.colors)
+        self.assertIn((0, 0), self.tgt.i7e_sheet.colors)  # above start row
+
+    def test_cancelled_overwrite_leaves_target(self):
+        self.tgt.i7e_sheet.set_value(0, 1, 'old')
+        translation = self.make_translation()
+        translation.interactive = True
+        translation._confirm_overwrite = lambda: False
+        translation.commit()
+        self.assertEqual([['city', 'ident', 'name'], ['old']],
+                         self.tgt.i7e_sheet.rows)
+        self.assertIsNone(self.tgt.snapshot)
+
+    def test_empty_target_is_not_confirmed(self):
+        translation = self.make_translation()
+        translation.interactive = True
+        translation._confirm_overwrite = lambda: self.fail('confirmed')
+        self.assertTrue(translation.clear_target())
+
+    def test_translation_does_not_require_dialogs(self):
+        self.assertIsNone(leadmacro.app)
+        self.make_translation().commit()
+
+
+class TestMemWithoutSelection(TestCase):
+    """
+    Mem objects are bound to their interface, and so should be usable
+    without the interface being selected or detected.
+    """
+    def setUp(self):
+        Office.select_interface(None)
+        self.model = Office.Mem.Model({'sheet': [['a', 'b'], [1., 2.]]})
+
+    def test_sheet_lines_and_cells_are_of_model_interface(self):
+        sheet = self.model['sheet']
+        self.assertIsInstance(sheet, Office.Mem.Sheet)
+        self.assertIs(Office.Mem, sheet.interface)
+        self.assertIsInstance(sheet.get_column('b'), Office.Mem.Column)
+        self.assertIsInstance(sheet.get_row(1), Office.Mem.Row)
+        self.assertIsInstance(sheet.get_cell((1, 1)), Office.Mem.Cell)
+        self.assertEqual(2., sheet.get_cell((1, 1)).value)
+
+    def test_interface_is_not_detected(self):
+        def fail():
+            raise AssertionError('interface should not be detected')
+        get_interface = Office.get_interface
+        Office.get_interface = staticmethod(fail)
+        try:
+            sheet = self.model['sheet']
+            self.assertEqual(2, len(sheet.get_column(0)))
+        finally:
+            Office.get_interface = get_interface
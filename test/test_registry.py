@@ -0,0 +1,63 @@
+"""
+Tests that Cells are stateless views, and that sheets and lines are
+released once the Model using them is no longer referenced.
+"""
+
+import gc
+
+from unittest import TestCase
+
+from leadmacro import Office, Sheet, Column, Row
+
+
+class TestCellView(TestCase):
+    def setUp(self):
+        Office.select_interface('Mem')
+        self.model = Office.Mem.Model({'sheet': [['a', 'b'], [1., 2.]]})
+        self.sheet = self.model['sheet']
+
+    def tearDown(self):
+        Office.select_interface(None)
+
+    def test_cell_has_no_dict(self):
+        cell = self.sheet.get_cell((0, 1))
+        self.assertFalse(hasattr(cell, '__dict__'))
+
+    def test_cells_of_same_position_are_equal(self):
+        cell = self.sheet.get_cell((1, 1))
+        other = self.sheet.get_cell((1, 1))
+        self.assertEqual(cell, other)
+        self.assertEqual(hash(cell), hash(other))
+        self.assertEqual(1, len({cell, other}))
+        self.assertNotEqual(cell, self.sheet.get_cell((1, 0)))
+
+    def test_cells_share_values(self):
+        self.sheet.get_cell((1, 1)).value = 3.
+        self.assertEqual(3., self.sheet.get_cell((1, 1)).value)
+
+
+class TestWeakRegistry(TestCase):
+    def setUp(self):
+        Office.select_interface('Mem')
+
+    def tearDown(self):
+        Office.select_interface(None)
+
+    def test_sheet_is_kept_while_model_is_used(self):
+        model = Office.Mem.Model({'sheet': [['a']]})
+        model['sheet'].exclusive_editor = True
+        gc.collect()
+        self.assertTrue(model['sheet'].exclusive_editor)
+
+    def test_sheets_and_lines_are_released_with_model(self):
+        model = Office.Mem.Model({'sheet': [['a', 'b'], [1., 2.]]})
+        sheet = model['sheet']
+        key = repr(sheet)
+        list(sheet.get_column(1))
+        sheet.get_row(1)
+        self.assertIn(key, Sheet._all_sheets)
+        del model, sheet
+        gc.collect()
+        self.assertNotIn(key, Sheet._all_sheets)
+        self.assertFalse([k for k in Column._all.keys() if repr(k[0]) == key])
+        self.assertFalse([k for k in Row._all.keys() if repr(k[0]) == key])
@@ -1,10 +1,14 @@
 import os
+import tempfile
+import time
 
 import settings
 
-from unittest import TestCase
+from unittest import TestCase, mock
 
-from leadmacro import RowLog
+from leadmacro import Office, OS, RowLog, Translation, StreamingTranslation, \
+    SOURCE_COLUMN_NAME_KEY, TARGET_COLUMN_NAME_KEY, DUPLICATE_CHK_KEY, \
+    DUPLICATE_HIGHLIGHT_STR, DUPLICATE_REMOVE_ROW_STR
 
 
 class TestRowLog(TestCase):
@@ -32,3 +36,669 @@ class TestRowLog(TestCase):
         )
         # delete created folder
         os.removedirs(os.path.join(self.row_log_dir, new_group_name))
+
+
+class TestRowLogIndex(TestCase):
+    def setUp(self):
+        Office.select_interface('Mem')
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.model = Office.Mem.Model({
+            'a': [['id', 'name'], [1., 'x'], [2., 'y'], [1., 'z']],
+            'b': [['id', 'name'], [3., 'y'], [2., 'w']],
+        })
+
+    def tearDown(self):
+        Office.select_interface(None)
+        self.temp_dir.cleanup()
+
+    def make_row_log(self):
+        row_log = RowLog(self.temp_dir.name)
+        row_log.new_group('group')
+        row_log.make_log('group', self.model['a'])
+        row_log.make_log('group', self.model['b'])
+        return row_log
+
+    def test_log_files_can_be_read(self):
+        row_log = self.make_row_log()
+        group = row_log._groups['group']
+        self.assertEqual(
+            [[{'id': 1., 'name': 'x'}, {'id': 2., 'name': 'y'},
+              {'id': 1., 'name': 'z'}],
+             [{'id': 3., 'name': 'y'}, {'id': 2., 'name': 'w'}]],
+            [log_file.read() for log_file in sorted(
+                group.log_files.values(), key=lambda log: log.name)])
+
+    def test_index_matches_log_file_scan(self):
+        row_log = self.make_row_log()
+        group = row_log._groups['group']
+        self.assertIsNotNone(group.index)
+        for value, column_name in ((1., 'id'), (2, 'id'), ('y', 'name'),
+                                   ('q', 'name'), ('x', 'id')):
+            scanned = sorted(
+                (log_file.name, row_i)
+                for log_file in group.log_files.values()
+                for row_i in log_file.find_duplicates(value, column_name))
+            self.assertEqual(
+                scanned, list(row_log.find_duplicates(
+                    value, 'group', column_name)), (value, column_name))
+
+    def test_index_is_kept_between_runs(self):
+        names = sorted(self.make_row_log().file_names('group'))
+        row_log = RowLog(self.temp_dir.name)
+        group = row_log._groups['group']
+        for log_file in group.log_files.values():
+            log_file._rows = []  # files should not be read again
+        self.assertEqual([(names[0], 1), (names[1], 1)],
+                         list(row_log.find_duplicates(2., 'group', 'id')))
+
+    def test_removed_files_are_removed_from_index(self):
+        names = sorted(self.make_row_log().file_names('group'))
+        os.remove(os.path.join(self.temp_dir.name, 'group', names[1]))
+        row_log = RowLog(self.temp_dir.name)
+        self.assertEqual([(names[0], 1)],
+                         list(row_log.find_duplicates('y', 'group', 'name')))
+
+    def test_file_indexed_twice_is_indexed_once(self):
+        row_log = self.make_row_log()
+        group = row_log._groups['group']
+        other = RowLog.Group(group.path)  # as opened by another process
+        for log_file in group.log_files.values():
+            group.index.add(log_file)
+            other.index.add(log_file)
+        self.assertEqual(2, len(list(
+            row_log.find_duplicates(1., 'group', 'id'))))
+        other.index.close()
+
+    def test_columns_of_the_same_name_are_each_indexed(self):
+        row_log = RowLog(self.temp_dir.name)
+        row_log.new_group('group')
+        model = Office.Mem.Model({'a': [['id', 'id'], [1., 2.]]})
+        row_log.make_log('group', model['a'])
+        name, = row_log.file_names('group')
+        index = row_log._groups['group'].index
+        index.update(row_log._groups['group'].log_files)
+        self.assertEqual([(name, 0)], list(index.find(2., 'id')))
+
+    def test_deleted_group_removes_index(self):
+        row_log = self.make_row_log()
+        list(row_log.find_duplicates('y', 'group', 'name'))
+        row_log.delete_group('group')
+        self.assertFalse(os.path.exists(
+            os.path.join(self.temp_dir.name, 'group')))
+
+
+class TestLazyRowLogFile(TestCase):
+    def setUp(self):
+        Office.select_interface('Mem')
+        self.temp_dir = tempfile.TemporaryDirectory()
+        model = Office.Mem.Model({
+            'a': [['id', 'name'], [1., 'x, "y"'], [2., None], [1., 'z\n']],
+        })
+        log_file = RowLog.RowLogFile(self.temp_dir.name, model['a'])
+        self.path = log_file.path
+
+    def tearDown(self):
+        Office.select_interface(None)
+        self.temp_dir.cleanup()
+
+    def test_file_is_not_read_when_opened(self):
+        parsed = []
+        parse_val = RowLog.RowLogFile._parse_val
+        try:
+            RowLog.RowLogFile._parse_val = staticmethod(
+                lambda s: parsed.append(s) or parse_val(s))
+            group = RowLog(self.temp_dir.name)
+            self.assertEqual([], list(group.group_names))
+            RowLog.RowLogFile(self.path)
+            RowLog.Group(self.temp_dir.name)
+        finally:
+            RowLog.RowLogFile._parse_val = staticmethod(parse_val)
+        self.assertEqual([], parsed)
+
+    def test_single_column_is_read(self):
+        log_file = RowLog.RowLogFile(self.path)
+        self.assertEqual(['id', 'name'], log_file.column_names)
+        self.assertEqual(['x, "y"', None, 'z\n'], log_file.read_column('name'))
+        self.assertEqual({1.: {0, 2}, 2.: {1}}, log_file.column_values('id'))
+        self.assertIsNone(log_file._rows)
+        self.assertEqual([r['name'] for r in log_file.read()],
+                         log_file.read_column('name'))
+
+    def test_missing_column_has_no_duplicates(self):
+        log_file = RowLog.RowLogFile(self.path)
+        self.assertRaises(KeyError, log_file.read_column, 'other')
+        self.assertEqual([], list(log_file.find_duplicates(1., 'other')))
+
+
+class TestBloomFilter(TestCase):
+    def test_added_values_are_found(self):
+        bloom_filter = RowLog.BloomFilter(1000, 0.01)
+        bloom_filter.update(['a', 1., None])
+        self.assertIn('a', bloom_filter)
+        self.assertIn(1, bloom_filter)  # equal numbers are found
+        self.assertIn(None, bloom_filter)
+        self.assertNotIn('b', bloom_filter)
+        self.assertEqual(3, bloom_filter.count)
+
+    def test_false_positive_rate_is_near_configured_rate(self):
+        bloom_filter = RowLog.BloomFilter(2000, 0.02)
+        bloom_filter.update('v%s' % i for i in range(2000))
+        false_positives = sum('w%s' % i in bloom_filter for i in range(5000))
+        self.assertLess(false_positives / 5000, 0.04)
+        self.assertAlmostEqual(
+            0.02, bloom_filter.expected_false_positive_rate(), delta=0.005)
+
+    def test_size_may_be_set(self):
+        bloom_filter = RowLog.BloomFilter(1000, size=64)
+        self.assertEqual(64, len(bloom_filter.bits))
+        self.assertIn('64 bytes', str(bloom_filter))
+
+
+class TestRowLogFilters(TestCase):
+    def setUp(self):
+        Office.select_interface('Mem')
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.model = Office.Mem.Model({
+            'a': [['id', 'name'], [1., 'x'], [2., 'y']],
+            'b': [['id', 'name'], [3., 'y']],
+        })
+
+    def tearDown(self):
+        Office.select_interface(None)
+        self.temp_dir.cleanup()
+
+    def test_definite_negatives_are_not_looked_up(self):
+        row_log = RowLog(self.temp_dir.name, filter_capacity=100)
+        row_log.new_group('group')
+        row_log.make_log('group', self.model['a'])
+        group = row_log._groups['group']
+        group.index = None  # log files would be scanned
+        for log_file in group.log_files.values():
+            log_file._col_values = None  # fails if scanned
+        self.assertEqual([], list(row_log.find_duplicates(5., 'group', 'id')))
+        self.assertEqual([], list(row_log.find_duplicates('x', 'group', 'q')))
+
+    def test_filters_are_updated_and_kept_between_runs(self):
+        row_log = RowLog(self.temp_dir.name, filter_capacity=100)
+        row_log.new_group('group')
+        row_log.make_log('group', self.model['a'])
+        self.assertFalse(row_log._groups['group'].might_contain(3., 'id'))
+        row_log.make_log('group', self.model['b'])
+        self.assertTrue(row_log._groups['group'].might_contain(3., 'id'))
+        group = RowLog(self.temp_dir.name)._groups['group']
+        self.assertTrue(group.might_contain('y', 'name'))
+        self.assertEqual(3, group.filters['name'].count)
+        self.assertIn('name: 3 values', group.filter_report())
+
+    def test_filters_are_rebuilt_without_removed_files(self):
+        row_log = RowLog(self.temp_dir.name, filter_capacity=100)
+        row_log.new_group('group')
+        row_log.make_log('group', self.model['a'])
+        row_log.make_log('group', self.model['b'])
+        self.assertTrue(row_log._groups['group'].might_contain(3., 'id'))
+        os.remove(os.path.join(
+            self.temp_dir.name, 'group',
+            max(row_log.file_names('group'))))
+        group = RowLog(self.temp_dir.name)._groups['group']
+        self.assertFalse(group.might_contain(3., 'id'))
+        self.assertTrue(group.might_contain(2., 'id'))
+
+    def test_full_filters_are_resized(self):
+        row_log = RowLog(self.temp_dir.name, filter_capacity=1)
+        row_log.new_group('group')
+        row_log.make_log('group', self.model['a'])
+        group = row_log._groups['group']
+        self.assertEqual(4, group.filters['id'].capacity)
+        self.assertEqual(
+            [(min(row_log.file_names('group')), 1)],
+            list(row_log.find_duplicates('y', 'group', 'name')))
+
+
+    def test_filters_are_rebuilt_reading_each_file_once(self):
+        row_log = RowLog(self.temp_dir.name, filter_capacity=1)
+        row_log.new_group('group')
+        row_log.make_log('group', self.model['a'])
+        row_log.make_log('group', self.model['b'])
+        self.assertTrue(row_log._groups['group'].might_contain(3., 'id'))
+        os.remove(os.path.join(
+            self.temp_dir.name, 'group',
+            max(row_log.file_names('group'))))
+        group = RowLog(self.temp_dir.name, filter_capacity=1)._groups['group']
+        read = []
+        for log_file in group.log_files.values():
+            read_columns = log_file.read_columns
+            log_file.read_columns = \
+                lambda f=read_columns: read.append(f) or f()
+            log_file.read_column = None  # fails if called
+        self.assertTrue(group.might_contain(2., 'id'))
+        self.assertEqual(1, len(read))
+        # sized from the count of the previous filter, which held the
+        # values of the removed file
+        self.assertEqual(6, group.filters['id'].capacity)
+
+    def test_columns_of_the_same_name_are_each_filtered(self):
+        row_log = RowLog(self.temp_dir.name, filter_capacity=100)
+        row_log.new_group('group')
+        row_log.make_log(
+            'group', Office.Mem.Model({'a': [['id', 'id'], [1., 2.]]})['a'])
+        self.assertEqual(1, len(list(
+            row_log.find_duplicates(2., 'group', 'id'))))
+
+class TestRowLogFileWrite(TestCase):
+    def setUp(self):
+        Office.select_interface('Mem')
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.model = Office.Mem.Model({
+            'a': [['id', 'name', 'n'], [1., 'x'], [2., None, 3], [4., 'z', '']],
+        })
+        self.sheet = self.model['a']
+
+    def tearDown(self):
+        Office.select_interface(None)
+        self.temp_dir.cleanup()
+
+    def test_rows_are_written_from_bulk_reads(self):
+        reads = []
+        read_block = self.sheet.read_block
+
+        def counting_read_block(x0, y0, x1, y1):
+            reads.append((x0, y0, x1, y1))
+            return read_block(x0, y0, x1, y1)
+
+        self.sheet.read_block = counting_read_block
+        self.sheet.READ_WINDOW = 2
+        log_file = RowLog.RowLogFile(self.temp_dir.name, self.sheet)
+        self.assertEqual([(0, 1, 3, 3), (0, 3, 3, 4)], reads)
+        self.assertEqual([
+            {'id': 1., 'name': 'x', 'n': None},
+            {'id': 2., 'name': None, 'n': 3},
+            {'id': 4., 'name': 'z', 'n': None},
+        ], RowLog.RowLogFile(log_file.path).read())
+
+    def test_rows_are_written_from_snapshot(self):
+        self.sheet.take_snapshot()
+        self.sheet.read_block = None  # fails if sheet is read
+        log_file = RowLog.RowLogFile(self.temp_dir.name, self.sheet)
+        self.assertEqual(['x', None, 'z'],
+                         RowLog.RowLogFile(log_file.path).read_column('name'))
+
+    def test_rows_are_written_to_known_height(self):
+        self.sheet.take_snapshot()
+        with mock.patch.object(
+                type(self.sheet), 'reference_column',
+                property(lambda sheet: self.fail('column was measured'))):
+            log_file = RowLog.RowLogFile(self.temp_dir.name, self.sheet, 3)
+        self.assertEqual([1., 2.],
+                         RowLog.RowLogFile(log_file.path).read_column('id'))
+
+
+class TestBinaryRowLogFile(TestCase):
+    def setUp(self):
+        Office.select_interface('Mem')
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.model = Office.Mem.Model({
+            'a': [['id', 'name', 3.], [1., 'x', 2], [2., None, -5],
+                  [1., 'x', 'é y'], [3., '', None]],
+        })
+
+    def tearDown(self):
+        Office.select_interface(None)
+        self.temp_dir.cleanup()
+
+    def test_values_are_read_back(self):
+        log_file = RowLog.BinaryRowLogFile(
+            self.temp_dir.name, self.model['a'])
+        self.assertTrue(log_file.path.endswith('.rlog'))
+        log_file = RowLog.BinaryRowLogFile(log_file.path)
+        self.assertEqual(['id', 'name', '3.0'], log_file.column_names)
+        self.assertEqual([
+            {'id': 1., 'name': 'x', '3.0': 2},
+            {'id': 2., 'name': None, '3.0': -5},
+            {'id': 1., 'name': 'x', '3.0': 'é y'},
+            {'id': 3., 'name': None, '3.0': None},
+        ], log_file.rows)
+        self.assertEqual({'x': {0, 2}, None: {1, 3}},
+                         log_file.column_values('name'))
+
+    def test_only_checked_column_is_decoded(self):
+        log_file = RowLog.BinaryRowLogFile(
+            self.temp_dir.name, self.model['a'])
+        log_file = RowLog.BinaryRowLogFile(log_file.path)
+        decoded = []
+        decode_column = RowLog.BinaryRowLogFile._decode_column.__func__
+
+        def counting_decode_column(cls, section, n_rows):
+            decoded.append(section)
+            return decode_column(cls, section, n_rows)
+
+        try:
+            RowLog.BinaryRowLogFile._decode_column = \
+                classmethod(counting_decode_column)
+            self.assertEqual([0, 2], sorted(log_file.find_duplicates(1, 'id')))
+        finally:
+            RowLog.BinaryRowLogFile._decode_column = \
+                classmethod(decode_column)
+        self.assertEqual(1, len(decoded))
+
+    def test_new_logs_are_binary(self):
+        row_log = RowLog(self.temp_dir.name)
+        row_log.new_group('group')
+        row_log.make_log('group', self.model['a'])
+        self.assertTrue(all(name.endswith('.rlog')
+                            for name in row_log.file_names('group')))
+
+    def test_csv_logs_are_converted(self):
+        group_path = os.path.join(self.temp_dir.name, 'group')
+        os.mkdir(group_path)
+        csv_log = RowLog.RowLogFile(group_path, self.model['a'])
+        expected = csv_log.read()
+        row_log = RowLog(self.temp_dir.name)
+        self.assertEqual([(csv_log.name, 1)],
+                         list(row_log.find_duplicates(2, 'group', 'id')))
+        group = row_log._groups['group']
+        converted = group.convert_logs()
+        self.assertEqual([csv_log.name[:-len('.csv')] + '.rlog'], converted)
+        self.assertEqual(converted, [
+            name for name in os.listdir(group_path)
+            if name.endswith(('.csv', '.rlog'))])
+        self.assertEqual(expected, group.log_files[converted[0]].read())
+        self.assertEqual([(converted[0], 1)],
+                         list(row_log.find_duplicates(2, 'group', 'id')))
+        self.assertEqual([], group.convert_logs())
+        self.assertFalse(os.path.exists(group.compaction_lock_path))
+
+    def test_interrupted_conversion_is_finished(self):
+        group_path = os.path.join(self.temp_dir.name, 'group')
+        os.mkdir(group_path)
+        csv_log = RowLog.RowLogFile(group_path, self.model['a'])
+        row_log = RowLog(self.temp_dir.name)
+        group = row_log._groups['group']
+        with mock.patch.object(os, 'remove', side_effect=OSError):
+            self.assertRaises(OSError, group.convert_logs)
+        os.remove(group.compaction_lock_path)
+        rlog_name = csv_log.name[:-len('.csv')] + '.rlog'
+        self.assertTrue(os.path.exists(csv_log.path))  # left by crash
+        row_log = RowLog(self.temp_dir.name)
+        self.assertEqual([rlog_name], list(row_log.file_names('group')))
+        self.assertEqual([(rlog_name, 1)],
+                         list(row_log.find_duplicates(2, 'group', 'id')))
+        self.assertEqual([], row_log._groups['group'].convert_logs())
+        self.assertFalse(os.path.exists(csv_log.path))
+
+    def test_logs_are_not_converted_while_compacting(self):
+        group_path = os.path.join(self.temp_dir.name, 'group')
+        os.mkdir(group_path)
+        csv_log = RowLog.RowLogFile(group_path, self.model['a'])
+        group = RowLog(self.temp_dir.name)._groups['group']
+        open(group.compaction_lock_path, 'w').close()
+        with mock.patch.object(RowLog, 'COMPACTION_LOCK_WAIT', 0.1):
+            self.assertRaises(IOError, group.convert_logs)
+        self.assertEqual([csv_log.name], list(group.file_names))
+        self.assertTrue(os.path.exists(csv_log.path))
+
+
+class TestRowLogCompaction(TestCase):
+    def setUp(self):
+        Office.select_interface('Mem')
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.model = Office.Mem.Model({
+            'a': [['id', 'name'], [1., 'x'], [2., 'y'], [1., 'x']],
+            'b': [['id', 'name', 'other'], [2., 'y'], [3., 'y', 'o']],
+            'c': [['id', 'name'], [3., 'y'], [1., 'x']],
+        })
+
+    def tearDown(self):
+        Office.select_interface(None)
+        self.temp_dir.cleanup()
+
+    def make_row_log(self, **kwargs):
+        row_log = RowLog(self.temp_dir.name, **kwargs)
+        row_log.new_group('group')
+        for sheet_name in ('a', 'b', 'c'):
+            row_log.make_log('group', self.model[sheet_name])
+        return row_log
+
+    def test_logs_are_merged_without_duplicate_rows(self):
+        row_log = self.make_row_log()
+        names = sorted(row_log.file_names('group'))
+        before = sorted(row_log.find_duplicates('y', 'group', 'name'))
+        segment = row_log.compact('group')
+        self.assertEqual([segment], list(row_log.file_names('group')))
+        self.assertEqual(
+            [segment], [name for name in os.listdir(
+                os.path.join(self.temp_dir.name, 'group'))
+                if name.endswith(RowLog.log_file_ext)])
+        log_file = row_log._groups['group'].log_files[segment]
+        self.assertEqual([1., 2., 3., 3.], log_file.read_column('id'))
+        self.assertEqual([None, None, 'o', None],
+                         log_file.read_column('other'))
+        # rows found are reported by every file they were logged in
+        self.assertEqual(
+            [(names[0], 1), (names[1], 0), (names[1], 1), (names[2], 0)],
+            before)
+        self.assertEqual(
+            before, sorted(row_log.find_duplicates('y', 'group', 'name')))
+        self.assertEqual(
+            [(names[0], 0), (names[0], 2), (names[2], 1)],
+            sorted(row_log.find_duplicates(1., 'group', 'id')))
+
+    def test_segment_is_written_one_file_at_a_time(self):
+        row_log = self.make_row_log()
+        log_file_class = RowLog.log_file_classes[RowLog.log_file_ext]
+        append_columns = log_file_class.append_columns
+        batches = []
+
+        def counting_append_columns(log_file, columns):
+            batches.append(len(columns[0]))
+            return append_columns(log_file, columns)
+
+        with mock.patch.object(
+                log_file_class, 'append_columns', counting_append_columns):
+            row_log.compact('group')
+        self.assertEqual([2, 1, 1], batches)  # kept rows of each file
+
+    def test_segments_are_compacted_again(self):
+        row_log = self.make_row_log()
+        names = sorted(row_log.file_names('group'))
+        segment = row_log.compact('group')
+        row_log.make_log('group', self.model['c'])
+        new_name, = set(row_log.file_names('group')) - {segment}
+        row_log.compact('group')
+        self.assertEqual(1, len(list(row_log.file_names('group'))))
+        self.assertEqual(
+            [(names[0], 0), (names[0], 2), (names[2], 1), (new_name, 1)],
+            sorted(row_log.find_duplicates(1., 'group', 'id')))
+
+    def test_reader_listed_before_compaction_finds_values(self):
+        self.make_row_log()
+        reader = RowLog(self.temp_dir.name)
+        group = reader._groups['group']
+        group.index = None  # files are scanned
+        self.assertEqual(3, len(list(group.find_duplicates(1., 'id'))))
+        RowLog(self.temp_dir.name).compact('group')
+        self.assertEqual(
+            4, len(list(reader.find_duplicates('y', 'group', 'name'))))
+
+    def test_one_compaction_runs_at_a_time(self):
+        row_log = self.make_row_log()
+        lock_path = os.path.join(
+            self.temp_dir.name, 'group', RowLog.compaction_lock_file_name)
+        open(lock_path, 'w').close()
+        self.assertIsNone(row_log.compact('group'))
+        self.assertEqual(3, len(list(row_log.file_names('group'))))
+        stale_time = time.time() - RowLog.COMPACTION_LOCK_TIMEOUT - 1
+        os.utime(lock_path, (stale_time, stale_time))
+        self.assertIsNotNone(row_log.compact('group'))
+        self.assertFalse(os.path.exists(lock_path))
+
+    def test_group_is_compacted_in_background(self):
+        row_log = self.make_row_log(compaction_threshold=3)
+        group = row_log._groups['group']
+        group.compaction.join()
+        self.assertEqual(1, len(list(row_log.file_names('group'))))
+        self.assertEqual(
+            2, len(list(row_log.find_duplicates(2., 'group', 'id'))))
+
+    def test_failed_compaction_leaves_no_files(self):
+        row_log = self.make_row_log()
+        group_path = os.path.join(self.temp_dir.name, 'group')
+        names = sorted(os.listdir(group_path))
+
+        def append_columns(log_file, *args):
+            open(log_file.path, 'w').close()  # partly written
+            raise IOError('disk is full')
+
+        with mock.patch.object(
+                RowLog.log_file_classes[RowLog.log_file_ext],
+                'append_columns', append_columns):
+            self.assertRaises(IOError, row_log.compact, 'group')
+        self.assertEqual(names, sorted(os.listdir(group_path)))
+        self.assertEqual(3, len(list(row_log.file_names('group'))))
+
+    def test_group_is_deleted_with_leftover_files(self):
+        row_log = self.make_row_log()
+        group_path = os.path.join(self.temp_dir.name, 'group')
+        open(os.path.join(group_path, 'segment' + RowLog.log_file_ext +
+                          RowLog.temp_file_ext), 'w').close()
+        lock_path = os.path.join(
+            group_path, RowLog.compaction_lock_file_name)
+        open(lock_path, 'w').close()
+        stale_time = time.time() - RowLog.COMPACTION_LOCK_TIMEOUT - 1
+        os.utime(lock_path, (stale_time, stale_time))
+        row_log.delete_group('group')
+        self.assertFalse(os.path.exists(group_path))
+        self.assertNotIn('group', list(row_log.group_names))
+
+    def test_group_is_not_deleted_while_compacting(self):
+        row_log = self.make_row_log()
+        group_path = os.path.join(self.temp_dir.name, 'group')
+        lock_path = os.path.join(
+            group_path, RowLog.compaction_lock_file_name)
+        open(lock_path, 'w').close()
+        with mock.patch.object(RowLog, 'COMPACTION_LOCK_WAIT', 0.1):
+            self.assertRaises(IOError, row_log.delete_group, 'group')
+        self.assertEqual(3, len(list(row_log.file_names('group'))))
+        os.remove(lock_path)
+        row_log.delete_group('group')
+        self.assertFalse(os.path.exists(group_path))
+
+
+class TestTranslationReadsLog(TestCase):
+    def setUp(self):
+        Office.select_interface('Mem')
+        self.temp_dir = tempfile.TemporaryDirectory()
+        row_log = RowLog(self.temp_dir.name)
+        row_log.new_group('group')
+        logged = Office.Mem.Model({
+            'logged': [['ident', 'name'], [2., 'x'], [5., 'y']],
+        })
+        row_log.make_log('group', logged['logged'])
+
+    def tearDown(self):
+        Office.select_interface(None)
+        self.temp_dir.cleanup()
+
+    def translate(self, translation_class, duplicate_action, read_log=True,
+                  **kwargs):
+        model = Office.Mem.Model({
+            'src': [['id', 'name'], [1., 'a'], [2., 'b'], [3., 'c'],
+                    [2., 'd'], [4., 'e'], [5., 'f']],
+            'tgt': [['ident']],
+        })
+        with mock.patch.object(
+                OS, 'get_log_dir_path', lambda: self.temp_dir.name):
+            translation = translation_class(
+                None,
+                source_sheet=model['src'],
+                target_sheet=model['tgt'],
+                column_translations=[{
+                    SOURCE_COLUMN_NAME_KEY: 'id',
+                    TARGET_COLUMN_NAME_KEY: 'ident',
+                    DUPLICATE_CHK_KEY: True,
+                }],
+                duplicate_action=duplicate_action,
+                read_log=read_log,
+                log_group='group',
+                interactive=False,
+                **kwargs
+            )
+            translation.commit()
+        return translation, model['tgt'].i7e_sheet
+
+    def test_logged_values_are_removed(self):
+        for translation_class, kwargs in (
+                (Translation, {}),
+                (StreamingTranslation, {'window_size': 2})):
+            translation, grid = self.translate(
+                translation_class, DUPLICATE_REMOVE_ROW_STR, **kwargs)
+            self.assertEqual({2, 4, 6}, translation.row_deletions)
+            self.assertEqual([['ident'], [1.], [3.], [4.]], grid.rows)
+
+    def test_logged_values_are_highlighted(self):
+        translation, _ = self.translate(Translation, DUPLICATE_HIGHLIGHT_STR)
+        self.assertEqual(
+            [(0, 2), (0, 4), (0, 6)],
+            sorted(translation._duplicate_positions))
+
+    def test_log_is_not_read_unless_set(self):
+        translation, _ = self.translate(
+            Translation, DUPLICATE_REMOVE_ROW_STR, read_log=False)
+        self.assertEqual({4}, translation.row_deletions)
+
+
+class TestTranslationWritesLog(TestCase):
+    def setUp(self):
+        Office.select_interface('Mem')
+        self.temp_dir = tempfile.TemporaryDirectory()
+        RowLog(self.temp_dir.name).new_group('group')
+
+    def tearDown(self):
+        Office.select_interface(None)
+        self.temp_dir.cleanup()
+
+    def translate(self, translation_class, **kwargs):
+        model = Office.Mem.Model({
+            'src': [['id', 'name']] + [
+                [float(y % 7), 'n%s' % (y % 5)] for y in range(20)],
+            'tgt': [['name', 'other', 'ident']],
+        })
+        with mock.patch.object(
+                OS, 'get_log_dir_path', lambda: self.temp_dir.name):
+            translation = translation_class(
+                None,
+                source_sheet=model['src'],
+                target_sheet=model['tgt'],
+                column_translations=[{
+                    SOURCE_COLUMN_NAME_KEY: name,
+                    TARGET_COLUMN_NAME_KEY: target_name,
+                    DUPLICATE_CHK_KEY: name == 'id',
+                } for name, target_name in (('id', 'ident'),
+                                            ('name', 'name'))],
+                duplicate_action=DUPLICATE_REMOVE_ROW_STR,
+                write_log=True,
+                log_group='group',
+                interactive=False,
+                **kwargs
+            )
+            if translation_class is StreamingTranslation:
+                def read(*args):
+                    raise AssertionError('target was read back')
+                model['tgt'].read_rows = model['tgt'].read_columns = read
+            translation.commit()
+        group = translation.row_log._groups['group']
+        log_files = list(group.log_files.values())
+        self.assertEqual(1, len(log_files))
+        return log_files[0].read_columns()
+
+    def test_streamed_log_matches_translation_log(self):
+        expected = self.translate(Translation)
+        self.assertEqual(
+            (['name', 'other', 'ident'],
+             [['n0', 'n1', 'n2', 'n3', 'n4', 'n0', 'n1'], [None] * 7,
+              [0., 1., 2., 3., 4., 5., 6.]]),
+            expected)
+        for name in os.listdir(os.path.join(self.temp_dir.name, 'group')):
+            if name.endswith(RowLog.log_file_ext):
+                os.remove(os.path.join(self.temp_dir.name, 'group', name))
+        self.assertEqual(expected, self.translate(
+            StreamingTranslation, window_size=3))
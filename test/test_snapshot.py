@@ -0,0 +1,290 @@
+"""
+Tests Sheet.Snapshot storage, using the in-memory Mem interface.
+"""
+
+import array
+
+from unittest import TestCase
+
+from leadmacro import Office, Sheet
+
+ColumnBuffer = Sheet.Snapshot.ColumnBuffer
+
+
+class TestColumnBuffer(TestCase):
+    def test_float_column_is_packed_with_mask(self):
+        column = ColumnBuffer.from_values([1., None, 3.])
+        self.assertEqual(ColumnBuffer.FLOAT, column.kind)
+        self.assertIsInstance(column.data, array.array)
+        self.assertEqual('d', column.data.typecode)
+        self.assertEqual(bytearray([1, 0, 1]), column.mask)
+        self.assertEqual([1., None, 3.], column.values())
+
+    def test_int_column_keeps_int_values(self):
+        column = ColumnBuffer.from_values([1, 2, None])
+        self.assertEqual(ColumnBuffer.INT, column.kind)
+        self.assertEqual([1, 2, None], column.values())
+        self.assertIs(int, type(column.get(0)))
+
+    def test_str_column_is_a_list(self):
+        column = ColumnBuffer.from_values(['a', None, 'b'])
+        self.assertEqual(ColumnBuffer.STR, column.kind)
+        self.assertEqual(['a', None, 'b'], column.data)
+
+    def test_mixed_column_is_stored_as_objects(self):
+        values = ['a', 1.] * 20
+        column = ColumnBuffer.from_values(values)
+        self.assertEqual(ColumnBuffer.OBJECT, column.kind)
+        self.assertEqual(values, column.values())
+
+    def test_packed_column_holds_header_as_other_value(self):
+        column = ColumnBuffer.from_values(['header', 1., None, 2])
+        self.assertEqual(ColumnBuffer.FLOAT, column.kind)
+        self.assertEqual({0: 'header', 3: 2}, column.others)
+        self.assertEqual(['header', 1., None, 2], column.values())
+        self.assertEqual([1., None], column.values(1, 3))
+        self.assertIs(int, type(column.get(3)))
+
+    def test_setting_many_other_values_changes_storage(self):
+        values = [float(i) for i in range(20)]
+        column = ColumnBuffer.from_values(values)
+        for i in range(20):
+            column.set(i, str(i))
+        self.assertEqual(ColumnBuffer.OBJECT, column.kind)
+        self.assertEqual([str(i) for i in range(20)], column.values())
+
+    def test_setting_packed_value_over_other_value(self):
+        column = ColumnBuffer.from_values(['a', 2.])
+        column.set(0, 1.)
+        self.assertEqual({}, column.others)
+        self.assertEqual([1., 2.], column.values())
+
+    def test_setting_none_masks_value(self):
+        column = ColumnBuffer.from_values([1., 2.])
+        column.set(0, None)
+        self.assertEqual(ColumnBuffer.FLOAT, column.kind)
+        self.assertEqual([None, 2.], column.values())
+
+    def test_extend_adds_empty_values(self):
+        column = ColumnBuffer.from_values([1., 2.])
+        column.extend(2)
+        self.assertEqual([1., 2., None, None], column.values())
+
+    def test_set_values_in_place_keeps_storage(self):
+        column = ColumnBuffer.from_values(['header', 1., 2., 3.])
+        data = column.data
+        column.set_values(1, [4., None])
+        self.assertIs(data, column.data)
+        self.assertEqual(['header', 4., None, 3.], column.values())
+        column.set_values(0, [5.])
+        self.assertEqual({}, column.others)
+        self.assertEqual([5., 4., None, 3.], column.values())
+
+    def test_set_values_of_other_type_changes_storage(self):
+        column = ColumnBuffer.from_values(['a', 'b', None])
+        column.set_values(1, [1., 2.])
+        self.assertEqual(ColumnBuffer.FLOAT, column.kind)
+        self.assertEqual(['a', 1., 2.], column.values())
+
+    def test_values_slice(self):
+        column = ColumnBuffer.from_values([1., None, 3., 4.])
+        self.assertEqual([None, 3.], column.values(1, 3))
+
+
+class TestSnapshot(TestCase):
+    def setUp(self):
+        Office.select_interface('Mem')
+        self.model = Office.Mem.Model({'sheet': [
+            ['id', 'name'],
+            [1., 'a'],
+            [2., 'b'],
+        ]})
+        self.sheet = self.model['sheet']
+        self.sheet.take_snapshot()
+        self.snapshot = self.sheet.snapshot
+
+    def tearDown(self):
+        Office.select_interface(None)
+
+    def test_snapshot_stores_values_by_column(self):
+        self.assertEqual([1., 2.], self.snapshot.get_column_values(0, 1))
+        self.assertEqual(['name', 'a', 'b'],
+                         self.snapshot.get_column_values(1))
+        # header is held beside packed numbers
+        self.assertEqual(ColumnBuffer.FLOAT, self.snapshot.get_column(0).kind)
+        self.assertEqual(ColumnBuffer.STR, self.snapshot.get_column(1).kind)
+
+    def test_numeric_column_is_packed(self):
+        grid = Office.Mem.Grid('numbers', [[float(i)] for i in range(100)])
+        sheet = Office.Mem.Sheet.factory(grid)
+        sheet.take_snapshot()
+        column = sheet.snapshot.get_column(0)
+        self.assertEqual(ColumnBuffer.FLOAT, column.kind)
+        self.assertEqual([float(i) for i in range(100)],
+                         sheet.snapshot.get_column_values(0))
+
+    def test_get_value_outside_snapshot_raises_index_error(self):
+        self.assertRaises(IndexError, self.snapshot.get_value, 2, 0)
+        self.assertRaises(IndexError, self.snapshot.get_value, 0, 3)
+        self.assertRaises(IndexError, self.snapshot.get_column_values, 2)
+
+    def test_grown_rows_are_independent(self):
+        self.snapshot.set_value(0, 6, 6.)
+        self.snapshot.set_value(2, 5, 'c')
+        self.assertEqual((3, 7), (self.snapshot.width, self.snapshot.height))
+        self.assertEqual(6., self.snapshot.get_value(0, 6))
+        self.assertIsNone(self.snapshot.get_value(0, 5))
+        self.assertEqual('c', self.snapshot.get_value(2, 5))
+        self.assertIsNone(self.snapshot.get_value(2, 6))
+
+    def test_rows_added_one_at_a_time_double_capacity(self):
+        lengths = set()
+        for y in range(3, 1000):
+            self.snapshot.set_value(0, y, float(y))
+            lengths.add(len(self.snapshot.get_column(1)))
+        self.assertEqual(1000, self.snapshot.height)
+        self.assertLessEqual(len(lengths), 10)
+        self.assertEqual(1000, len(self.snapshot.get_column_values(1)))
+        self.assertEqual(999., self.snapshot.get_value(0, 999))
+        self.assertIsNone(self.snapshot.get_value(1, 999))
+        self.assertRaises(IndexError, self.snapshot.get_value, 1, 1000)
+
+    def test_set_block_and_get_block(self):
+        self.snapshot.set_block(1, 2, [['x', 1.], ['y']])
+        self.assertEqual((3, 4), (self.snapshot.width, self.snapshot.height))
+        self.assertEqual([[2., 'x', 1.], [None, 'y', None]],
+                         self.snapshot.get_block(0, 2, 3, 4))
+        self.assertEqual([(1, 2, 3, 4)], self.snapshot.dirty_rectangles())
+
+    def test_write_returns_rows_to_sheet(self):
+        self.snapshot.set_value(1, 3, 'c')
+        self.sheet.write_snapshot()
+        self.assertEqual([None, 'c'], self.sheet.i7e_sheet.rows[3])
+        self.assertEqual([2., 'b'], self.sheet.i7e_sheet.rows[2])
+
+    def test_set_column_places_values_in_one_operation(self):
+        self.snapshot.set_column(1, ['x', 'y', 'z'], 1)
+        self.assertEqual(['name', 'x', 'y', 'z'],
+                         self.snapshot.get_column_values(1))
+        self.assertEqual(4, self.snapshot.height)
+        self.assertEqual(4, len(self.sheet.get_column(1)))
+        self.assertEqual(2, len(self.sheet.get_row(3)))
+
+    def test_set_column_changes_column_storage(self):
+        self.snapshot.set_column(1, [1., 2.], 1)
+        self.assertEqual(ColumnBuffer.FLOAT, self.snapshot.get_column(1).kind)
+
+    def test_set_column_over_header_updates_header_index(self):
+        self.assertEqual(1, self.sheet.get_column_index_from_name('name'))
+        self.snapshot.set_column(1, ['title'])
+        self.assertEqual(1, self.sheet.get_column_index_from_name('title'))
+
+
+class TestDirtyRectangles(TestCase):
+    def setUp(self):
+        Office.select_interface('Mem')
+        self.model = Office.Mem.Model({'sheet': [
+            [float(x + y) for x in range(10)] for y in range(10)]})
+        self.sheet = self.model['sheet']
+        self.sheet.take_snapshot()
+        self.snapshot = self.sheet.snapshot
+
+    def tearDown(self):
+        Office.select_interface(None)
+
+    def test_snapshot_is_clean_when_taken(self):
+        self.assertEqual([], self.snapshot.dirty_rectangles())
+
+    def test_changed_columns_are_joined(self):
+        self.snapshot.set_column(2, [0.] * 4, 5)
+        self.snapshot.set_column(3, [0.] * 4, 5)
+        self.snapshot.set_value(9, 0, 0.)
+        self.assertEqual([(2, 5, 4, 9), (9, 0, 10, 1)],
+                         self.snapshot.dirty_rectangles())
+
+    def test_unchanged_cells_are_not_covered(self):
+        self.snapshot.set_column(2, [0.] * 4, 5)
+        self.snapshot.set_column(3, [0.] * 3, 5)
+        self.snapshot.set_value(3, 1, 0.)
+        self.assertEqual([(2, 5, 3, 9), (3, 1, 4, 2), (3, 5, 4, 8)],
+                         sorted(self.snapshot.dirty_rectangles()))
+
+    def test_runs_of_changed_rows_are_joined(self):
+        for y in (7, 3, 4, 9, 5):
+            self.snapshot.set_value(1, y, 0.)
+            self.snapshot.set_value(2, y, 0.)
+        self.assertEqual([(1, 3, 3, 6), (1, 7, 3, 8), (1, 9, 3, 10)],
+                         self.snapshot.dirty_rectangles())
+        self.snapshot.set_column(1, [0.] * 4, 6)
+        self.assertEqual(
+            [(1, 3, 2, 10), (2, 3, 3, 6), (2, 7, 3, 8), (2, 9, 3, 10)],
+            self.snapshot.dirty_rectangles())
+
+    def test_write_sends_only_changed_values(self):
+        self.sheet.i7e_sheet.set_value(0, 0, 'changed elsewhere')
+        self.snapshot.set_value(4, 4, 'a')
+        self.sheet.write_snapshot()
+        self.assertEqual('a', self.sheet.i7e_sheet.get_value(4, 4))
+        self.assertEqual(
+            'changed elsewhere', self.sheet.i7e_sheet.get_value(0, 0))
+        self.assertEqual([], self.snapshot.dirty_rectangles())
+
+    def test_cleared_region_is_not_written_again(self):
+        self.sheet.clear_region(0, 5, 10, 10)
+        self.assertEqual([], self.snapshot.dirty_rectangles())
+        self.assertIsNone(self.sheet.get_cell((3, 7)).value)
+
+
+class TestSnapshotColors(TestCase):
+    def setUp(self):
+        Office.select_interface('Mem')
+        self.model = Office.Mem.Model({'sheet': [['id', 'name']]})
+        self.sheet = self.model['sheet']
+        self.sheet.take_snapshot()
+        self.snapshot = self.sheet.snapshot
+
+    def tearDown(self):
+        Office.select_interface(None)
+
+    def test_color_is_kept_in_snapshot_until_written(self):
+        cell = self.sheet.get_cell((1, 4))
+        cell.set_color((255, 0, 0))
+        self.assertEqual(0xff0000, cell.get_color())
+        self.assertEqual({}, self.sheet.i7e_sheet.colors)
+        self.sheet.write_snapshot()
+        self.assertEqual({(1, 4): 0xff0000}, self.sheet.i7e_sheet.colors)
+        self.assertIsNone(self.snapshot.get_color(1, 4))
+
+    def test_equal_colors_are_joined_into_rectangles(self):
+        for x in range(3):
+            for y in range(2, 5):
+                self.snapshot.set_color(x, y, 1)
+        self.snapshot.set_color(3, 2, 2)
+        self.snapshot.set_color(4, 2, 1)
+        self.snapshot.set_color(5, 2, 1)
+        self.snapshot.set_color(5, 3, 1)
+        self.assertEqual([
+            (0, 2, 3, 5, 1),
+            (3, 2, 4, 3, 2),
+            (4, 2, 5, 3, 1),
+            (5, 2, 6, 4, 1),
+        ], sorted(self.snapshot.color_rectangles()))
+
+    def test_rectangles_cover_colors_set(self):
+        colors = {(x, y): (x * y) % 3 for x in range(7) for y in range(9)
+                  if (x + y) % 4}
+        for (x, y), color in colors.items():
+            self.snapshot.set_color(x, y, color)
+        covered = {}
+        for x0, y0, x1, y1, color in self.snapshot.color_rectangles():
+            for x in range(x0, x1):
+                for y in range(y0, y1):
+                    self.assertNotIn((x, y), covered)
+                    covered[(x, y)] = color
+        self.assertEqual(colors, covered)
+
+    def test_cleared_region_discards_colors(self):
+        self.snapshot.set_color(0, 1, 1)
+        self.snapshot.set_color(0, 0, 1)
+        self.sheet.clear_region(0, 1, 2, 3)
+        self.assertEqual([(0, 0, 1, 1, 1)], self.snapshot.color_rectangles())
@@ -0,0 +1,267 @@
+"""
+Tests StreamingTranslation, which moves rows one window at a time,
+against Translation, which reads the whole source sheet at once, using
+the in-memory Mem interface.
+"""
+
+import threading
+
+from random import Random
+from unittest import TestCase
+
+from leadmacro import Office, ColumnScan, Translation, StreamingTranslation, \
+    SOURCE_COLUMN_NAME_KEY, TARGET_COLUMN_NAME_KEY, WHITESPACE_CHK_KEY, \
+    DUPLICATE_CHK_KEY, WHITESPACE_REMOVE_STR, WHITESPACE_HIGHLIGHT_STR, \
+    DUPLICATE_REMOVE_ROW_STR, DUPLICATE_HIGHLIGHT_STR, CHECK_THREADS_STR, \
+    CHECK_PROCESSES_STR, CHECK_SERIAL_STR
+
+N_ROWS = 300
+
+
+def make_source_rows(seed: int) -> list:
+    random = Random(seed)
+    rows = [['id', 'name', 'other']]
+    for _ in range(N_ROWS):
+        rows.append([
+            float(random.randrange(N_ROWS)),
+            random.choice(('a', 'b', ' c', 'd  d', 'e')) +
+            str(random.randrange(50)),
+            'x',
+        ])
+    return rows
+
+
+class TestStreamingTranslation(TestCase):
+    def setUp(self):
+        Office.select_interface('Mem')
+
+    def tearDown(self):
+        Office.select_interface(None)
+
+    def run_translation(self, translation_class, check_all=False, **kwargs):
+        model = Office.Mem.Model({
+            'src': make_source_rows(1),
+            'tgt': [['name', 'skipped', 'ident'], ['old', 'old', 'old']],
+        })
+        translation = translation_class(
+            None,
+            source_sheet=model['src'],
+            target_sheet=model['tgt'],
+            column_translations=[
+                {
+                    SOURCE_COLUMN_NAME_KEY: 'id',
+                    TARGET_COLUMN_NAME_KEY: 'ident',
+                    DUPLICATE_CHK_KEY: True,
+                    WHITESPACE_CHK_KEY: check_all,
+                },
+                {
+                    SOURCE_COLUMN_NAME_KEY: 'name',
+                    TARGET_COLUMN_NAME_KEY: 'name',
+                    DUPLICATE_CHK_KEY: check_all,
+                    WHITESPACE_CHK_KEY: True,
+                },
+            ],
+            interactive=False,
+            **kwargs
+        )
+        translation.commit()
+        grid = model['tgt'].i7e_sheet
+        return grid.get_block(0, 0, 3, N_ROWS + 1), grid.colors, translation
+
+    def assert_matches_translation(self, **kwargs):
+        expected_values, expected_colors, expected = \
+            self.run_translation(Translation, **kwargs)
+        for threaded in (False, True):
+            values, colors, streaming = self.run_translation(
+                StreamingTranslation, window_size=7, threaded=threaded,
+                **kwargs)
+            self.assertEqual(expected_values, values)
+            self.assertEqual(expected_colors, colors)
+            self.assertEqual(expected.row_deletions, streaming.row_deletions)
+        return streaming
+
+    def test_highlights_match_translation(self):
+        streaming = self.assert_matches_translation(
+            duplicate_action=DUPLICATE_HIGHLIGHT_STR,
+            whitespace_action=WHITESPACE_HIGHLIGHT_STR)
+        self.assertTrue(streaming._duplicate_positions)
+
+    def test_removals_match_translation(self):
+        streaming = self.assert_matches_translation(
+            duplicate_action=DUPLICATE_REMOVE_ROW_STR,
+            whitespace_action=WHITESPACE_REMOVE_STR)
+        self.assertTrue(streaming.row_deletions)
+
+    def test_duplicates_are_found_across_windows(self):
+        streaming = self.assert_matches_translation(
+            duplicate_action=DUPLICATE_REMOVE_ROW_STR)
+        first_rows = streaming._duplicate_first_rows
+        self.assertTrue(any(y // 7 != first_y // 7
+                            for (_, y), first_y in first_rows.items()))
+
+    def test_pooled_checks_match_translation(self):
+        for pool in (CHECK_THREADS_STR, CHECK_PROCESSES_STR):
+            expected = self.run_translation(
+                Translation, check_all=True,
+                duplicate_action=DUPLICATE_REMOVE_ROW_STR,
+                whitespace_action=WHITESPACE_HIGHLIGHT_STR)
+            pooled = self.run_translation(
+                Translation, check_all=True, check_pool=pool,
+                duplicate_action=DUPLICATE_REMOVE_ROW_STR,
+                whitespace_action=WHITESPACE_HIGHLIGHT_STR)
+            self.assertEqual(expected[:2], pooled[:2])
+            self.assertEqual(expected[2]._duplicate_positions,
+                             pooled[2]._duplicate_positions)
+            self.assertEqual(expected[2]._whitespace_positions,
+                             pooled[2]._whitespace_positions)
+        self.assert_matches_translation(
+            check_all=True, check_pool=CHECK_PROCESSES_STR,
+            duplicate_action=DUPLICATE_REMOVE_ROW_STR)
+
+    def test_columns_are_partitioned_only_if_processes_are_asked_for(self):
+        calls = []
+        partitioned = ColumnScan.find_duplicates_partitioned
+        can_partition = ColumnScan.can_partition
+        min_length = ColumnScan.PARTITION_MIN_LENGTH
+
+        def find_duplicates_partitioned(*args, **kwargs):
+            calls.append(args)
+            return partitioned(*args, **kwargs)
+
+        try:
+            ColumnScan.PARTITION_MIN_LENGTH = 100
+            ColumnScan.can_partition = staticmethod(lambda: True)
+            ColumnScan.find_duplicates_partitioned = \
+                staticmethod(find_duplicates_partitioned)
+            for pool, n_calls in ((CHECK_SERIAL_STR, 0),
+                                  (CHECK_PROCESSES_STR, 1)):
+                model = Office.Mem.Model({
+                    'src': make_source_rows(4), 'tgt': [['ident']]})
+                Translation(
+                    None,
+                    source_sheet=model['src'],
+                    target_sheet=model['tgt'],
+                    column_translations=[{
+                        SOURCE_COLUMN_NAME_KEY: 'id',
+                        TARGET_COLUMN_NAME_KEY: 'ident',
+                        DUPLICATE_CHK_KEY: True,
+                    }],
+                    interactive=False,
+                    check_pool=pool,
+                )
+                self.assertEqual(n_calls, len(calls), pool)
+        finally:
+            ColumnScan.PARTITION_MIN_LENGTH = min_length
+            ColumnScan.can_partition = staticmethod(can_partition)
+            ColumnScan.find_duplicates_partitioned = staticmethod(partitioned)
+
+    def test_source_is_read_one_window_at_a_time(self):
+        model = Office.Mem.Model({
+            'src': make_source_rows(2),
+            'tgt': [['name']],
+        })
+        source = model['src']
+        heights = []
+        read_block = source.read_block
+
+        def counting_read_block(x0, y0, x1, y1):
+            heights.append(y1 - y0)
+            return read_block(x0, y0, x1, y1)
+
+        source.read_block = counting_read_block
+        translation = StreamingTranslation(
+            None,
+            source_sheet=source,
+            target_sheet=model['tgt'],
+            column_translations=[{
+                SOURCE_COLUMN_NAME_KEY: 'name',
+                TARGET_COLUMN_NAME_KEY: 'name',
+            }],
+            interactive=False,
+            window_size=50,
+        )
+        self.assertEqual([], heights)  # nothing is read before commit
+        translation.commit()
+        self.assertEqual([50] * 6, heights)
+        self.assertIsNone(source.snapshot)
+        self.assertIsNone(model['tgt'].snapshot)
+
+    def test_window_size_must_be_positive(self):
+        model = Office.Mem.Model({'src': [['a']], 'tgt': [['a']]})
+        self.assertRaises(
+            ValueError, StreamingTranslation, None,
+            source_sheet=model['src'], target_sheet=model['tgt'],
+            column_translations=[], interactive=False, window_size=0)
+
+
+class WaitingTranslation(StreamingTranslation):
+    """
+    Waits while checking the first window until the second window's
+    read has begun, or a timeout has passed.
+    """
+    read_ahead = None
+
+    def _check_rows(self):
+        if self._row_offset == 1:
+            self.read_ahead = self.second_read.wait(5)
+        super()._check_rows()
+
+
+class TestThreadedIO(TestCase):
+    def setUp(self):
+        Office.select_interface('Mem')
+        self.model = Office.Mem.Model({
+            'src': make_source_rows(3),
+            'tgt': [['name']],
+        })
+
+    def tearDown(self):
+        Office.select_interface(None)
+
+    def make_translation(self, translation_class=StreamingTranslation,
+                         **kwargs):
+        return translation_class(
+            None,
+            source_sheet=self.model['src'],
+            target_sheet=self.model['tgt'],
+            column_translations=[{
+                SOURCE_COLUMN_NAME_KEY: 'name',
+                TARGET_COLUMN_NAME_KEY: 'name',
+            }],
+            interactive=False,
+            window_size=50,
+            **kwargs
+        )
+
+    def test_mem_sheets_are_threaded_by_default(self):
+        self.assertTrue(self.make_translation().threaded)
+        self.assertFalse(self.make_translation(threaded=False).threaded)
+        self.assertFalse(Office.XW.Sheet.threaded_io)
+        self.assertFalse(Office.Uno.Sheet.threaded_io)
+
+    def test_next_window_is_read_while_window_is_checked(self):
+        source = self.model['src']
+        read_block = source.read_block
+        second_read = threading.Event()
+
+        def read_block_(x0, y0, x1, y1):
+            if y0 == 51:
+                second_read.set()
+            return read_block(x0, y0, x1, y1)
+
+        source.read_block = read_block_
+        translation = self.make_translation(WaitingTranslation)
+        translation.second_read = second_read
+        translation.commit()
+        self.assertTrue(translation.read_ahead)
+        grid = self.model['tgt'].i7e_sheet
+        self.assertEqual([make_source_rows(3)[-1][1]],
+                         grid.get_block(0, N_ROWS, 1, 1)[0])
+
+    def test_write_errors_are_raised_by_commit(self):
+        def write_block(x, y, rows):
+            raise IOError('sheet is read-only')
+
+        self.model['tgt'].write_block = write_block
+        translation = self.make_translation()
+        self.assertRaises(IOError, translation.commit)
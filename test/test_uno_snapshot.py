@@ -0,0 +1,344 @@
+"""
+Tests Uno Sheet Snapshot against a fake uno sheet object which counts
+calls made to it, so that no office program is required.
+"""
+
+from unittest import TestCase
+
+from leadmacro import Office, Translation, SOURCE_COLUMN_NAME_KEY, \
+    TARGET_COLUMN_NAME_KEY, DUPLICATE_CHK_KEY, DUPLICATE_HIGHLIGHT_STR
+
+
+class FakeUnoSheet:
+    """
+    Imitates the parts of a com.sun.star.sheet.Spreadsheet used by
+    Office.Uno.Sheet, counting each call made through it.
+    """
+
+    def __init__(self, name, rows):
+        self.Name = name
+        self.rows = [list(row) for row in rows]
+        self.calls = {}
+
+    def _count(self, name):
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    def createCursor(self):
+        self._count('createCursor')
+        return FakeUnoCursor(self)
+
+    def getCellRangeByPosition(self, left, top, right, bottom):
+        self._count('getCellRangeByPosition')
+        return FakeUnoRange(self, left, top, right, bottom)
+
+    def getCellByPosition(self, x, y):
+        self._count('getCellByPosition')
+        return FakeUnoCell(self, x, y)
+
+
+class FakeUnoDocument:
+    """
+    Imitates a calc document holding fake uno sheets by name.
+    """
+
+    def __init__(self, uid, sheets):
+        self.RuntimeUID = uid
+        self.URL = ''
+        self.Sheets = FakeUnoSheets(
+            [FakeUnoSheet(name, rows) for name, rows in sheets.items()])
+
+
+class FakeUnoSheets:
+    def __init__(self, sheets):
+        self.sheets = sheets
+        self.ElementNames = tuple(sheet.Name for sheet in sheets)
+
+    def getByName(self, name):
+        return self.sheets[self.ElementNames.index(name)]
+
+    def getByIndex(self, i):
+        return self.sheets[i]
+
+
+class FakeUnoCursor:
+    def __init__(self, sheet):
+        self.sheet = sheet
+        self.end = (0, 0)
+
+    def gotoEndOfUsedArea(self, expand):
+        self.sheet._count('gotoEndOfUsedArea')
+        self.end = (
+            max([len(row) for row in self.sheet.rows]) - 1,
+            len(self.sheet.rows) - 1
+        )
+
+    def getRangeAddress(self):
+        return FakeUnoAddress(*self.end)
+
+
+class FakeUnoAddress:
+    def __init__(self, end_column, end_row):
+        self.EndColumn = end_column
+        self.EndRow = end_row
+
+
+class FakeUnoRange:
+    def __init__(self, sheet, left, top, right, bottom):
+        self.sheet = sheet
+        self.left, self.top, self.right, self.bottom = left, top, right, bottom
+
+    def getDataArray(self):
+        self.sheet._count('getDataArray')
+        return tuple(
+            tuple(
+                self.sheet.rows[y][x] if x < len(self.sheet.rows[y]) else ''
+                for x in range(self.left, self.right + 1)
+            ) for y in range(self.top, self.bottom + 1)
+        )
+
+    def clearContents(self, flags):
+        self.sheet._count('clearContents')
+        for row in self.sheet.rows[self.top:self.bottom + 1]:
+            for x in range(self.left, min(self.right + 1, len(row))):
+                row[x] = ''
+
+    @property
+    def CellBackColor(self):
+        return -1
+
+    @CellBackColor.setter
+    def CellBackColor(self, color):
+        self.sheet._count('CellBackColor')
+
+    def setDataArray(self, data):
+        self.sheet._count('setDataArray')
+        assert isinstance(data, tuple)
+        assert len(data) == self.bottom - self.top + 1
+        for y, row in enumerate(data, self.top):
+            assert isinstance(row, tuple)
+            assert len(row) == self.right - self.left + 1
+            assert None not in row
+            while len(self.sheet.rows) <= y:
+                self.sheet.rows.append([])
+            sheet_row = self.sheet.rows[y]
+            sheet_row.extend([''] * (self.right + 1 - len(sheet_row)))
+            sheet_row[self.left:self.right + 1] = row
+
+
+class FakeUnoEnum:
+    def __init__(self, value):
+        self.value = value
+
+
+class FakeUnoCell:
+    def __init__(self, sheet, x, y):
+        self.sheet, self.x, self.y = sheet, x, y
+
+    @property
+    def FormulaResultType(self):
+        self.sheet._count('FormulaResultType')
+        try:
+            value = self.sheet.rows[self.y][self.x]
+        except IndexError:
+            value = ''
+        return FakeUnoEnum('TEXT' if isinstance(value, str) else 'VALUE')
+
+    def getValue(self):
+        self.sheet._count('getValue')
+        return self.sheet.rows[self.y][self.x]
+
+    def getString(self):
+        self.sheet._count('getString')
+        try:
+            return str(self.sheet.rows[self.y][self.x])
+        except IndexError:
+            return ''
+
+
+class TestUnoSnapshot(TestCase):
+    def setUp(self):
+        Office.select_interface('Uno')
+        self.fake_sheet = FakeUnoSheet('uno_test_%s' % id(self), [
+            ['id', 'name'],
+            [1., 'a'],
+            [2., ''],
+            [3., 'c'],
+        ])
+        self.sheet = Office.Uno.Sheet.factory(self.fake_sheet)
+
+    def tearDown(self):
+        Office.select_interface(None)
+
+    def test_factory_returns_uno_sheet(self):
+        self.assertIsInstance(self.sheet, Office.Uno.Sheet)
+        self.assertIs(self.sheet, Office.Uno.Sheet.factory(self.fake_sheet))
+
+    def test_office_sheets_do_not_fork_workers(self):
+        self.assertFalse(self.sheet.forks_workers)
+        self.assertFalse(Office.XW.Sheet.forks_workers)
+        self.assertTrue(Office.Mem.Sheet.forks_workers)
+
+    def test_used_size_is_found_from_cursor(self):
+        self.assertEqual((2, 4), self.sheet.used_size)
+
+    def test_snapshot_is_read_in_one_data_array_call(self):
+        self.sheet.take_snapshot()
+        self.assertEqual(1, self.fake_sheet.calls['getDataArray'])
+        self.assertEqual('c', self.sheet.get_cell((1, 3)).value)
+        self.assertEqual(3., self.sheet.get_cell((0, 3)).value)
+        self.assertEqual('3', self.sheet.get_cell((0, 3)).string)
+        self.assertNotIn('getCellByPosition', self.fake_sheet.calls)
+        self.assertEqual(1, self.fake_sheet.calls['getDataArray'])
+
+    def test_blank_cells_do_not_unpack_number_columns(self):
+        fake_sheet = FakeUnoSheet('uno_blanks_%s' % id(self), [['id']] + [
+            [float(y) if y % 3 else ''] for y in range(300)])
+        sheet = Office.Uno.Sheet.factory(fake_sheet)
+        sheet.take_snapshot()
+        column = sheet.snapshot.get_column(0)
+        self.assertEqual(
+            Office.Uno.Sheet.Snapshot.ColumnBuffer.FLOAT, column.kind)
+        self.assertIsNone(sheet.get_cell((0, 1)).value)
+        self.assertEqual('', sheet.get_cell((0, 1)).string)
+        self.assertEqual(2., sheet.get_cell((0, 3)).value)
+
+    def test_line_lengths_are_found_without_reading_cells(self):
+        self.sheet.take_snapshot()
+        self.assertEqual(['id', 'name'], list(self.sheet.columns.names))
+        self.assertEqual(4, len(self.sheet.get_column('name')))
+        self.assertEqual(2, len(self.sheet.get_row(3)))
+        self.assertNotIn('getCellByPosition', self.fake_sheet.calls)
+
+    def test_snapshot_is_written_in_one_data_array_call(self):
+        self.sheet.take_snapshot()
+        self.sheet.get_cell((1, 2)).value = 'b'
+        self.sheet.get_cell((1, 4)).value = 'd'
+        self.sheet.get_cell((0, 4)).value = 4.
+        self.sheet.write_snapshot()
+        # the new row is written at once; unchanged 'c' is not written
+        self.assertEqual(2, self.fake_sheet.calls['setDataArray'])
+        self.assertNotIn('getCellByPosition', self.fake_sheet.calls)
+        self.assertEqual('b', self.fake_sheet.rows[2][1])
+        self.assertEqual([4., 'd'], self.fake_sheet.rows[4])
+
+    def test_only_changed_values_are_written(self):
+        self.sheet.take_snapshot()
+        self.fake_sheet.rows[0][0] = 'changed elsewhere'
+        self.sheet.get_cell((1, 2)).value = 'b'
+        self.sheet.get_cell((1, 3)).value = 'd'
+        self.sheet.write_snapshot()
+        self.assertEqual(1, self.fake_sheet.calls['setDataArray'])
+        self.assertEqual('changed elsewhere', self.fake_sheet.rows[0][0])
+        self.assertEqual(
+            ['b', 'd'], [row[1] for row in self.fake_sheet.rows[2:]])
+        self.sheet.write_snapshot()  # nothing more to write
+        self.assertEqual(1, self.fake_sheet.calls['setDataArray'])
+
+    def test_region_is_cleared_in_one_call(self):
+        self.sheet.take_snapshot()
+        self.assertFalse(self.sheet.region_is_empty(0, 1, 2, 4))
+        self.sheet.clear_region(0, 1, 2, 4)
+        self.assertTrue(self.sheet.region_is_empty(0, 1, 2, 4))
+        self.assertEqual(1, self.fake_sheet.calls['clearContents'])
+        self.assertEqual(1, self.fake_sheet.calls['CellBackColor'])
+        self.sheet.write_snapshot()
+        self.assertEqual(
+            [['id', 'name'], ['', ''], ['', ''], ['', '']],
+            self.fake_sheet.rows)
+        self.assertNotIn('getCellByPosition', self.fake_sheet.calls)
+
+    def test_translation_commits_through_snapshots(self):
+        fake_target = FakeUnoSheet('uno_target_%s' % id(self), [['name']])
+        target = Office.Uno.Sheet.factory(fake_target)
+        Translation(
+            None,
+            source_sheet=self.sheet,
+            target_sheet=target,
+            column_translations=[{
+                SOURCE_COLUMN_NAME_KEY: 'name',
+                TARGET_COLUMN_NAME_KEY: 'name',
+            }],
+            interactive=False,
+        ).commit()
+        self.assertEqual(
+            [['name'], ['a'], [''], ['c']], fake_target.rows)
+        self.assertEqual(1, fake_target.calls['setDataArray'])
+
+
+    def test_highlights_are_written_as_rectangles(self):
+        fake_source = FakeUnoSheet('uno_many_%s' % id(self), [['id']] + [
+            [float(y % 100)] for y in range(200)])
+        source = Office.Uno.Sheet.factory(fake_source)
+        fake_target = FakeUnoSheet('uno_target_%s' % id(self), [['id']])
+        target = Office.Uno.Sheet.factory(fake_target)
+        Translation(
+            None,
+            source_sheet=source,
+            target_sheet=target,
+            column_translations=[{
+                SOURCE_COLUMN_NAME_KEY: 'id',
+                TARGET_COLUMN_NAME_KEY: 'id',
+                DUPLICATE_CHK_KEY: True,
+            }],
+            duplicate_action=DUPLICATE_HIGHLIGHT_STR,
+            interactive=False,
+        ).commit()
+        # 100 duplicates in consecutive rows are colored in one call
+        self.assertEqual(1, fake_target.calls['CellBackColor'])
+        self.assertNotIn('getCellByPosition', fake_target.calls)
+
+
+class TestUnoDocuments(TestCase):
+    def setUp(self):
+        Office.select_interface('Uno')
+
+    def tearDown(self):
+        Office.select_interface(None)
+
+    def test_same_named_sheets_of_documents_are_kept_apart(self):
+        source_model = Office.Uno.Model(FakeUnoDocument(
+            'source_%s' % id(self), {'Sheet1': [['name'], ['a'], ['b']]}))
+        target_model = Office.Uno.Model(FakeUnoDocument(
+            'target_%s' % id(self), {'Sheet1': [['name']]}))
+        source, target = source_model['Sheet1'], target_model['Sheet1']
+        self.assertIsNot(source, target)
+        self.assertIs(source, source_model['Sheet1'])
+        Translation(
+            None,
+            source_sheet=source,
+            target_sheet=target,
+            column_translations=[{
+                SOURCE_COLUMN_NAME_KEY: 'name',
+                TARGET_COLUMN_NAME_KEY: 'name',
+            }],
+            interactive=False,
+        ).commit()
+        self.assertEqual([['name'], ['a'], ['b']],
+                         target.i7e_sheet.rows)
+        self.assertEqual([['name'], ['a'], ['b']],
+                         source.i7e_sheet.rows)
+
+
+class TestMixedInterfaces(TestCase):
+    def test_translation_from_uno_sheet_to_mem_sheet(self):
+        Office.select_interface(None)
+        fake_sheet = FakeUnoSheet('uno_mixed_%s' % id(self), [
+            ['id', 'name'],
+            [1., 'a'],
+            [2., 'b'],
+        ])
+        source = Office.Uno.Sheet.factory(fake_sheet)
+        model = Office.Mem.Model({'tgt': [['name', 'id']]})
+        target = model['tgt']
+        Translation(
+            None,
+            source_sheet=source,
+            target_sheet=target,
+            column_translations=[{
+                SOURCE_COLUMN_NAME_KEY: name,
+                TARGET_COLUMN_NAME_KEY: name,
+            } for name in ('id', 'name')],
+            interactive=False,
+        ).commit()
+        self.assertEqual(
+            [['name', 'id'], ['a', 1.], ['b', 2.]], target.i7e_sheet.rows)